@@ -0,0 +1,34 @@
+"""Transcript storage columns (compressed_text, compression, char_count)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    sa.Column("compressed_text", sa.LargeBinary(), nullable=True),
+    sa.Column("compression", sa.String(), nullable=False, server_default="none"),
+    sa.Column("char_count", sa.Integer(), nullable=True),
+]
+
+
+def upgrade():
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("transcripts")}
+    with op.batch_alter_table("transcripts") as batch:
+        for column in COLUMNS:
+            if column.name not in existing:
+                batch.add_column(column.copy())
+    op.execute("UPDATE transcripts SET char_count = length(transcript_text) WHERE char_count IS NULL")
+
+
+def downgrade():
+    with op.batch_alter_table("transcripts") as batch:
+        for column in reversed(COLUMNS):
+            batch.drop_column(column.name)
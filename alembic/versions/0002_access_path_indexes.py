@@ -0,0 +1,37 @@
+"""Indexes for the episodes, analysis_reports, knowledge base and subscription access paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Mirrors the Index() entries in app/models __table_args__
+INDEXES = [
+    ("ix_episodes_podcast_published", "episodes", ["podcast_id", "published_date"]),
+    ("ix_episodes_transcript_status", "episodes", ["transcript_status"]),
+    ("ix_episodes_audio_url", "episodes", ["audio_url"]),
+    ("ix_analysis_reports_episode_user", "analysis_reports", ["episode_id", "user_id"]),
+    ("ix_analysis_reports_user_created", "analysis_reports", ["user_id", "created_at"]),
+    ("ix_knowledge_base_entries_user_created", "knowledge_base_entries", ["user_id", "created_at"]),
+    ("ix_knowledge_base_entries_user_updated", "knowledge_base_entries", ["user_id", "updated_at"]),
+    ("ix_user_subscriptions_user_active", "user_subscriptions", ["user_id", "is_active"]),
+    ("ix_user_subscriptions_podcast", "user_subscriptions", ["podcast_id"]),
+]
+
+
+def upgrade():
+    # IF NOT EXISTS: databases created by create_tables() after this change already have them
+    for name, table, columns in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+    op.execute("ANALYZE")
+
+
+def downgrade():
+    for name, _, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,32 @@
+"""Per-message delivery outcome on email_logs (attempts, error_message)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    sa.Column("attempts", sa.Integer(), nullable=True),
+    sa.Column("error_message", sa.Text(), nullable=True),
+]
+
+
+def upgrade():
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("email_logs")}
+    with op.batch_alter_table("email_logs") as batch:
+        for column in COLUMNS:
+            if column.name not in existing:
+                batch.add_column(column.copy())
+
+
+def downgrade():
+    with op.batch_alter_table("email_logs") as batch:
+        for column in reversed(COLUMNS):
+            batch.drop_column(column.name)
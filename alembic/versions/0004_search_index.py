@@ -0,0 +1,32 @@
+"""Full-text search index (SQLite FTS5 table and triggers, PostgreSQL tsvector columns and GIN indexes)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+from app.services.search_service import (
+    create_postgres_index, create_sqlite_index, drop_postgres_index, drop_sqlite_index
+)
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        create_sqlite_index(bind)
+    else:
+        create_postgres_index(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        drop_sqlite_index(bind)
+    else:
+        drop_postgres_index(bind)
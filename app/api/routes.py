@@ -13,9 +13,13 @@ from app.schemas import (
     EpisodeResponse,
     SubscriptionCreate, SubscriptionResponse, SubscriptionUpdate,
     AnalysisResponse,
-    KnowledgeBaseEntryResponse, KnowledgeBaseEntryUpdate, CategoryResponse, CategoryCreate
+    KnowledgeBaseEntryResponse, KnowledgeBaseEntryUpdate, CategoryResponse, CategoryCreate,
+    SearchResponse, SemanticPassageResponse
+)
+from app.services import (
+    UserService, PodcastService, AnalysisService, KnowledgeBaseService, SearchService,
+    SemanticSearchService
 )
-from app.services import UserService, PodcastService, AnalysisService, KnowledgeBaseService
 
 router = APIRouter()
 
@@ -272,6 +276,33 @@ async def search_knowledge_base(
     return knowledge_service.search_entries(db, user_id, q)
 
 
+@router.get("/users/{user_id}/search", response_model=SearchResponse)
+async def search_content(
+    user_id: int,
+    q: str = Query(..., description="Search query"),
+    doc_type: Optional[str] = Query(None, description="transcript, analysis or kb_note"),
+    skip: int = 0,
+    limit: int = Query(20, le=100),
+    db: Session = Depends(get_db)
+):
+    """Ranked full-text search across transcripts, analyses and knowledge base notes"""
+    search_service = SearchService()
+    return search_service.search(db, user_id, q, doc_type, skip, limit)
+
+
+@router.get("/search/semantic", response_model=List[SemanticPassageResponse])
+async def semantic_search(
+    q: str = Query(..., description="Natural-language question"),
+    k: int = Query(10, le=50),
+):
+    """Transcript passages most similar in meaning to the query, across all shows"""
+    semantic_service = SemanticSearchService()
+    result = semantic_service.search(q, k)
+    if not result["success"]:
+        raise HTTPException(status_code=503, detail=result["error"])
+    return result["results"]
+
+
 @router.get("/users/{user_id}/knowledge-base/categories", response_model=List[CategoryResponse])
 async def get_user_categories(user_id: int, db: Session = Depends(get_db)):
     """Get user's custom categories"""
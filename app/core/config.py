@@ -42,6 +42,7 @@ class Settings(BaseSettings):
     # Audio processing
     audio_storage_path: str = os.getenv("AUDIO_STORAGE_PATH", "./data/audio")
     transcripts_storage_path: str = os.getenv("TRANSCRIPTS_STORAGE_PATH", "./data/transcripts")
+    semantic_index_dir: str = os.getenv("SEMANTIC_INDEX_DIR", "./data/semantic_index")
     
     # JWT settings
     jwt_algorithm: str = "HS256"
@@ -1,12 +1,13 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
+from core import transcript_store
 
 # Create database engine
 if settings.database_url.startswith("sqlite"):
@@ -16,6 +17,10 @@ if settings.database_url.startswith("sqlite"):
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+
+    @event.listens_for(engine, "connect")
+    def _register_sqlite_functions(dbapi_connection, connection_record):
+        transcript_store.register_functions(dbapi_connection)
 else:
     # PostgreSQL configuration
     engine = create_engine(settings.database_url, pool_pre_ping=True)
@@ -5,6 +5,7 @@ from .user import User
 from .podcast import Podcast
 from .episode import Episode
 from .transcript import Transcript
+from .transcript_cache import TranscriptCacheEntry
 from .subscription import UserSubscription
 from .analysis import AnalysisReport
 from .knowledge_base import KnowledgeBaseEntry, PodcastCategory
@@ -15,6 +16,7 @@ __all__ = [
     "Podcast", 
     "Episode",
     "Transcript",
+    "TranscriptCacheEntry",
     "UserSubscription",
     "AnalysisReport",
     "KnowledgeBaseEntry",
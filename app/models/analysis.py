@@ -1,7 +1,7 @@
 """
 Analysis report model with enhanced features
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -10,6 +10,10 @@ from app.core.database import Base
 
 class AnalysisReport(Base):
     __tablename__ = "analysis_reports"
+    __table_args__ = (
+        Index("ix_analysis_reports_episode_user", "episode_id", "user_id"),
+        Index("ix_analysis_reports_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -18,6 +18,8 @@ class EmailLog(Base):
     status = Column(String, nullable=False)  # sent/failed
     subject = Column(String, nullable=True)
     content_preview = Column(Text, nullable=True)  # First 200 chars of content
+    attempts = Column(Integer, nullable=True)  # SMTP delivery attempts, including retries
+    error_message = Column(Text, nullable=True)  # Last delivery error when status is failed
     
     # Relationships
     user = relationship("User", back_populates="email_logs")
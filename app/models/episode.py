@@ -1,7 +1,7 @@
 """
 Episode model - enhanced from v1
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -10,6 +10,11 @@ from app.core.database import Base
 
 class Episode(Base):
     __tablename__ = "episodes"
+    __table_args__ = (
+        Index("ix_episodes_podcast_published", "podcast_id", "published_date"),
+        Index("ix_episodes_transcript_status", "transcript_status"),
+        Index("ix_episodes_audio_url", "audio_url"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     podcast_id = Column(Integer, ForeignKey("podcasts.id"), nullable=False)
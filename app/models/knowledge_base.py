@@ -1,7 +1,7 @@
 """
 Knowledge base models for personal learning organization
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -10,6 +10,11 @@ from app.core.database import Base
 
 class KnowledgeBaseEntry(Base):
     __tablename__ = "knowledge_base_entries"
+    __table_args__ = (
+        # analysis_report_id is already indexed by its unique constraint
+        Index("ix_knowledge_base_entries_user_created", "user_id", "created_at"),
+        Index("ix_knowledge_base_entries_user_updated", "user_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
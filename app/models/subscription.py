@@ -1,7 +1,7 @@
 """
 User subscription model for podcast subscriptions
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -10,6 +10,10 @@ from app.core.database import Base
 
 class UserSubscription(Base):
     __tablename__ = "user_subscriptions"
+    __table_args__ = (
+        Index("ix_user_subscriptions_user_active", "user_id", "is_active"),
+        Index("ix_user_subscriptions_podcast", "podcast_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,11 +1,12 @@
 """
 Transcript model - centralized transcript storage
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float, LargeBinary
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from core import transcript_store
 
 
 class Transcript(Base):
@@ -13,7 +14,11 @@ class Transcript(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     episode_id = Column(Integer, ForeignKey("episodes.id"), unique=True, nullable=False)
-    transcript_text = Column(Text, nullable=False)
+    # Text columns are deferred so listing transcripts does not load the bodies
+    transcript_text = deferred(Column(Text, nullable=False, default=""))
+    compressed_text = deferred(Column(LargeBinary, nullable=True))
+    compression = Column(String, nullable=False, default="none", server_default="none")  # none/zlib/zstd
+    char_count = Column(Integer, nullable=True)
     transcription_service = Column(String, default="whisper-1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     word_count = Column(Integer, nullable=True)
@@ -22,5 +27,9 @@ class Transcript(Base):
     # Relationships
     episode = relationship("Episode", back_populates="transcript")
 
+    def get_text(self) -> str:
+        """Transcript text, decompressed if stored compressed"""
+        return transcript_store.decode(self.compression, self.transcript_text, self.compressed_text)
+
     def __repr__(self):
         return f"<Transcript(id={self.id}, episode_id={self.episode_id}, words={self.word_count})>"
\ No newline at end of file
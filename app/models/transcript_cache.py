@@ -0,0 +1,24 @@
+"""
+Transcript cache model - transcripts keyed by audio fingerprint
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class TranscriptCacheEntry(Base):
+    __tablename__ = "transcript_cache"
+
+    fingerprint = Column(String, primary_key=True)  # sha256:duration_seconds
+    audio_sha256 = Column(String, nullable=False, index=True)
+    duration_seconds = Column(Integer, nullable=True)
+    transcript = Column(Text, nullable=False)
+    model = Column(String, default="whisper-1")
+    source_url = Column(String, nullable=True)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<TranscriptCacheEntry(fingerprint='{self.fingerprint[:16]}', hits={self.hit_count})>"
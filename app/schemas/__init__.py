@@ -7,6 +7,7 @@ from .episode import EpisodeResponse
 from .subscription import SubscriptionCreate, SubscriptionResponse, SubscriptionUpdate
 from .analysis import AnalysisResponse, AnalysisCreate
 from .knowledge_base import KnowledgeBaseEntryResponse, KnowledgeBaseEntryUpdate, CategoryResponse, CategoryCreate
+from .search import SearchResponse, SearchResultResponse, SemanticPassageResponse
 
 __all__ = [
     "UserCreate", "UserResponse", "UserUpdate",
@@ -16,4 +17,5 @@ __all__ = [
     "AnalysisResponse", "AnalysisCreate",
     "KnowledgeBaseEntryResponse", "KnowledgeBaseEntryUpdate",
     "CategoryResponse", "CategoryCreate",
+    "SearchResponse", "SearchResultResponse", "SemanticPassageResponse",
 ]
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Full-text search schemas for API validation
+"""
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class SearchResultResponse(BaseModel):
+    doc_type: str  # transcript / analysis / kb_note
+    source_id: int
+    episode_id: Optional[int] = None
+    title: Optional[str] = None
+    snippet: str
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResultResponse]
+    skip: int
+    limit: int
+    has_more: bool
+
+
+class SemanticPassageResponse(BaseModel):
+    episode_id: int
+    chunk_index: int
+    podcast_name: Optional[str] = None
+    title: Optional[str] = None
+    publish_date: Optional[str] = None
+    text: str
+    score: float
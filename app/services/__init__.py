@@ -8,6 +8,8 @@ from .analysis_service import AnalysisService
 from .knowledge_base_service import KnowledgeBaseService
 from .email_service import EmailService
 from .user_service import UserService
+from .search_service import SearchService
+from .semantic_search_service import SemanticSearchService
 
 __all__ = [
     "PodcastService",
@@ -17,4 +19,6 @@ __all__ = [
     "KnowledgeBaseService",
     "EmailService",
     "UserService",
+    "SearchService",
+    "SemanticSearchService",
 ]
\ No newline at end of file
@@ -1,19 +1,22 @@
 """
 Enhanced email service with knowledge base highlights and improved templates
 """
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from jinja2 import Template
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
-from app.models import User, AnalysisReport, KnowledgeBaseEntry, Episode, Podcast
+from app.models import User, AnalysisReport, KnowledgeBaseEntry, Episode
 from app.core.config import settings
 from app.services.user_service import UserService
+from core.smtp_pool import SMTPPool
+from core import template_registry
+
+# Users per prefetch query, keeping IN lists well under bind-parameter limits
+DIGEST_USER_CHUNK = 500
 
 
 class EmailService:
@@ -27,25 +30,63 @@ class EmailService:
             'use_tls': True
         }
         self.user_service = UserService()
+        self._smtp_pool = None
     
-    def create_weekly_digest_content(self, db: Session, user: User) -> Dict[str, Any]:
-        """Create weekly digest content with knowledge base highlights"""
-        # Get analysis reports from the last week
-        week_ago = datetime.now() - timedelta(days=7)
+    @property
+    def smtp_pool(self) -> SMTPPool:
+        """Shared pool of authenticated SMTP connections, opened on first send"""
+        if self._smtp_pool is None:
+            self._smtp_pool = SMTPPool(
+                self.smtp_config['host'],
+                self.smtp_config['port'],
+                self.smtp_config['username'],
+                self.smtp_config['password'],
+                use_tls=self.smtp_config['use_tls']
+            )
+        return self._smtp_pool
+    
+    def load_weekly_digest_data(self, db: Session, user_ids: List[int], since: datetime) -> Dict[int, Dict[str, Any]]:
+        """Prefetch reports (with episode and podcast) and KB entries for many users in set-based queries"""
+        data = {user_id: {"reports": [], "kb_by_report": {}, "kb_entries_count": 0} for user_id in user_ids}
         
-        reports = db.query(AnalysisReport).join(Episode).join(Podcast).filter(
-            AnalysisReport.user_id == user.id,
-            AnalysisReport.created_at >= week_ago
-        ).order_by(AnalysisReport.created_at.desc()).all()
+        for start in range(0, len(user_ids), DIGEST_USER_CHUNK):
+            chunk = user_ids[start:start + DIGEST_USER_CHUNK]
+            
+            reports = db.query(AnalysisReport).options(
+                joinedload(AnalysisReport.episode).joinedload(Episode.podcast)
+            ).filter(
+                AnalysisReport.user_id.in_(chunk),
+                AnalysisReport.created_at >= since
+            ).order_by(AnalysisReport.created_at.desc()).all()
+            for report in reports:
+                data[report.user_id]["reports"].append(report)
+            
+            kb_entries = db.query(KnowledgeBaseEntry).filter(
+                KnowledgeBaseEntry.user_id.in_(chunk),
+                KnowledgeBaseEntry.created_at >= since
+            ).all()
+            for kb_entry in kb_entries:
+                data[kb_entry.user_id]["kb_by_report"][kb_entry.analysis_report_id] = kb_entry
+                data[kb_entry.user_id]["kb_entries_count"] += 1
         
+        return data
+    
+    def create_weekly_digest_content(
+        self,
+        db: Session,
+        user: User,
+        prefetched: Optional[Dict[str, Any]] = None,
+        since: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Create weekly digest content with knowledge base highlights"""
+        week_ago = since or datetime.now() - timedelta(days=7)
+        if prefetched is None:
+            prefetched = self.load_weekly_digest_data(db, [user.id], week_ago)[user.id]
+        
+        reports = prefetched["reports"]
         if not reports:
             return None
-        
-        # Get knowledge base entries from the last week
-        kb_entries = db.query(KnowledgeBaseEntry).filter(
-            KnowledgeBaseEntry.user_id == user.id,
-            KnowledgeBaseEntry.created_at >= week_ago
-        ).all()
+        kb_by_report = prefetched["kb_by_report"]
         
         # Organize reports by category
         categorized_reports = {}
@@ -56,8 +97,7 @@ class EmailService:
             episode = report.episode
             podcast = episode.podcast
             
-            # Find knowledge base entry for this report
-            kb_entry = next((kb for kb in kb_entries if kb.analysis_report_id == report.id), None)
+            kb_entry = kb_by_report.get(report.id)
             category = kb_entry.podcast_category if kb_entry else "Uncategorized"
             
             if category not in categorized_reports:
@@ -92,284 +132,54 @@ class EmailService:
             "total_reports": len(reports),
             "total_reading_time": total_reading_time,
             "best_quotes": best_quotes[:3],  # Top 3 quotes
-            "kb_entries_count": len(kb_entries),
+            "kb_entries_count": prefetched["kb_entries_count"],
             "week_start": week_ago.strftime("%B %d"),
             "week_end": datetime.now().strftime("%B %d, %Y")
         }
     
     def render_weekly_digest_html(self, content: Dict[str, Any]) -> str:
         """Render HTML email template for weekly digest"""
-        html_template = Template('''
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Weekly Podcast Digest</title>
-    <style>
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 0;
-            background-color: #f8f9fa;
-            color: #212529;
-        }
-        .email-container {
-            max-width: 800px;
-            margin: 0 auto;
-            background-color: #ffffff;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        }
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px 30px;
-            text-align: center;
-        }
-        .header h1 {
-            margin: 0 0 10px 0;
-            font-size: 28px;
-            font-weight: 300;
-        }
-        .stats-summary {
-            background-color: #f8f9fa;
-            padding: 25px 30px;
-            margin: 0;
-            border-bottom: 1px solid #dee2e6;
-        }
-        .stats-grid {
-            display: flex;
-            justify-content: space-around;
-            text-align: center;
-        }
-        .stat-item {
-            flex: 1;
-        }
-        .stat-number {
-            font-size: 24px;
-            font-weight: 600;
-            color: #495057;
-            display: block;
-        }
-        .stat-label {
-            font-size: 13px;
-            color: #6c757d;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
-        .quotes-section {
-            background-color: #fff3cd;
-            padding: 30px;
-            margin: 0;
-            border-left: 4px solid #ffc107;
-        }
-        .quote-item {
-            margin-bottom: 20px;
-            padding: 15px;
-            background-color: white;
-            border-radius: 8px;
-            border-left: 3px solid #ffc107;
-        }
-        .quote-text {
-            font-style: italic;
-            font-size: 16px;
-            color: #495057;
-            margin-bottom: 10px;
-        }
-        .quote-source {
-            font-size: 14px;
-            color: #6c757d;
-        }
-        .category-section {
-            padding: 30px;
-            border-bottom: 1px solid #e9ecef;
-        }
-        .category-header {
-            font-size: 20px;
-            font-weight: 600;
-            color: #495057;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid #dee2e6;
-        }
-        .report-item {
-            margin-bottom: 25px;
-            padding: 20px;
-            background-color: #f8f9fa;
-            border-radius: 8px;
-        }
-        .report-title {
-            font-size: 18px;
-            font-weight: 600;
-            color: #212529;
-            margin-bottom: 8px;
-        }
-        .report-meta {
-            font-size: 14px;
-            color: #6c757d;
-            margin-bottom: 15px;
-        }
-        .reading-time {
-            background-color: #d1ecf1;
-            color: #0c5460;
-            padding: 4px 8px;
-            border-radius: 12px;
-            font-size: 12px;
-            font-weight: 500;
-        }
-        .report-preview {
-            color: #495057;
-            line-height: 1.7;
-        }
-        .kb-highlight {
-            background-color: #e7f3ff;
-            padding: 15px;
-            border-radius: 6px;
-            margin-top: 10px;
-            border-left: 3px solid #007bff;
-        }
-        .footer {
-            background-color: #f8f9fa;
-            padding: 30px;
-            text-align: center;
-            color: #6c757d;
-            font-size: 14px;
-        }
-    </style>
-</head>
-<body>
-    <div class="email-container">
-        <div class="header">
-            <h1>📚 Your Weekly Knowledge Digest</h1>
-            <p>{{ content.week_start }} - {{ content.week_end }}</p>
-            <p>Hello {{ content.user.name or content.user.email }}!</p>
-        </div>
-        
-        <div class="stats-summary">
-            <div class="stats-grid">
-                <div class="stat-item">
-                    <span class="stat-number">{{ content.total_reports }}</span>
-                    <span class="stat-label">New Analyses</span>
-                </div>
-                <div class="stat-item">
-                    <span class="stat-number">{{ content.total_reading_time }}</span>
-                    <span class="stat-label">Minutes Reading</span>
-                </div>
-                <div class="stat-item">
-                    <span class="stat-number">{{ content.kb_entries_count }}</span>
-                    <span class="stat-label">Knowledge Base Entries</span>
-                </div>
-            </div>
-        </div>
-        
-        {% if content.best_quotes %}
-        <div class="quotes-section">
-            <h2 style="margin: 0 0 20px 0; font-size: 22px; color: #495057;">💡 Week's Best Insights</h2>
-            {% for quote in content.best_quotes %}
-            <div class="quote-item">
-                <div class="quote-text">"{{ quote.quote }}"</div>
-                <div class="quote-source">— {{ quote.podcast }}: {{ quote.episode[:50] }}{% if quote.episode|length > 50 %}...{% endif %}</div>
-            </div>
-            {% endfor %}
-        </div>
-        {% endif %}
-        
-        {% for category, reports in content.categorized_reports.items() %}
-        <div class="category-section">
-            <div class="category-header">
-                📂 {{ category }}
-            </div>
-            
-            {% for report_data in reports %}
-            <div class="report-item">
-                <div class="report-title">{{ report_data.episode.title }}</div>
-                <div class="report-meta">
-                    <strong>{{ report_data.podcast.name }}</strong> • 
-                    {{ report_data.episode.published_date.strftime('%B %d') if report_data.episode.published_date else 'Unknown Date' }} • 
-                    <span class="reading-time">{{ report_data.reading_time }} min read</span>
-                </div>
-                
-                <div class="report-preview">
-                    {{ report_data.report.analysis_result[:300] }}{% if report_data.report.analysis_result|length > 300 %}...{% endif %}
-                </div>
-                
-                {% if report_data.kb_entry and report_data.kb_entry.personal_notes %}
-                <div class="kb-highlight">
-                    <strong>📝 Your Notes:</strong> {{ report_data.kb_entry.personal_notes[:200] }}{% if report_data.kb_entry.personal_notes|length > 200 %}...{% endif %}
-                </div>
-                {% endif %}
-            </div>
-            {% endfor %}
-        </div>
-        {% endfor %}
-        
-        <div class="footer">
-            <p><strong>🎧 Personal Podcast Knowledge System</strong></p>
-            <p>Building your learning repository, one episode at a time</p>
-            <p style="margin-top: 15px; font-size: 12px; opacity: 0.7;">
-                <a href="{{ unsubscribe_link }}" style="color: #6c757d;">Unsubscribe</a> from weekly digests
-            </p>
-        </div>
-    </div>
-</body>
-</html>
-        ''')
-        
-        return html_template.render(content=content, unsubscribe_link="#")  # TODO: Implement unsubscribe
+        return template_registry.render(
+            "email/weekly_digest.html.j2", content=content, unsubscribe_link="#"  # TODO: Implement unsubscribe
+        )
     
     def render_weekly_digest_text(self, content: Dict[str, Any]) -> str:
         """Render plain text email template for weekly digest"""
-        text_template = Template('''
-📚 YOUR WEEKLY KNOWLEDGE DIGEST
-{{ "=" * 50 }}
-
-Hello {{ content.user.name or content.user.email }}!
-
-Week of {{ content.week_start }} - {{ content.week_end }}
-
-📊 WEEK SUMMARY:
-• {{ content.total_reports }} new analyses
-• {{ content.total_reading_time }} minutes of reading
-• {{ content.kb_entries_count }} knowledge base entries
-
-{% if content.best_quotes %}
-💡 WEEK'S BEST INSIGHTS:
-{{ "-" * 30 }}
-{% for quote in content.best_quotes %}
-
-"{{ quote.quote }}"
-— {{ quote.podcast }}: {{ quote.episode[:50] }}{% if quote.episode|length > 50 %}...{% endif %}
-{% endfor %}
-{% endif %}
-
-📂 YOUR LEARNING BY CATEGORY:
-{{ "=" * 50 }}
-
-{% for category, reports in content.categorized_reports.items() %}
-
-{{ category.upper() }}
-{{ "-" * 30 }}
-{% for report_data in reports %}
-
-📰 {{ report_data.episode.title }}
-🎧 {{ report_data.podcast.name }} • {{ report_data.episode.published_date.strftime('%B %d') if report_data.episode.published_date else 'Unknown Date' }} • {{ report_data.reading_time }} min read
-
-{{ report_data.report.analysis_result[:200] }}...
-{% if report_data.kb_entry and report_data.kb_entry.personal_notes %}
-
-📝 Your Notes: {{ report_data.kb_entry.personal_notes[:100] }}...
-{% endif %}
-
-{% endfor %}
-{% endfor %}
-
-{{ "=" * 50 }}
-🎧 Personal Podcast Knowledge System
-Building your learning repository, one episode at a time
-        ''')
-        
-        return text_template.render(content=content)
+        return template_registry.render("email/weekly_digest.txt.j2", content=content)
+    
+    def render_weekly_digest(self, content: Dict[str, Any]) -> Dict[str, Any]:
+        """Render subject, HTML and text for a digest (touches every prefetched row, so call before any commit)"""
+        return {
+            "user_id": content["user"].id,
+            "email": content["user"].email,
+            "subject": f"📚 Your Weekly Podcast Digest - {content['total_reports']} New Insights",
+            "html_content": self.render_weekly_digest_html(content),
+            "text_content": self.render_weekly_digest_text(content),
+            "total_reports": content["total_reports"],
+        }
+    
+    def deliver_weekly_digest(self, db: Session, rendered: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a rendered digest and log the outcome"""
+        outcome = self.smtp_pool.send(self._build_message(
+            rendered["email"], rendered["subject"], rendered["html_content"], rendered["text_content"]
+        ))
+        self._log_digest_outcome(db, rendered, outcome)
+        if outcome["success"]:
+            return {"success": True, "total_reports": rendered["total_reports"]}
+        return {"success": False, "error": outcome["error"]}
+    
+    def _log_digest_outcome(self, db: Session, rendered: Dict[str, Any], outcome: Dict[str, Any], commit: bool = True):
+        self.user_service.log_email_sent(
+            db=db,
+            user_id=rendered["user_id"],
+            email_type="weekly_report",
+            subject=rendered["subject"],
+            content_preview=rendered["text_content"][:200] if outcome["success"] else "Failed to send",
+            status="sent" if outcome["success"] else "failed",
+            attempts=outcome["attempts"],
+            error_message=outcome["error"],
+            commit=commit
+        )
     
     def send_weekly_digest(self, db: Session, user_id: int) -> Dict[str, Any]:
         """Send weekly digest to user"""
@@ -383,46 +193,7 @@ Building your learning repository, one episode at a time
         if not content:
             return {"success": False, "error": "No content available for digest"}
         
-        # Render email templates
-        html_content = self.render_weekly_digest_html(content)
-        text_content = self.render_weekly_digest_text(content)
-        
-        # Create subject
-        subject = f"📚 Your Weekly Podcast Digest - {content['total_reports']} New Insights"
-        
-        # Send email
-        try:
-            result = self._send_email(
-                to_email=user.email,
-                subject=subject,
-                html_content=html_content,
-                text_content=text_content
-            )
-            
-            # Log email
-            self.user_service.log_email_sent(
-                db=db,
-                user_id=user_id,
-                email_type="weekly_report",
-                subject=subject,
-                content_preview=text_content[:200],
-                status="sent" if result else "failed"
-            )
-            
-            return {"success": result, "total_reports": content['total_reports']}
-            
-        except Exception as e:
-            # Log failed email
-            self.user_service.log_email_sent(
-                db=db,
-                user_id=user_id,
-                email_type="weekly_report",
-                subject=subject,
-                content_preview="Failed to send",
-                status="failed"
-            )
-            
-            return {"success": False, "error": str(e)}
+        return self.deliver_weekly_digest(db, self.render_weekly_digest(content))
     
     def send_welcome_email(self, db: Session, user_id: int) -> bool:
         """Send welcome email to new user"""
@@ -480,6 +251,18 @@ Building your learning repository, one episode at a time
         except Exception as e:
             return False
     
+    def _build_message(self, to_email: str, subject: str, html_content: str, text_content: str) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.smtp_config['from_email']
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
+        
+        # Attach text and HTML versions
+        msg.attach(MIMEText(text_content, 'plain', 'utf-8'))
+        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+        return msg
+    
     def _send_email(
         self, 
         to_email: str, 
@@ -487,41 +270,17 @@ Building your learning repository, one episode at a time
         html_content: str, 
         text_content: str
     ) -> bool:
-        """Send email using SMTP"""
-        try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.smtp_config['from_email']
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            msg['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
-            
-            # Attach text and HTML versions
-            text_part = MIMEText(text_content, 'plain', 'utf-8')
-            html_part = MIMEText(html_content, 'html', 'utf-8')
-            
-            msg.attach(text_part)
-            msg.attach(html_part)
-            
-            # Send email
-            server = smtplib.SMTP(self.smtp_config['host'], self.smtp_config['port'])
-            
-            if self.smtp_config['use_tls']:
-                server.starttls()
-            
-            server.login(self.smtp_config['username'], self.smtp_config['password'])
-            server.send_message(msg)
-            server.quit()
-            
-            return True
-            
-        except Exception as e:
-            print(f"Failed to send email: {str(e)}")
-            return False
+        """Send email over the pooled SMTP connections (with retries)"""
+        outcome = self.smtp_pool.send(self._build_message(to_email, subject, html_content, text_content))
+        if not outcome["success"]:
+            print(f"Failed to send email: {outcome['error']}")
+        return outcome["success"]
     
     def send_weekly_digests_to_all_users(self, db: Session) -> Dict[str, Any]:
         """Send weekly digests to all active users"""
         users = self.user_service.get_active_users(db)
+        week_ago = datetime.now() - timedelta(days=7)
+        digest_data = self.load_weekly_digest_data(db, [user.id for user in users], week_ago)
         
         results = {
             "total_users": len(users),
@@ -531,18 +290,32 @@ Building your learning repository, one episode at a time
             "errors": []
         }
         
+        # Render everything before the first send: logging commits, and a commit
+        # expires the prefetched rows, which would bring back per-row reloads
+        rendered_digests = []
         for user in users:
             try:
-                result = self.send_weekly_digest(db, user.id)
-                if result["success"]:
-                    results["sent_successfully"] += 1
-                elif "No content available" in result.get("error", ""):
-                    results["no_content"] += 1
+                content = self.create_weekly_digest_content(db, user, digest_data[user.id], week_ago)
+                if content:
+                    rendered_digests.append(self.render_weekly_digest(content))
                 else:
-                    results["failed"] += 1
-                    results["errors"].append(f"User {user.email}: {result.get('error', 'Unknown error')}")
+                    results["no_content"] += 1
             except Exception as e:
                 results["failed"] += 1
                 results["errors"].append(f"User {user.email}: {str(e)}")
         
-        return results
\ No newline at end of file
+        # Send concurrently over the SMTP pool, then log every outcome in one commit
+        outcomes = self.smtp_pool.send_many([
+            self._build_message(r["email"], r["subject"], r["html_content"], r["text_content"])
+            for r in rendered_digests
+        ])
+        for rendered, outcome in zip(rendered_digests, outcomes):
+            self._log_digest_outcome(db, rendered, outcome, commit=False)
+            if outcome["success"]:
+                results["sent_successfully"] += 1
+            else:
+                results["failed"] += 1
+                results["errors"].append(f"User {rendered['email']}: {outcome['error']}")
+        db.commit()
+        
+        return results
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from app.models import Podcast, Episode
 from app.schemas import PodcastCreate, PodcastUpdate
+from core.episode_dedup import KnownEpisodeIndex
 
 
 class PodcastService:
@@ -130,19 +131,15 @@ class PodcastService:
         if not rss_data["success"]:
             return rss_data
         
-        new_episodes = 0
-        for episode_data in rss_data["episodes"]:
-            # Check if episode already exists
-            existing = db.query(Episode).filter(
-                Episode.podcast_id == podcast.id,
-                Episode.guid == episode_data["guid"]
-            ).first()
-            
-            if existing:
-                continue
-            
-            # Create new episode
-            episode = Episode(
+        # Load known keys once and diff the whole feed in memory
+        known = KnownEpisodeIndex(
+            db.query(Episode.id, Episode.guid, Episode.audio_url, Episode.title)
+            .filter(Episode.podcast_id == podcast.id)
+            .all()
+        )
+        
+        new_episodes = [
+            Episode(
                 podcast_id=podcast.id,
                 title=episode_data["title"],
                 audio_url=episode_data["audio_url"],
@@ -152,9 +149,9 @@ class PodcastService:
                 guid=episode_data["guid"],
                 transcript_status="pending"
             )
-            
-            db.add(episode)
-            new_episodes += 1
+            for episode_data in known.diff(rss_data["episodes"])
+        ]
+        db.add_all(new_episodes)
         
         # Update last checked timestamp
         podcast.last_checked = datetime.now()
@@ -163,7 +160,7 @@ class PodcastService:
         
         return {
             "success": True,
-            "new_episodes": new_episodes,
+            "new_episodes": len(new_episodes),
             "total_episodes": len(rss_data["episodes"])
         }
     
@@ -0,0 +1,305 @@
+"""
+Full-text search over transcripts, analyses, key quotes and knowledge base notes
+SQLite uses an FTS5 table kept in sync by triggers; PostgreSQL uses generated
+tsvector columns with GIN indexes. Both are created by Alembic revision 0004;
+SQLite pipeline databases that are not under Alembic get the index on first search
+"""
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core import transcript_store
+
+DOC_TYPES = ("transcript", "analysis", "kb_note")
+
+# rowid = source id * 4 + code keeps one FTS row per source row, so updates and deletes are point lookups.
+# Triggers only use plain SQL so any writer (Alembic, sqlite3, other tools) can touch these tables
+SQLITE_SOURCES = [
+    {
+        # Compressed transcripts are queued in search_pending and decoded in Python at search time
+        "code": 0, "doc_type": "transcript", "table": "transcripts",
+        "required": ["transcript_text", "compressed_text", "compression"],
+        "episode_id": "{row}.episode_id", "user_id": "NULL",
+        "title": "(SELECT title FROM episodes WHERE id = {row}.episode_id)",
+        "body": ["transcript_text", "compressed_text", "compression"],
+        "body_sql": "coalesce({row}.transcript_text, '')",
+        "when": "({row}.transcript_text != '' OR {row}.compressed_text IS NOT NULL)",
+        "pending": "{row}.compressed_text IS NOT NULL",
+    },
+    {
+        # Raw pipeline databases keep the transcript on the episode row
+        "code": 1, "doc_type": "transcript", "table": "episodes", "required": ["transcript"],
+        "episode_id": "{row}.id", "user_id": "NULL", "title": "{row}.title",
+        "body": ["transcript"], "when": "{row}.transcript IS NOT NULL AND {row}.transcript != ''",
+    },
+    {
+        "code": 2, "doc_type": "analysis", "table": "analysis_reports", "required": ["analysis_result"],
+        "episode_id": "{row}.episode_id", "user_id": "{row}.user_id",
+        "title": "(SELECT title FROM episodes WHERE id = {row}.episode_id)",
+        "body": ["analysis_result", "key_quote"], "when": "1",
+    },
+    {
+        "code": 3, "doc_type": "kb_note", "table": "knowledge_base_entries", "required": ["key_insights"],
+        "episode_id": "(SELECT episode_id FROM analysis_reports WHERE id = {row}.analysis_report_id)",
+        "user_id": "{row}.user_id", "title": "{row}.entry_title",
+        "body": ["key_insights", "personal_notes", "tags"], "when": "1",
+    },
+]
+
+POSTGRES_SOURCES = {
+    "transcripts": "to_tsvector('english', coalesce(transcript_text, ''))",
+    "analysis_reports": "to_tsvector('english', coalesce(analysis_result, '') || ' ' || coalesce(key_quote, ''))",
+    "knowledge_base_entries": (
+        "setweight(to_tsvector('english', coalesce(entry_title, '')), 'A') || "
+        "to_tsvector('english', coalesce(key_insights, '') || ' ' || coalesce(personal_notes, '') || ' ' || coalesce(tags, ''))"
+    ),
+}
+
+INSERT_COLUMNS = "INSERT INTO search_index(rowid, doc_type, source_id, episode_id, user_id, title, body)"
+PENDING_BATCH = 100
+
+
+def _table_columns(conn, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(text(f"PRAGMA table_info({table})")).fetchall()]
+
+
+def _sqlite_select(source: Dict[str, Any], columns: List[str], row: str) -> str:
+    if "body_sql" in source:
+        body = source["body_sql"].format(row=row)
+    else:
+        body_columns = [column for column in source["body"] if column in columns]
+        body = " || char(10) || ".join(f"coalesce({row}.{column}, '')" for column in body_columns)
+    return (
+        f"SELECT {row}.id * 4 + {source['code']}, '{source['doc_type']}', {row}.id, "
+        f"{source['episode_id'].format(row=row)}, {source['user_id'].format(row=row)}, "
+        f"{source['title'].format(row=row)}, {body}"
+    )
+
+
+def create_sqlite_index(conn):
+    """Create the FTS5 index, its sync triggers and backfill it (conn: Connection or Session)"""
+    conn.execute(text("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title, body,
+            doc_type UNINDEXED, source_id UNINDEXED, episode_id UNINDEXED, user_id UNINDEXED,
+            tokenize = 'porter unicode61'
+        )
+    """))
+    conn.execute(text("CREATE TABLE IF NOT EXISTS search_pending (rowid INTEGER PRIMARY KEY)"))
+    backfill = conn.execute(text("SELECT count(*) FROM search_index")).scalar() == 0
+
+    for source in SQLITE_SOURCES:
+        table = source["table"]
+        columns = _table_columns(conn, table)
+        if not all(column in columns for column in source["required"]):
+            continue
+
+        new_select = f"{_sqlite_select(source, columns, 'NEW')} WHERE {source['when'].format(row='NEW')}"
+        delete_old = f"DELETE FROM search_index WHERE rowid = OLD.id * 4 + {source['code']}"
+        if "pending" in source:
+            new_select += (
+                f"; INSERT OR IGNORE INTO search_pending(rowid) SELECT NEW.id * 4 + {source['code']} "
+                f"WHERE {source['pending'].format(row='NEW')}"
+            )
+            delete_old += f"; DELETE FROM search_pending WHERE rowid = OLD.id * 4 + {source['code']}"
+        watched = ", ".join(column for column in source["body"] if column in columns)
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_ai AFTER INSERT ON {table} "
+            f"BEGIN {INSERT_COLUMNS} {new_select}; END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_au AFTER UPDATE OF {watched} ON {table} "
+            f"BEGIN {delete_old}; {INSERT_COLUMNS} {new_select}; END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_ad AFTER DELETE ON {table} "
+            f"BEGIN {delete_old}; END"
+        ))
+
+        if backfill:
+            conn.execute(text(
+                f"{INSERT_COLUMNS} {_sqlite_select(source, columns, 't')} "
+                f"FROM {table} t WHERE {source['when'].format(row='t')}"
+            ))
+            if "pending" in source:
+                conn.execute(text(
+                    f"INSERT OR IGNORE INTO search_pending(rowid) SELECT t.id * 4 + {source['code']} "
+                    f"FROM {table} t WHERE {source['pending'].format(row='t')}"
+                ))
+
+
+def drop_sqlite_index(conn):
+    conn.execute(text("DROP TABLE IF EXISTS search_index"))
+    conn.execute(text("DROP TABLE IF EXISTS search_pending"))
+    for source in SQLITE_SOURCES:
+        for suffix in ("ai", "au", "ad"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS search_{source['table']}_{suffix}"))
+
+
+def create_postgres_index(conn):
+    for table, vector in POSTGRES_SOURCES.items():
+        conn.execute(text(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({vector}) STORED"
+        ))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"
+        ))
+
+
+def drop_postgres_index(conn):
+    for table in POSTGRES_SOURCES:
+        conn.execute(text(f"DROP INDEX IF EXISTS ix_{table}_search_vector"))
+        conn.execute(text(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector"))
+
+
+_prepared_engines = set()
+
+
+class SearchService:
+    def is_sqlite(self, db: Session) -> bool:
+        return db.get_bind().dialect.name == "sqlite"
+
+    def ensure_index(self, db: Session):
+        """Check the search index once per engine; only unmigrated SQLite databases get DDL here"""
+        key = str(db.get_bind().url)
+        if key in _prepared_engines:
+            return
+        if self.is_sqlite(db):
+            if db.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'search_pending'")).first() is None:
+                create_sqlite_index(db)
+                db.commit()
+        elif db.execute(text(
+            "SELECT 1 FROM information_schema.columns WHERE table_name = 'transcripts' AND column_name = 'search_vector'"
+        )).first() is None:
+            raise RuntimeError("Search columns are missing; run `alembic upgrade head`")
+        _prepared_engines.add(key)
+
+    def index_pending(self, db: Session) -> int:
+        """Fill in the bodies of compressed transcripts queued by the SQLite triggers"""
+        indexed = 0
+        while True:
+            rowids = [row[0] for row in db.execute(
+                text("SELECT rowid FROM search_pending LIMIT :limit"), {"limit": PENDING_BATCH}
+            ).fetchall()]
+            if not rowids:
+                break
+            for rowid in rowids:
+                row = db.execute(
+                    text("SELECT compression, transcript_text, compressed_text FROM transcripts WHERE id = :id"),
+                    {"id": rowid // 4}
+                ).first()
+                if row is not None:
+                    body = transcript_store.decode(row[0], row[1], row[2]) or ""
+                    db.execute(text("UPDATE search_index SET body = :body WHERE rowid = :rowid"),
+                               {"body": body, "rowid": rowid})
+                db.execute(text("DELETE FROM search_pending WHERE rowid = :rowid"), {"rowid": rowid})
+            db.commit()
+            indexed += len(rowids)
+        return indexed
+
+    def rebuild_index(self, db: Session) -> Dict[str, Any]:
+        """Drop and repopulate the SQLite index (PostgreSQL vectors are always current)"""
+        if not self.is_sqlite(db):
+            return {"success": True, "rebuilt": False}
+        drop_sqlite_index(db)
+        create_sqlite_index(db)
+        db.commit()
+        self.index_pending(db)
+        _prepared_engines.add(str(db.get_bind().url))
+        return {"success": True, "rebuilt": True}
+
+    @staticmethod
+    def to_fts_query(query: str) -> str:
+        """Quote each term so user input is never parsed as FTS5 syntax"""
+        return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+    def search(
+        self,
+        db: Session,
+        user_id: int,
+        query: str,
+        doc_type: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """Ranked, snippet-highlighted search across the user's analyses and notes and all transcripts"""
+        if not query.strip():
+            return {"query": query, "results": [], "skip": skip, "limit": limit, "has_more": False}
+        self.ensure_index(db)
+
+        params = {"user_id": user_id, "skip": skip, "limit": limit + 1}
+        if self.is_sqlite(db):
+            self.index_pending(db)
+            rows = self._search_sqlite(db, query, doc_type, params)
+        else:
+            rows = self._search_postgres(db, query, doc_type, params)
+
+        results = [dict(row._mapping) for row in rows]
+        return {
+            "query": query,
+            "results": results[:limit],
+            "skip": skip,
+            "limit": limit,
+            "has_more": len(results) > limit,
+        }
+
+    def _search_sqlite(self, db: Session, query: str, doc_type: Optional[str], params: Dict[str, Any]):
+        params["query"] = self.to_fts_query(query)
+        type_filter = ""
+        if doc_type:
+            type_filter = "AND doc_type = :doc_type"
+            params["doc_type"] = doc_type
+        return db.execute(text(f"""
+            SELECT doc_type, source_id, episode_id, title,
+                   snippet(search_index, 1, '<mark>', '</mark>', '…', 24) AS snippet,
+                   -bm25(search_index, 5.0, 1.0) AS score
+            FROM search_index
+            WHERE search_index MATCH :query
+            AND (user_id IS NULL OR user_id = :user_id)
+            {type_filter}
+            ORDER BY bm25(search_index, 5.0, 1.0)
+            LIMIT :limit OFFSET :skip
+        """), params).fetchall()
+
+    def _search_postgres(self, db: Session, query: str, doc_type: Optional[str], params: Dict[str, Any]):
+        params["query"] = query
+        parts = {
+            "transcript": """
+                SELECT 'transcript' AS doc_type, t.id AS source_id, t.episode_id, e.title,
+                       t.transcript_text AS body, ts_rank_cd(t.search_vector, q.query) AS score
+                FROM transcripts t JOIN episodes e ON e.id = t.episode_id, q
+                WHERE t.search_vector @@ q.query
+            """,
+            "analysis": """
+                SELECT 'analysis', a.id, a.episode_id, e.title,
+                       a.analysis_result || ' ' || coalesce(a.key_quote, ''), ts_rank_cd(a.search_vector, q.query)
+                FROM analysis_reports a JOIN episodes e ON e.id = a.episode_id, q
+                WHERE a.user_id = :user_id AND a.search_vector @@ q.query
+            """,
+            "kb_note": """
+                SELECT 'kb_note', k.id, a.episode_id, k.entry_title,
+                       coalesce(k.key_insights, '') || ' ' || coalesce(k.personal_notes, ''),
+                       ts_rank_cd(k.search_vector, q.query)
+                FROM knowledge_base_entries k JOIN analysis_reports a ON a.id = k.analysis_report_id, q
+                WHERE k.user_id = :user_id AND k.search_vector @@ q.query
+            """,
+        }
+        selected = [sql for name, sql in parts.items() if doc_type in (None, name)]
+        if not selected:
+            return []
+        # Headlines are only generated for the page being returned
+        return db.execute(text(f"""
+            WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query),
+            ranked AS (
+                {" UNION ALL ".join(selected)}
+                ORDER BY score DESC
+                LIMIT :limit OFFSET :skip
+            )
+            SELECT ranked.doc_type, ranked.source_id, ranked.episode_id, ranked.title,
+                   ts_headline('english', ranked.body, q.query,
+                               'StartSel=<mark>, StopSel=</mark>, MaxFragments=2') AS snippet,
+                   ranked.score
+            FROM ranked, q
+            ORDER BY ranked.score DESC
+        """), params).fetchall()
@@ -0,0 +1,27 @@
+"""
+Semantic passage search backed by the local embedding index
+"""
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from core.semantic_index import SemanticIndex, is_available
+
+_index: Optional[SemanticIndex] = None
+
+
+class SemanticSearchService:
+    def get_index(self) -> SemanticIndex:
+        """Load the index once per process; search() re-reads its metadata when the pipeline appends"""
+        global _index
+        if _index is None:
+            _index = SemanticIndex(settings.semantic_index_dir)
+        return _index
+
+    def search(self, query: str, k: int = 10) -> Dict[str, Any]:
+        """Top-k transcript passages nearest to the query, with episode metadata"""
+        if not is_available():
+            return {"success": False, "error": "Semantic search requires numpy and sentence-transformers"}
+        try:
+            return {"success": True, "query": query, "results": self.get_index().search(query, k)}
+        except Exception as e:
+            return {"success": False, "error": f"Semantic search failed: {str(e)}"}
@@ -9,9 +9,12 @@ from pathlib import Path
 import requests
 import openai
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
 
-from app.models import Episode, Transcript
+from app.models import Episode, Transcript, TranscriptCacheEntry
 from app.core.config import settings
+from core.transcript_cache import fingerprint_audio
+from core import transcript_store
 
 
 class TranscriptService:
@@ -37,6 +40,39 @@ class TranscriptService:
         
         return None
     
+    def check_transcript_cache(self, db: Session, fingerprint: str) -> Optional[TranscriptCacheEntry]:
+        """Find a cached transcript for identical audio (same bytes and duration)"""
+        entry = db.query(TranscriptCacheEntry).filter(
+            TranscriptCacheEntry.fingerprint == fingerprint
+        ).first()
+        
+        if entry:
+            entry.hit_count = (entry.hit_count or 0) + 1
+            entry.last_used_at = func.now()
+        
+        return entry
+    
+    def store_transcript_cache(
+        self,
+        db: Session,
+        fingerprint: str,
+        audio_sha256: str,
+        duration_seconds: Optional[int],
+        transcript_text: str,
+        source_url: str
+    ):
+        """Record a fresh transcript under its audio fingerprint"""
+        db.merge(TranscriptCacheEntry(
+            fingerprint=fingerprint,
+            audio_sha256=audio_sha256,
+            duration_seconds=duration_seconds,
+            transcript=transcript_text,
+            model="whisper-1",
+            source_url=source_url,
+            hit_count=0
+        ))
+        db.commit()
+    
     def download_audio_file(self, audio_url: str, episode_id: int) -> Optional[str]:
         """Download audio file for transcription"""
         try:
@@ -125,10 +161,16 @@ class TranscriptService:
         word_count: int, 
         processing_time: float
     ) -> Transcript:
-        """Create transcript record"""
+        """Create transcript record, compressed per TRANSCRIPT_COMPRESSION on SQLite"""
+        # PostgreSQL already TOAST-compresses large text and its tsvector search needs the plain column
+        compression = transcript_store.DEFAULT_COMPRESSION if db.get_bind().dialect.name == "sqlite" else "none"
+        stored_text, compressed_text, compression = transcript_store.encode(transcript_text, compression)
         transcript = Transcript(
             episode_id=episode_id,
-            transcript_text=transcript_text,
+            transcript_text=stored_text,
+            compressed_text=compressed_text,
+            compression=compression,
+            char_count=len(transcript_text),
             transcription_service="whisper-1",
             word_count=word_count,
             processing_time_seconds=processing_time
@@ -166,6 +208,9 @@ class TranscriptService:
             new_transcript = Transcript(
                 episode_id=episode_id,
                 transcript_text=reusable_transcript.transcript_text,
+                compressed_text=reusable_transcript.compressed_text,
+                compression=reusable_transcript.compression,
+                char_count=reusable_transcript.char_count,
                 transcription_service=reusable_transcript.transcription_service,
                 word_count=reusable_transcript.word_count,
                 processing_time_seconds=0  # No processing time for reused transcript
@@ -198,13 +243,29 @@ class TranscriptService:
                 db.commit()
                 return {"success": False, "error": "Failed to download audio file"}
             
-            # Transcribe audio
-            transcription_result = self.transcribe_audio_file(audio_file_path)
-            
-            if not transcription_result["success"]:
-                episode.transcript_status = "failed"
-                db.commit()
-                return transcription_result
+            # Reuse a transcript of byte-identical audio (rotated CDN URLs, re-posts)
+            fingerprint, audio_sha256, duration_seconds = fingerprint_audio(audio_file_path)
+            cached = self.check_transcript_cache(db, fingerprint)
+            if cached:
+                transcription_result = {
+                    "success": True,
+                    "transcript_text": cached.transcript,
+                    "word_count": len(cached.transcript.split()),
+                    "processing_time": 0
+                }
+            else:
+                # Transcribe audio
+                transcription_result = self.transcribe_audio_file(audio_file_path)
+                
+                if not transcription_result["success"]:
+                    episode.transcript_status = "failed"
+                    db.commit()
+                    return transcription_result
+                
+                self.store_transcript_cache(
+                    db, fingerprint, audio_sha256, duration_seconds,
+                    transcription_result["transcript_text"], episode.audio_url
+                )
             
             # Create transcript record
             transcript = self.create_transcript(
@@ -232,7 +293,7 @@ class TranscriptService:
                 "transcript_id": transcript.id,
                 "word_count": transcript.word_count,
                 "processing_time": transcript.processing_time_seconds,
-                "reused": False
+                "reused": cached is not None
             }
             
         except Exception as e:
@@ -67,19 +67,25 @@ class UserService:
         email_type: str, 
         subject: str, 
         content_preview: str, 
-        status: str = "sent"
+        status: str = "sent",
+        attempts: Optional[int] = None,
+        error_message: Optional[str] = None,
+        commit: bool = True
     ):
-        """Log email delivery"""
+        """Log email delivery (commit=False lets bulk senders commit once for the batch)"""
         email_log = EmailLog(
             user_id=user_id,
             email_type=email_type,
             status=status,
             subject=subject,
-            content_preview=content_preview[:200]
+            content_preview=content_preview[:200],
+            attempts=attempts,
+            error_message=error_message
         )
         
         db.add(email_log)
-        db.commit()
+        if commit:
+            db.commit()
     
     def get_active_users(self, db: Session) -> List[User]:
         """Get all active users"""
@@ -12,7 +12,6 @@ Complete daily workflow:
 """
 import os
 import sys
-import sqlite3
 import subprocess
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -20,10 +19,12 @@ import json
 
 # Add current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from enhanced_parallel_processor import EnhancedParallelProcessor
 from google_drive_integration import GoogleDriveSync
 from email_service import EmailService
+from core.db import get_connection
 
 class EnhancedDailyAutomation:
     def __init__(self):
@@ -38,7 +39,7 @@ class EnhancedDailyAutomation:
         """Step 1: Check for new episodes in the last N days"""
         print(f"🔍 Step 1: Checking for episodes from last {days} days...")
         
-        conn = sqlite3.connect('podcast_app_v2.db')
+        conn = get_connection('podcast_app_v2.db')
         cursor = conn.cursor()
         
         cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
@@ -65,13 +66,13 @@ class EnhancedDailyAutomation:
         """Step 2: Transcribe any episodes without transcripts"""
         print("🎧 Step 2: Transcribing episodes without transcripts...")
         
-        conn = sqlite3.connect('podcast_app_v2.db')
+        conn = get_connection('podcast_app_v2.db')
         cursor = conn.cursor()
         
         cursor.execute("""
             SELECT id, title FROM episodes
             WHERE podcast_id IN (3, 6, 7, 8)
-            AND (transcript IS NULL OR transcript = '')
+            AND id NOT IN (SELECT episode_id FROM transcripts WHERE char_count > 0)
             ORDER BY pub_date DESC
             LIMIT 20
         """)
@@ -114,14 +115,13 @@ class EnhancedDailyAutomation:
         print("🧠 Step 4: Running analysis on new episodes...")
         
         # Check for episodes with transcripts but no analysis
-        conn = sqlite3.connect('podcast_app_v2.db')
+        conn = get_connection('podcast_app_v2.db')
         cursor = conn.cursor()
         
         cursor.execute("""
             SELECT COUNT(*) FROM episodes
             WHERE podcast_id IN (3, 6, 7, 8)
-            AND transcript IS NOT NULL 
-            AND transcript != ''
+            AND id IN (SELECT episode_id FROM transcripts WHERE char_count > 0)
             AND id NOT IN (SELECT episode_id FROM analysis WHERE episode_id IS NOT NULL)
         """)
         
@@ -182,7 +182,7 @@ class EnhancedDailyAutomation:
         print("📧 Step 7: Preparing daily email...")
         
         # Get today's new analysis
-        conn = sqlite3.connect('podcast_app_v2.db')
+        conn = get_connection('podcast_app_v2.db')
         cursor = conn.cursor()
         
         # Get analysis from today
@@ -6,22 +6,39 @@ Enhanced GitHub-based automated podcast system
 - Date range checking and gap filling
 """
 import os
-import sqlite3
-import smtplib
-import feedparser
+import sys
 import requests
 import tempfile
+import shutil
 import subprocess
 import json
 import openai
 import anthropic
-import re
 from datetime import datetime, date
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
 from typing import List, Dict, Any
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.audio_downloader import AudioDownloader
+from core.chunked_transcriber import (
+    ChunkedTranscriber, get_transcription_mode, prepare_audio_stage, cleanup_prepared_audio, cleanup_episode_work
+)
+from core.stage_pipeline import Stage, StagePipeline
+from core.transcript_cache import TranscriptCache, fingerprint_audio
+from core.rate_limiter import print_utilization
+from core.claude_analyzer import ClaudeAnalyzer, CONTEXT_BUDGET_TOKENS
+from core.batch_analysis import BatchAnalysisRunner
+from core.master_file_store import MasterFileStore
+from core.feed_poller import FeedPoller
+from core.episode_dedup import KnownEpisodeIndex
+from core import transcript_store
+from core.schema_indexes import ensure_indexes
+from core.smtp_pool import SMTPPool
+from core.db import get_connection, transaction
+from core.semantic_index import SemanticIndex, is_available as semantic_index_available
+
 class EnhancedPodcastSystem:
     def __init__(self):
         self.db_path = 'podcast_app_v2.db'
@@ -31,10 +48,24 @@ class EnhancedPodcastSystem:
         # Create directories
         self.master_dir.mkdir(parents=True, exist_ok=True)
         self.reports_dir.mkdir(parents=True, exist_ok=True)
+        self.master_store = MasterFileStore(self.master_dir)
+        self.prepare_transcript_store()
         
         # API clients - initialize lazily
         self.openai_client = None
         self.anthropic_client = None
+        self.transcriber = None
+        self.analyzer = None
+        self.transcript_cache = None
+        self.downloader = None
+        self.semantic_index = None
+        self.transcription_mode = get_transcription_mode()
+        
+        # Worker pool sizes for the processing pipeline
+        self.download_workers = int(os.getenv('PIPELINE_DOWNLOAD_WORKERS', '4'))
+        self.prepare_workers = int(os.getenv('PIPELINE_PREPARE_WORKERS', '2'))
+        self.transcribe_workers = int(os.getenv('PIPELINE_TRANSCRIBE_WORKERS', '3'))
+        self.analyze_workers = int(os.getenv('PIPELINE_ANALYZE_WORKERS', '3'))
         
         # Podcast name to file mapping
         self.podcast_files = {
@@ -293,7 +324,7 @@ Brief overview of the most significant AI and technology insights (2-3 sentences
             api_key = os.getenv('OPENAI_API_KEY')
             if not api_key:
                 raise ValueError("OPENAI_API_KEY environment variable is required")
-            self.openai_client = openai.OpenAI(api_key=api_key)
+            self.openai_client = openai.OpenAI(api_key=api_key, max_retries=0)  # Retries via rate limiter
         return self.openai_client
     
     def get_anthropic_client(self):
@@ -302,9 +333,52 @@ Brief overview of the most significant AI and technology insights (2-3 sentences
             api_key = os.getenv('ANTHROPIC_API_KEY')
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY environment variable is required")
-            self.anthropic_client = anthropic.Anthropic(api_key=api_key)
+            self.anthropic_client = anthropic.Anthropic(api_key=api_key, max_retries=0)  # Retries via rate limiter
         return self.anthropic_client
     
+    def get_analyzer(self):
+        """Lazy initialization of the prompt-caching Claude analyzer"""
+        if self.analyzer is None:
+            self.analyzer = ClaudeAnalyzer(self.get_anthropic_client())
+        return self.analyzer
+    
+    def get_semantic_index(self):
+        """Lazy initialization of the semantic passage index (None without numpy/sentence-transformers)"""
+        if self.semantic_index is None and semantic_index_available():
+            self.semantic_index = SemanticIndex()
+        return self.semantic_index
+    
+    def get_transcriber(self):
+        """Lazy initialization of the chunked Whisper transcriber"""
+        if self.transcriber is None:
+            self.transcriber = ChunkedTranscriber(self.get_openai_client())
+        return self.transcriber
+    
+    def get_transcript_cache(self):
+        """Lazy initialization of the audio-fingerprint transcript cache"""
+        if self.transcript_cache is None:
+            self.transcript_cache = TranscriptCache(self.db_path)
+        return self.transcript_cache
+    
+    def get_downloader(self):
+        """Lazy initialization of the pooled audio downloader"""
+        if self.downloader is None:
+            self.downloader = AudioDownloader(pool_size=self.download_workers)
+        return self.downloader
+    
+    def prepare_transcript_store(self):
+        """Create the transcripts table, move any transcripts still on episodes rows and add missing indexes"""
+        if not os.path.exists(self.db_path):
+            return
+        conn = get_connection(self.db_path)
+        moved = transcript_store.migrate_episode_transcripts(conn)
+        indexes = ensure_indexes(conn)
+        conn.close()
+        if moved:
+            print(f"📦 Moved {moved} transcripts into the transcripts table")
+        if indexes:
+            print(f"🗂️  Created indexes: {', '.join(indexes)}")
+    
     def status_check(self):
         """Check system status without processing episodes"""
         print("🔍 Unified Podcast Automation System Status")
@@ -312,13 +386,13 @@ Brief overview of the most significant AI and technology insights (2-3 sentences
         
         # Check database
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             cursor.execute("SELECT COUNT(*) FROM podcasts WHERE is_active = 1")
             active_podcasts = cursor.fetchone()[0]
             
-            cursor.execute("SELECT COUNT(*) FROM episodes WHERE transcript IS NOT NULL")
+            cursor.execute("SELECT COUNT(*) FROM transcripts")
             transcribed_episodes = cursor.fetchone()[0]
             
             print(f"📊 Active podcasts: {active_podcasts}")
@@ -383,81 +457,66 @@ Brief overview of the most significant AI and technology insights (2-3 sentences
         new_episodes = []
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get active podcasts
-            cursor.execute('''
-                SELECT id, name, rss_url 
-                FROM podcasts 
-                WHERE rss_url IS NOT NULL 
-                AND rss_url != ''
-                AND is_active = 1
-            ''')
+            conn = get_connection(self.db_path)
             
-            podcasts = cursor.fetchall()
-            print(f"📡 Checking {len(podcasts)} active podcasts")
+            # Fetch all feeds concurrently; 304s and identical bodies are never parsed
+            poller = FeedPoller(self.db_path)
+            results = poller.poll()
+            caught_up = []
             
-            for podcast_id, podcast_name, rss_url in podcasts:
+            for result in results:
+                if result['status'] != 'changed':
+                    if result['status'] != 'error':
+                        caught_up.append(result)
+                    continue
+                
+                podcast_id = result['podcast']['id']
+                podcast_name = result['podcast']['name']
+                feed = result['feed']
                 print(f"\n🎧 {podcast_name}...")
                 
-                # Parse RSS feed
-                try:
-                    headers = {'User-Agent': 'Podcast Analysis Application v2/2.0.0'}
-                    response = requests.get(rss_url, headers=headers, timeout=30)
-                    response.raise_for_status()
-                    
-                    feed = feedparser.parse(response.content)
+                # Parse the latest 3 episodes, then diff them against the known keys in one pass
+                entries = []
+                for entry in feed.entries[:3]:
+                    # Extract audio URL
+                    audio_url = None
+                    for enclosure in getattr(entry, 'enclosures', []):
+                        if hasattr(enclosure, 'type') and enclosure.type and 'audio' in enclosure.type:
+                            audio_url = enclosure.href
+                            break
                     
-                    if feed.bozo:
-                        print(f"   ❌ Invalid RSS feed")
+                    if not audio_url:
                         continue
                     
-                    # Check latest 3 episodes
-                    for entry in feed.entries[:3]:
-                        # Extract audio URL
-                        audio_url = None
-                        for enclosure in getattr(entry, 'enclosures', []):
-                            if hasattr(enclosure, 'type') and enclosure.type and 'audio' in enclosure.type:
-                                audio_url = enclosure.href
-                                break
-                        
-                        if not audio_url:
-                            continue
-                        
-                        # Parse publication date
-                        publish_date = None
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            publish_date = datetime(*entry.published_parsed[:6]).isoformat()
-                        
-                        episode_title = getattr(entry, 'title', 'Unknown Title')
-                        
-                        # Check if episode exists in database
-                        cursor.execute('''
-                            SELECT id FROM episodes 
-                            WHERE podcast_id = ? AND (guid = ? OR audio_url = ? OR title = ?)
-                        ''', (podcast_id, getattr(entry, 'id', audio_url), audio_url, episode_title))
-                        
-                        if not cursor.fetchone():
-                            # New episode!
-                            episode_data = {
-                                'podcast_id': podcast_id,
-                                'podcast_name': podcast_name,
-                                'title': episode_title,
-                                'description': getattr(entry, 'summary', ''),
-                                'audio_url': audio_url,
-                                'episode_url': getattr(entry, 'link', ''),
-                                'guid': getattr(entry, 'id', None) or audio_url,
-                                'publish_date': publish_date
-                            }
-                            new_episodes.append(episode_data)
-                            print(f"   🆕 NEW: {episode_title[:50]}...")
-                            break  # Only take first missing per podcast
-                        
-                except Exception as e:
-                    print(f"   ❌ RSS error: {e}")
-                    continue
+                    # Parse publication date
+                    publish_date = None
+                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                        publish_date = datetime(*entry.published_parsed[:6]).isoformat()
+                    
+                    entries.append({
+                        'podcast_id': podcast_id,
+                        'podcast_name': podcast_name,
+                        'title': getattr(entry, 'title', 'Unknown Title'),
+                        'description': getattr(entry, 'summary', ''),
+                        'audio_url': audio_url,
+                        'episode_url': getattr(entry, 'link', ''),
+                        'guid': getattr(entry, 'id', None) or audio_url,
+                        'publish_date': publish_date
+                    })
+                
+                missing = KnownEpisodeIndex.from_sqlite(conn, podcast_id).diff(entries)
+                found_new = bool(missing)
+                if missing:
+                    # Only take first missing per podcast
+                    new_episodes.append(missing[0])
+                    print(f"   🆕 NEW: {missing[0]['title'][:50]}...")
+                
+                # Feeds with new episodes keep their old validators so the next run re-reads them
+                if not found_new:
+                    caught_up.append(result)
             
+            poller.commit(caught_up)
+            poller.close()
             conn.close()
             
             if new_episodes:
@@ -471,41 +530,105 @@ Brief overview of the most significant AI and technology insights (2-3 sentences
             print(f"❌ RSS checking failed: {e}")
             return []
     
-    def process_new_episodes(self, episodes):
-        """Process new episodes with transcription and analysis"""
-        processed = []
+    def process_new_episodes(self, episodes, analyze=True):
+        """Process new episodes through the download → prepare → transcribe → analyze → save pipeline
+
+        With analyze=False episodes are saved without analysis for a later batch_analyze_pending run.
+        """
+        stages = [
+            Stage('download', self.download_stage, workers=self.download_workers),
+            Stage('prepare', prepare_audio_stage, workers=self.prepare_workers, use_processes=True),
+            Stage('transcribe', self.transcribe_stage, workers=self.transcribe_workers),
+        ]
+        if analyze:
+            stages.append(Stage('analyze', self.analyze_stage, workers=self.analyze_workers))
+        stages.append(Stage('save', self.save_stage, workers=1))  # Single writer for sqlite
+        # Dropped or failed episodes would otherwise leave their downloaded audio behind
+        pipeline = StagePipeline(stages, on_drop=cleanup_episode_work)
         
-        for episode in episodes:
-            try:
-                print(f"\n🔧 PROCESSING: {episode['title'][:50]}...")
-                
-                # Step 1: Download and transcribe
-                transcript = self.transcribe_episode(episode)
-                if not transcript:
-                    continue
-                
-                # Step 2: Analyze
-                analysis = self.analyze_episode(episode, transcript)
-                
-                # Step 3: Add to database
-                episode_id = self.save_to_database(episode, transcript, analysis)
-                
-                processed.append({
-                    'episode_id': episode_id,
-                    'podcast_name': episode['podcast_name'],
-                    'title': episode['title'],
-                    'date': episode.get('publish_date', '').split('T')[0] if episode.get('publish_date') else date.today().strftime('%Y-%m-%d'),
-                    'transcript': transcript,
-                    'analysis': analysis
-                })
-                
-                print(f"   ✅ Successfully processed episode {episode_id}")
-                
-            except Exception as e:
-                print(f"   ❌ Failed to process: {e}")
+        # Episodes sharing a prompt reach the analyze stage back-to-back so its cached prefix is reused
+        ordered = ClaudeAnalyzer.order_by_prompt(
+            [dict(episode) for episode in episodes],
+            lambda episode: self.get_prompt_for_podcast(episode['podcast_name'])[1]
+        )
+        
+        processed, failures = pipeline.run(ordered)
+        pipeline.print_stats()
+        print_utilization()
+        if self.analyzer:
+            self.analyzer.print_usage()
+        
+        for failure in failures:
+            print(f"   ❌ Failed to process {failure['item'].get('title', '')[:50]} ({failure['stage']}): {failure['error']}")
         
         return processed
     
+    def download_stage(self, item):
+        """Pipeline stage: download audio and check the transcript cache"""
+        print(f"\n🔧 PROCESSING: {item['title'][:50]}...")
+        work_dir = tempfile.mkdtemp(prefix='episode_')
+        try:
+            audio_path = self.get_downloader().download(item['audio_url'], os.path.join(work_dir, 'audio.mp3'))
+            if not audio_path:
+                shutil.rmtree(work_dir, ignore_errors=True)
+                return None
+            
+            fingerprint, sha256, duration_seconds = fingerprint_audio(audio_path)
+            item.update({
+                'audio_path': audio_path,
+                'work_dir': work_dir,
+                'fingerprint': (fingerprint, sha256, duration_seconds),
+                'transcript': self.get_transcript_cache().lookup(fingerprint),
+                'transcription_mode': self.transcription_mode
+            })
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        if item['transcript']:
+            print(f"   ♻️ Transcript cache hit: {item['title'][:50]}")
+        return item
+    
+    def transcribe_stage(self, item):
+        """Pipeline stage: send prepared audio to Whisper and cache the transcript"""
+        try:
+            if not item.get('transcript'):
+                print(f"   🎤 Transcribing: {item['title'][:50]}...")
+                transcript = self.get_transcriber().transcribe_segments(item['prepared_paths'])
+                if transcript:
+                    fingerprint, sha256, duration_seconds = item['fingerprint']
+                    self.get_transcript_cache().store(
+                        fingerprint, sha256, duration_seconds, transcript, source_url=item['audio_url']
+                    )
+                item['transcript'] = transcript
+        finally:
+            cleanup_prepared_audio(item['audio_path'], item.get('prepared_paths'))
+            shutil.rmtree(item['work_dir'], ignore_errors=True)
+        
+        if not item['transcript'] or len(item['transcript']) < 100:
+            print(f"   ❌ Transcript too short: {item['title'][:50]}")
+            return None
+        
+        print(f"   ✅ Transcribed: {len(item['transcript'])} characters")
+        return item
+    
+    def analyze_stage(self, item):
+        """Pipeline stage: run the podcast-specific analysis"""
+        item['analysis'] = self.analyze_episode(item, item['transcript'])
+        return item
+    
+    def save_stage(self, item):
+        """Pipeline stage: persist the episode and build the processed record"""
+        episode_id = self.save_to_database(item, item['transcript'], item.get('analysis'))
+        print(f"   ✅ Successfully processed episode {episode_id}")
+        return {
+            'episode_id': episode_id,
+            'podcast_name': item['podcast_name'],
+            'title': item['title'],
+            'date': item.get('publish_date', '').split('T')[0] if item.get('publish_date') else date.today().strftime('%Y-%m-%d'),
+            'transcript': item['transcript'],
+            'analysis': item.get('analysis')
+        }
+    
     def transcribe_episode(self, episode):
         """Download audio and transcribe"""
         try:
@@ -520,27 +643,16 @@ Brief overview of the most significant AI and technology insights (2-3 sentences
                         temp_file.write(chunk)
                 audio_path = temp_file.name
             
-            # Check file size and compress if needed
-            file_size = os.path.getsize(audio_path)
-            if file_size > 25 * 1024 * 1024:  # 25MB limit
-                print("   🗜️ Compressing audio...")
-                compressed_path = self.compress_audio(audio_path)
-                if compressed_path:
-                    audio_path = compressed_path
-                else:
-                    os.unlink(audio_path)
-                    return None
-            
-            # Transcribe
-            print("   🎤 Transcribing...")
-            with open(audio_path, 'rb') as audio_file:
-                transcript = self.get_openai_client().audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
+            # Reuse a cached transcript of identical audio, otherwise transcribe
+            try:
+                transcript = self.get_transcript_cache().get_or_transcribe(
+                    audio_path, self.transcribe_audio_file, source_url=episode['audio_url']
                 )
+            finally:
+                os.unlink(audio_path)
             
-            os.unlink(audio_path)
+            if not transcript:
+                return None
             
             if len(transcript) < 100:
                 print("   ❌ Transcript too short")
@@ -553,6 +665,25 @@ Brief overview of the most significant AI and technology insights (2-3 sentences
             print(f"   ❌ Transcription failed: {e}")
             return None
     
+    def transcribe_audio_file(self, audio_path):
+        """Transcribe a downloaded file, chunking or compressing long audio"""
+        print("   🎤 Transcribing...")
+        if self.transcription_mode == 'chunked':
+            return self.get_transcriber().transcribe(audio_path)
+        
+        # Check file size and compress if needed
+        if os.path.getsize(audio_path) <= 25 * 1024 * 1024:  # 25MB limit
+            return self.get_transcriber().transcribe_file(audio_path)
+        
+        print("   🗜️ Compressing audio...")
+        compressed_path = self.compress_audio(audio_path)
+        if not compressed_path:
+            return None
+        try:
+            return self.get_transcriber().transcribe_file(compressed_path)
+        finally:
+            os.unlink(compressed_path)
+    
     def compress_audio(self, input_path):
         """Compress audio file using ffmpeg"""
         try:
@@ -577,13 +708,37 @@ Brief overview of the most significant AI and technology insights (2-3 sentences
             ]
             
             subprocess.run(compress_cmd, capture_output=True, check=True)
-            os.unlink(input_path)
             return output_path
             
         except Exception as e:
             print(f"   ❌ Compression failed: {e}")
             return None
     
+    def build_analysis_request(self, episode, transcript):
+        """Return (system prompt, user prompt) for an episode"""
+        prompt, _ = self.get_prompt_for_podcast(episode['podcast_name'])
+        # A batch request cannot map-reduce; trim to the context budget like the parallel processor
+        if len(transcript) > CONTEXT_BUDGET_TOKENS * 4:
+            print(f"   ✂️ Trimming {episode['title'][:50]} to the {CONTEXT_BUDGET_TOKENS}-token context budget")
+            transcript = transcript[:CONTEXT_BUDGET_TOKENS * 4]
+        user_prompt = f"""Podcast: {episode['podcast_name']}
+Episode: {episode['title']}
+Published: {episode.get('publish_date') or 'Unknown'}
+
+TRANSCRIPT:
+{transcript}"""
+        return prompt, user_prompt
+    
+    def batch_analyze_pending(self, episode_ids=None):
+        """Analyze transcribed-but-unanalyzed episodes through the Message Batches API"""
+        runner = BatchAnalysisRunner(
+            self.get_anthropic_client(),
+            self.db_path,
+            user_id=1,
+            build_request=lambda episode: self.build_analysis_request(episode, episode['transcript'])
+        )
+        return runner.run(episode_ids)
+    
     def analyze_episode(self, episode, transcript):
         """Analyze episode with appropriate prompt"""
         try:
@@ -593,21 +748,11 @@ Brief overview of the most significant AI and technology insights (2-3 sentences
             prompt, prompt_type = self.get_prompt_for_podcast(episode['podcast_name'])
             print(f"   📊 Using {prompt_type} prompt")
             
-            user_prompt = f"""Podcast: {episode['podcast_name']}
+            # Long transcripts are summarized in sections before the specialized prompt runs
+            header = f"""Podcast: {episode['podcast_name']}
 Episode: {episode['title']}
-Published: {episode.get('publish_date', 'Unknown')}
-
-TRANSCRIPT:
-{transcript}"""
-            
-            response = self.get_anthropic_client().messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=4000,
-                system=prompt,
-                messages=[{"role": "user", "content": user_prompt}]
-            )
-            
-            analysis = response.content[0].text
+Published: {episode.get('publish_date', 'Unknown')}"""
+            analysis = self.get_analyzer().analyze_transcript(prompt, header, transcript)
             print(f"   ✅ Analysis complete: {len(analysis)} characters")
             return analysis
             
@@ -616,46 +761,57 @@ TRANSCRIPT:
             return f"Analysis failed: {str(e)}"
     
     def save_to_database(self, episode, transcript, analysis):
-        """Save episode to database"""
+        """Save episode, transcript and analysis in one transaction"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Insert episode
-            cursor.execute('''
-                INSERT INTO episodes (
-                    podcast_id, title, audio_url, publish_date, 
-                    description, episode_url, guid, transcript, transcribed, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
-            ''', (
-                episode['podcast_id'],
-                episode['title'],
-                episode['audio_url'],
-                episode.get('publish_date'),
-                episode.get('description', ''),
-                episode.get('episode_url', ''),
-                episode.get('guid', episode['audio_url']),
-                transcript,
-                datetime.now().isoformat()
-            ))
-            
-            episode_id = cursor.lastrowid
-            
-            # Save analysis
-            cursor.execute("""
-                INSERT INTO analysis_reports (episode_id, user_id, analysis_result, key_quote, reading_time_minutes, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (episode_id, 1, analysis, "", max(1, len(analysis.split()) // 200), datetime.now().isoformat()))
-            
-            conn.commit()
-            conn.close()
-            
+            with transaction(self.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # Insert episode
+                cursor.execute('''
+                    INSERT INTO episodes (
+                        podcast_id, title, audio_url, publish_date, 
+                        description, episode_url, guid, transcribed, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+                ''', (
+                    episode['podcast_id'],
+                    episode['title'],
+                    episode['audio_url'],
+                    episode.get('publish_date'),
+                    episode.get('description', ''),
+                    episode.get('episode_url', ''),
+                    episode.get('guid', episode['audio_url']),
+                    datetime.now().isoformat()
+                ))
+                
+                episode_id = cursor.lastrowid
+                transcript_store.save(conn, episode_id, transcript)
+                
+                # Save analysis (deferred to a batch job when None)
+                if analysis is not None:
+                    cursor.execute("""
+                        INSERT INTO analysis_reports (episode_id, user_id, analysis_result, key_quote, reading_time_minutes, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (episode_id, 1, analysis, "", max(1, len(analysis.split()) // 200), datetime.now().isoformat()))
+            
+            self.index_episode_passages(episode_id, episode, transcript)
             return episode_id
             
         except Exception as e:
             print(f"   ❌ Database save failed: {e}")
             return None
     
+    def index_episode_passages(self, episode_id, episode, transcript):
+        """Append the new episode's passages to the semantic index"""
+        try:
+            index = self.get_semantic_index()
+            if index:
+                added = index.add_episode(
+                    episode_id, transcript, episode['title'], episode['podcast_name'], episode.get('publish_date')
+                )
+                print(f"   🧭 Semantic index: {added} passages added")
+        except Exception as e:
+            print(f"   ⚠️  Semantic indexing failed: {e}")
+    
     def append_to_master_files(self, processed_episodes):
         """Append new episodes to master files"""
         for episode in processed_episodes:
@@ -675,64 +831,10 @@ TRANSCRIPT:
             print(f"   ⚠️  No master file configured for: {podcast_name}")
             return
         
-        filepath = self.master_dir / filename
-        
-        # Create new episode content
-        episode_content = f"""## {episode['date']}
-
-### {episode['title']}
-**Publication Date:** {episode['date']}T00:00:00
-**Episode ID:** {episode['episode_id']}
-
-**Full Transcript:**
-{episode['transcript']}
-
----
-
-"""
-        
-        if filepath.exists():
-            # Read existing file
-            with open(filepath, 'r', encoding='utf-8') as f:
-                existing_content = f.read()
-            
-            # Find insertion point (after header, before first episode)
-            header_end = existing_content.find("---\n\n")
-            if header_end != -1:
-                header_part = existing_content[:header_end + 5]
-                episodes_part = existing_content[header_end + 5:]
-                
-                # Insert new episode at top
-                new_content = header_part + episode_content + episodes_part
-                
-                # Update episode count in header
-                episode_count_match = re.search(r'\*\*Total Episodes:\*\* (\d+)', header_part)
-                if episode_count_match:
-                    current_count = int(episode_count_match.group(1))
-                    new_count = current_count + 1
-                    new_content = new_content.replace(
-                        f"**Total Episodes:** {current_count}",
-                        f"**Total Episodes:** {new_count}"
-                    )
-            else:
-                # Fallback: append at end
-                new_content = existing_content + episode_content
-        else:
-            # Create new file
-            new_content = f"""# {podcast_name} - Master Transcripts
-
-**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-**Total Episodes:** 1
-
-Episodes organized by publication date (newest first).
-
----
-
-{episode_content}"""
-        
-        # Save updated file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        # Appends to the end of the file; newest-first order is restored on compaction
+        self.master_store.append(
+            filename, podcast_name, episode['episode_id'], episode['date'], episode['title'], episode['transcript']
+        )
     
     def send_email_report_complete(self, episodes_found, episodes_processed, processed_episodes=None):
         """Send automation report email with episode analysis summaries"""
@@ -770,7 +872,7 @@ Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                         body += f"📅 {episode['date']}\n\n"
                         
                         # Include the analysis
-                        analysis = episode.get('analysis', 'No analysis available')
+                        analysis = episode.get('analysis') or 'No analysis available'
                         
                         body += f"{analysis}\n\n"
                         body += "="*80 + "\n\n"
@@ -807,11 +909,11 @@ All podcasts are up to date.
             
             msg.attach(MIMEText(body, 'plain'))
             
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, recipient_email, msg.as_string())
-            server.quit()
+            with SMTPPool('smtp.gmail.com', 587, sender_email, sender_password, pool_size=1) as smtp_pool:
+                outcome = smtp_pool.send(msg)
+            if not outcome['success']:
+                print(f"❌ Email failed after {outcome['attempts']} attempts: {outcome['error']}")
+                return
             
             print(f"✅ Email report sent to {recipient_email}")
             
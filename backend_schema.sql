@@ -36,14 +36,14 @@ CREATE TABLE IF NOT EXISTS user_subscriptions (
     UNIQUE(user_id, podcast_id)
 );
 
--- Episodes table - stores episode metadata and transcripts
+-- Episodes table - stores episode metadata (transcripts live in the transcripts table)
 CREATE TABLE IF NOT EXISTS episodes (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     podcast_id INTEGER NOT NULL,
     title TEXT NOT NULL,
     description TEXT,
     audio_url TEXT,
-    transcript TEXT,  -- Full transcript stored here
+    transcript TEXT,  -- Legacy; moved to transcripts by core/transcript_store.migrate_episode_transcripts
     pub_date TIMESTAMP,
     duration INTEGER,  -- Duration in seconds
     processed_at TIMESTAMP,  -- When transcription/analysis was completed
@@ -51,6 +51,24 @@ CREATE TABLE IF NOT EXISTS episodes (
     FOREIGN KEY (podcast_id) REFERENCES podcasts(id) ON DELETE CASCADE
 );
 
+-- Transcripts - one row per episode (core/transcript_store.py)
+-- Text is either plain in transcript_text (compression = 'none') or zlib/zstd-compressed in
+-- compressed_text; read it with decode_transcript(compression, transcript_text, compressed_text)
+-- (transcript_store.TRANSCRIPT_TEXT_SQL). Length checks use char_count without decoding.
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    episode_id INTEGER NOT NULL UNIQUE,
+    transcript_text TEXT NOT NULL DEFAULT '',  -- Empty when compressed
+    compressed_text BLOB,
+    compression TEXT NOT NULL DEFAULT 'none',  -- none, zlib, zstd
+    char_count INTEGER,  -- Length of the decoded text
+    word_count INTEGER,
+    transcription_service TEXT DEFAULT 'whisper-1',
+    processing_time_seconds REAL,
+    created_at TIMESTAMP,
+    FOREIGN KEY (episode_id) REFERENCES episodes(id) ON DELETE CASCADE
+);
+
 -- Analysis reports - AI-generated analysis for each user
 CREATE TABLE IF NOT EXISTS analysis_reports (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -109,6 +127,7 @@ CREATE TABLE IF NOT EXISTS processing_queue (
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_episodes_podcast_date ON episodes(podcast_id, pub_date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transcripts_episode ON transcripts(episode_id);
 CREATE INDEX IF NOT EXISTS idx_analysis_user_date ON analysis_reports(user_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_knowledge_user_date_topic ON knowledge_base_entries(user_id, entry_date, topic_category);
 CREATE INDEX IF NOT EXISTS idx_subscriptions_active ON user_subscriptions(user_id, is_active);
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Resumable audio downloader with pooled HTTP sessions
+Streams episodes to disk in large chunks, resumes partial files with HTTP Range
+requests and records ETag/Content-Length so unchanged files are never re-fetched
+"""
+import os
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CHUNK_SIZE = int(os.getenv('AUDIO_DOWNLOAD_CHUNK_SIZE', str(1024 * 1024)))  # 1 MB
+DEFAULT_MAX_RETRIES = int(os.getenv('AUDIO_DOWNLOAD_RETRIES', '3'))
+USER_AGENT = 'Mozilla/5.0 (compatible; PodcastProcessor/1.0)'
+
+
+class AudioDownloader:
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, max_retries: int = DEFAULT_MAX_RETRIES,
+                 pool_size: int = 8, timeout: int = 60):
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, url: str) -> requests.Session:
+        """Return the pooled session for the URL's host, creating it on first use"""
+        host = urlparse(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({'User-Agent': USER_AGENT})
+                self._sessions[host] = session
+            return session
+
+    def close(self):
+        """Close all pooled sessions"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    @staticmethod
+    def _meta_path(dest_path: Path) -> Path:
+        return dest_path.with_name(dest_path.name + '.meta.json')
+
+    @staticmethod
+    def _part_path(dest_path: Path) -> Path:
+        return dest_path.with_name(dest_path.name + '.part')
+
+    def _load_meta(self, dest_path: Path) -> Dict:
+        meta_path = self._meta_path(dest_path)
+        if not meta_path.exists():
+            return {}
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self, dest_path: Path, meta: Dict):
+        with open(self._meta_path(dest_path), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def _is_unchanged(self, url: str, dest_path: Path, meta: Dict) -> bool:
+        """Check a completed download against the recorded ETag/Content-Length"""
+        if not dest_path.exists() or not meta.get('complete'):
+            return False
+
+        size = dest_path.stat().st_size
+        if meta.get('content_length') and meta['content_length'] != size:
+            return False
+        if meta.get('url') == url:
+            return True
+
+        # Same file served from a rotated URL - confirm with a HEAD request
+        try:
+            response = self.get_session(url).head(url, allow_redirects=True, timeout=self.timeout)
+            if response.status_code >= 400:
+                return False
+            etag = response.headers.get('ETag')
+            length = response.headers.get('Content-Length')
+            if etag and meta.get('etag'):
+                return etag == meta['etag']
+            return bool(length) and int(length) == size
+        except requests.RequestException:
+            return False
+
+    def download(self, url: str, dest_path) -> Optional[str]:
+        """Download url to dest_path, resuming partial downloads. Returns the path or None"""
+        dest_path = Path(dest_path)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = self._part_path(dest_path)
+        meta = self._load_meta(dest_path)
+
+        if self._is_unchanged(url, dest_path, meta):
+            print(f"   ♻️ Using cached audio ({dest_path.stat().st_size / (1024 * 1024):.1f}MB)")
+            return str(dest_path)
+
+        # Legacy download from before metadata was recorded - treat as complete
+        if dest_path.exists() and not meta:
+            self._save_meta(dest_path, {
+                'url': url,
+                'content_length': dest_path.stat().st_size,
+                'complete': True
+            })
+            return str(dest_path)
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                if self._fetch(url, dest_path, part_path, meta):
+                    return str(dest_path)
+                meta = self._load_meta(dest_path)
+            except (requests.RequestException, OSError) as e:
+                print(f"   ⚠️ Download attempt {attempt}/{self.max_retries} failed: {e}")
+                meta = self._load_meta(dest_path)
+                if attempt < self.max_retries:
+                    time.sleep(2 ** attempt)
+
+        print(f"   ❌ Download failed after {self.max_retries} attempts")
+        return None
+
+    def _fetch(self, url: str, dest_path: Path, part_path: Path, meta: Dict) -> bool:
+        session = self.get_session(url)
+        headers = {}
+        offset = part_path.stat().st_size if part_path.exists() else 0
+
+        if offset and meta.get('url') == url:
+            headers['Range'] = f'bytes={offset}-'
+            # Only resume if the server still has the same representation
+            if meta.get('etag'):
+                headers['If-Range'] = meta['etag']
+            elif meta.get('last_modified'):
+                headers['If-Range'] = meta['last_modified']
+        else:
+            offset = 0
+
+        with session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416:
+                # Range past the end - the partial file is already complete or stale
+                part_path.unlink()
+                return False
+            response.raise_for_status()
+
+            if response.status_code == 206:
+                mode = 'ab'
+                print(f"   ⏩ Resuming download at {offset / (1024 * 1024):.1f}MB")
+            else:
+                mode = 'wb'
+                offset = 0
+
+            content_length = response.headers.get('Content-Length')
+            total_size = offset + int(content_length) if content_length else None
+            meta = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content_length': total_size,
+                'complete': False
+            }
+            self._save_meta(dest_path, meta)
+
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        f.write(chunk)
+
+        written = part_path.stat().st_size
+        if total_size and written < total_size:
+            raise requests.ConnectionError(f"incomplete download ({written}/{total_size} bytes)")
+
+        os.replace(part_path, dest_path)
+        meta['content_length'] = written
+        meta['complete'] = True
+        self._save_meta(dest_path, meta)
+        return True
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Message Batches submission mode for bulk historical analysis
+Packages pending analyses into one provider batch job, persists the batch ID,
+polls until it ends and writes results into analysis_reports idempotently
+"""
+import json
+import time
+import sqlite3
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core import transcript_store
+from core.db import get_connection
+from core.claude_analyzer import ClaudeAnalyzer, DEFAULT_MODEL
+
+MAX_REQUESTS_PER_BATCH = 1000
+
+
+class BatchAnalysisRunner:
+    def __init__(self, client, db_path: str, user_id: int,
+                 build_request: Callable[[Dict], Tuple[str, str]],
+                 model: str = DEFAULT_MODEL, max_tokens: int = 4000, poll_interval: int = 60):
+        """build_request(episode) returns (system_prompt, user_content) for an episode row"""
+        self.client = client
+        self.db_path = db_path
+        self.user_id = user_id
+        self.build_request = build_request
+        self.model = model
+        self.max_tokens = max_tokens
+        self.poll_interval = poll_interval
+        self.ensure_table()
+
+    @property
+    def batches(self):
+        # Older SDK releases only expose batches under the beta namespace
+        batches = getattr(self.client.messages, 'batches', None)
+        return batches if batches is not None else self.client.beta.messages.batches
+
+    def get_db_connection(self):
+        return get_connection(self.db_path)
+
+    def ensure_table(self):
+        conn = self.get_db_connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_batches (
+                batch_id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                episode_ids TEXT NOT NULL,
+                request_count INTEGER,
+                succeeded INTEGER DEFAULT 0,
+                errored INTEGER DEFAULT 0,
+                created_at TIMESTAMP,
+                completed_at TIMESTAMP
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def get_in_flight_episode_ids(self) -> set:
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT episode_ids FROM analysis_batches WHERE user_id = ? AND status != 'ended'", (self.user_id,))
+        in_flight = set()
+        for (episode_ids,) in cursor.fetchall():
+            in_flight.update(json.loads(episode_ids))
+        conn.close()
+        return in_flight
+
+    def get_pending_episodes(self, episode_ids: Optional[List[int]] = None) -> List[Dict]:
+        """Transcribed episodes without an analysis for this user and not already in a batch"""
+        conn = self.get_db_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT e.id, e.title, e.podcast_id, e.publish_date, p.name AS podcast_name
+            FROM episodes e
+            JOIN podcasts p ON e.podcast_id = p.id
+            JOIN transcripts t ON t.episode_id = e.id
+            WHERE t.char_count > 0
+            AND NOT EXISTS (
+                SELECT 1 FROM analysis_reports ar WHERE ar.episode_id = e.id AND ar.user_id = ?
+            )
+            ORDER BY e.podcast_id, e.id
+        """, (self.user_id,))
+        rows = [dict(row) for row in cursor.fetchall()]
+
+        in_flight = self.get_in_flight_episode_ids()
+        wanted = set(episode_ids) if episode_ids is not None else None
+        rows = [row for row in rows if row['id'] not in in_flight and (wanted is None or row['id'] in wanted)]
+
+        # Transcript text is only loaded for the episodes actually being submitted
+        transcripts = transcript_store.load_many(conn, [row['id'] for row in rows])
+        conn.close()
+        for row in rows:
+            row['transcript'] = transcripts[row['id']]
+        return rows
+
+    def submit(self, episodes: List[Dict]) -> Optional[str]:
+        """Create one batch job for the episodes and persist its ID"""
+        if not episodes:
+            return None
+
+        requests = []
+        prompts = {}
+        for episode in episodes:
+            system_prompt, user_content = self.build_request(episode)
+            prompts[episode['id']] = system_prompt
+            requests.append({
+                "custom_id": f"episode-{episode['id']}",
+                "params": {
+                    "model": self.model,
+                    "max_tokens": self.max_tokens,
+                    "system": ClaudeAnalyzer.cached_system(system_prompt),
+                    "messages": [{"role": "user", "content": user_content}]
+                }
+            })
+
+        # Requests sharing a prompt sit next to each other so the cached prefix is reused
+        requests = ClaudeAnalyzer.order_by_prompt(
+            requests, lambda request: prompts[int(request['custom_id'].split('-', 1)[1])]
+        )
+
+        batch = self.batches.create(requests=requests)
+
+        conn = self.get_db_connection()
+        conn.execute("""
+            INSERT INTO analysis_batches (batch_id, user_id, status, episode_ids, request_count, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (batch.id, self.user_id, batch.processing_status, json.dumps([e['id'] for e in episodes]),
+              len(requests), datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+
+        print(f"   📦 Submitted batch {batch.id} with {len(requests)} analyses")
+        return batch.id
+
+    def wait_for(self, batch_id: str):
+        """Poll until the batch has ended"""
+        while True:
+            batch = self.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            print(f"   ⏳ Batch {batch_id}: {batch.processing_status} "
+                  f"({counts.succeeded} ok, {counts.errored} errored, {counts.processing} processing)")
+            if batch.processing_status == 'ended':
+                return batch
+            time.sleep(self.poll_interval)
+
+    def collect(self, batch_id: str) -> Dict:
+        """Write succeeded results into analysis_reports, skipping episodes already analyzed"""
+        written = succeeded = errored = 0
+
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        for entry in self.batches.results(batch_id):
+            episode_id = int(entry.custom_id.split('-', 1)[1])
+            if entry.result.type != 'succeeded':
+                errored += 1
+                print(f"   ❌ Episode {episode_id}: {entry.result.type}")
+                continue
+
+            succeeded += 1
+            message = entry.result.message
+            analysis = message.content[0].text
+            cursor.execute("""
+                INSERT INTO analysis_reports (episode_id, user_id, analysis_result, key_quote, reading_time_minutes, created_at)
+                SELECT ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM analysis_reports WHERE episode_id = ? AND user_id = ?)
+            """, (episode_id, self.user_id, analysis, self.extract_key_quote(analysis),
+                  max(1, len(analysis.split()) // 200), datetime.now().isoformat(), episode_id, self.user_id))
+            written += cursor.rowcount
+
+        cursor.execute("""
+            UPDATE analysis_batches SET status = 'ended', succeeded = ?, errored = ?, completed_at = ?
+            WHERE batch_id = ?
+        """, (succeeded, errored, datetime.now().isoformat(), batch_id))
+        conn.commit()
+        conn.close()
+
+        print(f"   ✅ Batch {batch_id}: {written} analyses saved, {succeeded - written} already present, {errored} errored")
+        return {"batch_id": batch_id, "written": written, "succeeded": succeeded, "errored": errored}
+
+    @staticmethod
+    def extract_key_quote(analysis: str) -> str:
+        for line in analysis.split('\n'):
+            if 'quote' in line.lower() and len(line) > 50:
+                return line[:500]
+        return ""
+
+    def resume_outstanding(self) -> List[Dict]:
+        """Finish batches submitted by earlier runs"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT batch_id FROM analysis_batches WHERE user_id = ? AND status != 'ended'", (self.user_id,))
+        batch_ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+
+        results = []
+        for batch_id in batch_ids:
+            print(f"   🔁 Resuming batch {batch_id}")
+            self.wait_for(batch_id)
+            results.append(self.collect(batch_id))
+        return results
+
+    def run(self, episode_ids: Optional[List[int]] = None) -> List[Dict]:
+        """Resume earlier batches, submit everything pending, wait and collect"""
+        results = self.resume_outstanding()
+
+        pending = self.get_pending_episodes(episode_ids)
+        print(f"📦 {len(pending)} episodes pending batch analysis")
+
+        batch_ids = [
+            self.submit(pending[start:start + MAX_REQUESTS_PER_BATCH])
+            for start in range(0, len(pending), MAX_REQUESTS_PER_BATCH)
+        ]
+        for batch_id in batch_ids:
+            self.wait_for(batch_id)
+            results.append(self.collect(batch_id))
+        return results
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Chunked parallel Whisper transcription
+Splits long audio into overlapping segments cut at silences, transcribes the
+segments concurrently and stitches the text back with overlap de-duplication
+"""
+import os
+import re
+import json
+import shutil
+import tempfile
+import subprocess
+import concurrent.futures
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple
+
+from core.rate_limiter import get_rate_limiter
+
+WHISPER_MAX_BYTES = 24 * 1024 * 1024  # Stay safely under the 25MB upload limit
+DEFAULT_SEGMENT_SECONDS = int(os.getenv('TRANSCRIPTION_SEGMENT_SECONDS', '600'))
+DEFAULT_OVERLAP_SECONDS = float(os.getenv('TRANSCRIPTION_OVERLAP_SECONDS', '4'))
+DEFAULT_WORKERS = int(os.getenv('TRANSCRIPTION_SEGMENT_WORKERS', '4'))
+# Lowest bitrate we expect from a feed (32 kbps); smaller files cannot be long enough to split
+MIN_BYTES_PER_SECOND = 4000
+
+
+def get_transcription_mode() -> str:
+    """'chunked' (default) splits long audio, 'compress' keeps the old bitrate squeeze"""
+    return os.getenv('TRANSCRIPTION_MODE', 'chunked').lower()
+
+
+class ChunkedTranscriber:
+    def __init__(self, openai_client, segment_seconds: int = DEFAULT_SEGMENT_SECONDS,
+                 overlap_seconds: float = DEFAULT_OVERLAP_SECONDS, max_workers: int = DEFAULT_WORKERS,
+                 silence_search_seconds: float = 30.0, model: str = "whisper-1"):
+        self.client = openai_client
+        self.segment_seconds = segment_seconds
+        self.overlap_seconds = overlap_seconds
+        self.max_workers = max_workers
+        self.silence_search_seconds = silence_search_seconds
+        self.model = model
+
+    @staticmethod
+    def probe_duration(audio_path: str) -> float:
+        """Return audio duration in seconds using ffprobe"""
+        probe_cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', audio_path]
+        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
+        return float(json.loads(probe_result.stdout)['format']['duration'])
+
+    @staticmethod
+    def detect_silences(audio_path: str, noise_db: int = -35, min_silence: float = 0.5) -> List[Tuple[float, float]]:
+        """Return (start, end) pairs of silent stretches using ffmpeg silencedetect"""
+        cmd = [
+            'ffmpeg', '-hide_banner', '-nostats', '-i', audio_path,
+            '-af', f'silencedetect=noise={noise_db}dB:d={min_silence}',
+            '-f', 'null', '-'
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+        silences = []
+        start = None
+        for line in result.stderr.splitlines():
+            start_match = re.search(r'silence_start: ([\d.]+)', line)
+            if start_match:
+                start = float(start_match.group(1))
+                continue
+            end_match = re.search(r'silence_end: ([\d.]+)', line)
+            if end_match and start is not None:
+                silences.append((start, float(end_match.group(1))))
+                start = None
+        return silences
+
+    def plan_segments(self, duration: float, file_size: int, silences: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        """Choose cut points near silences so every overlapping segment fits Whisper's limit"""
+        bytes_per_second = file_size / duration if duration else 0
+        segment_seconds = self.segment_seconds
+        max_seconds = float('inf')
+        if bytes_per_second:
+            max_seconds = (WHISPER_MAX_BYTES / bytes_per_second) - 2 * self.overlap_seconds
+            # The byte limit wins over any minimum length; very high bitrates just mean short segments
+            segment_seconds = max(1.0, min(segment_seconds, max_seconds * 0.9))
+
+        midpoints = [(start + end) / 2 for start, end in silences]
+        cuts = [0.0]
+        while duration - cuts[-1] > segment_seconds:
+            target = cuts[-1] + segment_seconds
+            window = [m for m in midpoints
+                      if abs(m - target) <= self.silence_search_seconds and m > cuts[-1] + segment_seconds / 2]
+            cuts.append(min(window, key=lambda m: abs(m - target)) if window else target)
+
+        # A short tail would be a near-empty extra Whisper call (one inside the overlap only duplicates
+        # text); fold it into the previous segment when that still fits the size limit
+        if len(cuts) > 1:
+            tail = duration - cuts[-1]
+            if tail <= self.overlap_seconds or (tail <= segment_seconds / 4 and duration - cuts[-2] <= max_seconds):
+                cuts.pop()
+        cuts.append(duration)
+
+        return [
+            (max(0.0, cuts[i] - self.overlap_seconds), min(duration, cuts[i + 1] + self.overlap_seconds))
+            for i in range(len(cuts) - 1)
+        ]
+
+    @staticmethod
+    def extract_segment(audio_path: str, start: float, end: float, output_path: str):
+        """Cut a segment without re-encoding, falling back to a high-quality mp3 encode"""
+        base_cmd = ['ffmpeg', '-y', '-v', 'quiet', '-ss', f'{start:.2f}', '-t', f'{end - start:.2f}', '-i', audio_path]
+        try:
+            subprocess.run(base_cmd + ['-c', 'copy', output_path], capture_output=True, check=True)
+        except subprocess.CalledProcessError:
+            output_path = os.path.splitext(output_path)[0] + '.mp3'
+            subprocess.run(base_cmd + ['-c:a', 'libmp3lame', '-b:a', '96k', output_path], capture_output=True, check=True)
+        return output_path
+
+    def transcribe_file(self, audio_path: str) -> str:
+        """Send a single file to Whisper under the shared rate limiter"""
+        def send():
+            # Reopen on every attempt so retries upload the whole file
+            with open(audio_path, 'rb') as audio_file:
+                return self.client.audio.transcriptions.create(
+                    model=self.model,
+                    file=audio_file,
+                    response_format="text"
+                )
+        return get_rate_limiter('openai', self.model).call(send)
+
+    def needs_split(self, audio_path: str) -> bool:
+        """True if the file is too large or too long for a single Whisper call.
+        Only files big enough to be long at a low bitrate pay for an ffprobe"""
+        file_size = os.path.getsize(audio_path)
+        if file_size > WHISPER_MAX_BYTES:
+            return True
+        threshold = self.segment_seconds * 1.5
+        if file_size < threshold * MIN_BYTES_PER_SECOND:
+            return False
+        return self.probe_duration(audio_path) > threshold
+
+    def split(self, audio_path: str, work_dir: str) -> List[str]:
+        """Write overlapping silence-aligned segments into work_dir and return their paths"""
+        file_size = os.path.getsize(audio_path)
+        duration = self.probe_duration(audio_path)
+        segments = self.plan_segments(duration, file_size, self.detect_silences(audio_path))
+        print(f"   ✂️ Splitting {duration / 60:.0f} min of audio into {len(segments)} segments")
+
+        extension = os.path.splitext(audio_path)[1] or '.mp3'
+        return [
+            self.extract_segment(audio_path, start, end, os.path.join(work_dir, f'segment_{i:03d}{extension}'))
+            for i, (start, end) in enumerate(segments)
+        ]
+
+    def transcribe_segments(self, segment_paths: List[str]) -> str:
+        """Transcribe segments concurrently and stitch them in order"""
+        if len(segment_paths) == 1:
+            return self.transcribe_file(segment_paths[0])
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            texts = list(executor.map(self.transcribe_file, segment_paths))
+        return self.stitch(texts)
+
+    def transcribe(self, audio_path: str) -> Optional[str]:
+        """Transcribe audio of any length, splitting into parallel segments when needed"""
+        if not self.needs_split(audio_path):
+            return self.transcribe_file(audio_path)
+
+        work_dir = tempfile.mkdtemp(prefix='segments_')
+        try:
+            return self.transcribe_segments(self.split(audio_path, work_dir))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        return re.sub(r'[^\w]', '', word.lower())
+
+    @classmethod
+    def stitch(cls, texts: List[str], window_words: int = 60, min_match_words: int = 3) -> str:
+        """Join segment transcripts, dropping words repeated in the overlap"""
+        stitched = []
+        for text in texts:
+            words = text.split()
+            if stitched and words:
+                tail = [cls._normalize(w) for w in stitched[-window_words:]]
+                head = [cls._normalize(w) for w in words[:window_words]]
+                match = SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(0, len(tail), 0, len(head))
+                # Only trust matches that end the previous segment and start the next one
+                if match.size >= min_match_words and match.a + match.size >= len(tail) - 5 and match.b <= 10:
+                    words = words[match.b + match.size:]
+            stitched.extend(words)
+        return ' '.join(stitched)
+
+
+def prepare_audio_for_whisper(audio_path: str, mode: str = None) -> List[str]:
+    """Return Whisper-ready file paths for audio_path (segments, a compressed copy, or the file itself)
+
+    Runs ffmpeg only, so it is safe to call from a process pool. Generated files are
+    written next to audio_path.
+    """
+    mode = mode or get_transcription_mode()
+    base, extension = os.path.splitext(audio_path)
+
+    if mode == 'chunked':
+        splitter = ChunkedTranscriber(None)
+        if not splitter.needs_split(audio_path):
+            return [audio_path]
+        work_dir = base + '_segments'
+        os.makedirs(work_dir, exist_ok=True)
+        return splitter.split(audio_path, work_dir)
+
+    if os.path.getsize(audio_path) <= WHISPER_MAX_BYTES:
+        return [audio_path]
+
+    # Legacy compress mode: squeeze to ~20MB mono
+    duration = ChunkedTranscriber.probe_duration(audio_path)
+    target_bitrate = max(int((20 * 1024 * 1024 * 8) / duration) - 1000, 32000)
+    output_path = base + '_compressed.mp3'
+    subprocess.run([
+        'ffmpeg', '-i', audio_path, '-y',
+        '-acodec', 'mp3', '-ab', f'{target_bitrate}',
+        '-ar', '16000', '-ac', '1', output_path
+    ], capture_output=True, check=True)
+    return [output_path]
+
+
+def prepare_audio_stage(item: dict) -> dict:
+    """Pipeline stage: split or compress item['audio_path'] unless a transcript is already known"""
+    if not item.get('transcript'):
+        try:
+            item['prepared_paths'] = prepare_audio_for_whisper(item['audio_path'], item.get('transcription_mode'))
+        except BaseException:
+            # Partial chunks or compressed copy from a failed ffmpeg run
+            cleanup_prepared_audio(item['audio_path'], [os.path.splitext(item['audio_path'])[0] + '_compressed.mp3'])
+            raise
+    return item
+
+
+def cleanup_prepared_audio(audio_path: str, prepared_paths: List[str]):
+    """Remove files created by prepare_audio_for_whisper"""
+    for path in prepared_paths or []:
+        if path != audio_path and os.path.exists(path):
+            os.unlink(path)
+    shutil.rmtree(os.path.splitext(audio_path)[0] + '_segments', ignore_errors=True)
+
+
+def cleanup_episode_work(item: dict):
+    """StagePipeline on_drop hook: remove a dropped item's download dir and prepared audio"""
+    if item.get('audio_path'):
+        cleanup_prepared_audio(item['audio_path'], item.get('prepared_paths'))
+    if item.get('work_dir'):
+        shutil.rmtree(item['work_dir'], ignore_errors=True)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Claude analysis client with prompt-prefix caching
+Large per-podcast system prompts are marked for provider-side caching and every
+call records billed, cache-write and cache-read input tokens. Transcripts over the
+context budget are analyzed map-reduce style: sections are summarized in parallel
+and the podcast prompt runs over the combined section notes
+"""
+import os
+import re
+import threading
+import concurrent.futures
+from typing import Callable, Dict, List
+
+from core.rate_limiter import get_rate_limiter, estimate_tokens
+
+DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
+PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
+CONTEXT_BUDGET_TOKENS = int(os.getenv('ANALYSIS_CONTEXT_BUDGET_TOKENS', '40000'))
+SECTION_TOKENS = int(os.getenv('ANALYSIS_SECTION_TOKENS', '12000'))
+
+SECTION_PROMPT = """You are preparing detailed notes on one section of a longer podcast transcript.
+These notes replace the raw transcript for a downstream analyst, so keep everything they could need:
+- Every company, person, fund, deal, asset and location mentioned, with their role
+- All numbers, dates, prices, returns, sizes and timelines exactly as stated
+- Each argument, prediction or thesis, attributed to the speaker who made it
+- Notable quotes copied verbatim in quotation marks
+Write in dense prose paragraphs in the order topics appear. Do not add commentary or conclusions."""
+
+
+class ClaudeAnalyzer:
+    def __init__(self, client, model: str = DEFAULT_MODEL, max_tokens: int = 4000):
+        self.client = client
+        self.model = model
+        self.max_tokens = max_tokens
+        self.rate_limiter = get_rate_limiter('anthropic', model)
+        self._lock = threading.Lock()
+        self.usage = {
+            'calls': 0,
+            'input_tokens': 0,
+            'cache_creation_input_tokens': 0,
+            'cache_read_input_tokens': 0,
+            'output_tokens': 0,
+            'cache_hits': 0,
+            'cache_misses': 0
+        }
+
+    @staticmethod
+    def cached_system(system_prompt: str) -> List[Dict]:
+        """System prompt as a content block marked as a cacheable prefix"""
+        return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+    def record_usage(self, usage) -> Dict:
+        """Accumulate token usage for one response and return the per-call numbers"""
+        call_usage = {
+            'input_tokens': getattr(usage, 'input_tokens', 0) or 0,
+            'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+            'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+            'output_tokens': getattr(usage, 'output_tokens', 0) or 0
+        }
+        with self._lock:
+            self.usage['calls'] += 1
+            for key, value in call_usage.items():
+                self.usage[key] += value
+            if call_usage['cache_read_input_tokens']:
+                self.usage['cache_hits'] += 1
+            else:
+                self.usage['cache_misses'] += 1
+        return call_usage
+
+    def analyze(self, system_prompt: str, user_content: str, max_tokens: int = None) -> str:
+        """Run one analysis with the system prompt cached, returning the text"""
+        response = self.rate_limiter.call(
+            self.client.messages.create,
+            estimated_tokens=estimate_tokens(system_prompt, user_content),
+            model=self.model,
+            max_tokens=max_tokens or self.max_tokens,
+            system=self.cached_system(system_prompt),
+            messages=[{"role": "user", "content": user_content}],
+            extra_headers={"anthropic-beta": PROMPT_CACHING_BETA}
+        )
+
+        call_usage = self.record_usage(response.usage)
+        cache_state = "hit" if call_usage['cache_read_input_tokens'] else "miss"
+        print(f"   💾 Prompt cache {cache_state}: {call_usage['cache_read_input_tokens']} cached / "
+              f"{call_usage['input_tokens']} billed input tokens")
+        return response.content[0].text
+
+    @staticmethod
+    def split_transcript(transcript: str, section_tokens: int = SECTION_TOKENS) -> List[str]:
+        """Split on sentence boundaries into sections of roughly section_tokens tokens"""
+        max_chars = section_tokens * 4
+        sections, current, current_len = [], [], 0
+        for sentence in re.split(r'(?<=[.!?])\s+', transcript):
+            if current and current_len + len(sentence) > max_chars:
+                sections.append(' '.join(current))
+                current, current_len = [], 0
+            current.append(sentence)
+            current_len += len(sentence) + 1
+        if current:
+            sections.append(' '.join(current))
+        return sections
+
+    def analyze_transcript(self, system_prompt: str, header: str, transcript: str,
+                           context_budget: int = CONTEXT_BUDGET_TOKENS, max_workers: int = 4) -> str:
+        """Analyze a transcript of any length, map-reducing it when it exceeds the context budget"""
+        if estimate_tokens(transcript) <= context_budget:
+            return self.analyze(system_prompt, f"{header}\n\nTRANSCRIPT:\n{transcript}")
+
+        sections = self.split_transcript(transcript)
+        print(f"   🧩 Transcript over budget (~{estimate_tokens(transcript)} tokens), summarizing {len(sections)} sections")
+
+        def summarize(numbered_section):
+            number, section = numbered_section
+            return self.analyze(
+                SECTION_PROMPT,
+                f"{header}\nSection {number} of {len(sections)}\n\nTRANSCRIPT SECTION:\n{section}",
+                max_tokens=2000
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            summaries = list(executor.map(summarize, enumerate(sections, 1)))
+
+        notes = "\n\n".join(f"### Section {number}\n{summary}" for number, summary in enumerate(summaries, 1))
+        return self.analyze(
+            system_prompt,
+            f"{header}\n\nThis episode was too long to include verbatim. The following are detailed, "
+            f"in-order notes covering the full transcript.\n\nSECTION NOTES:\n{notes}"
+        )
+
+    @staticmethod
+    def order_by_prompt(items: List, prompt_key: Callable) -> List:
+        """Group items sharing a prompt so cached prefixes are reused back-to-back"""
+        first_seen = {}
+        for index, item in enumerate(items):
+            first_seen.setdefault(prompt_key(item), index)
+        return sorted(items, key=lambda item: first_seen[prompt_key(item)])
+
+    def print_usage(self):
+        """Print cumulative cache effectiveness"""
+        usage = self.usage
+        total_input = usage['input_tokens'] + usage['cache_creation_input_tokens'] + usage['cache_read_input_tokens']
+        hit_rate = usage['cache_read_input_tokens'] / total_input if total_input else 0
+        print(f"   💾 Prompt cache: {usage['cache_hits']} hits / {usage['cache_misses']} misses, "
+              f"{usage['cache_read_input_tokens']} cached of {total_input} input tokens ({hit_rate:.0%}), "
+              f"{usage['output_tokens']} output tokens")
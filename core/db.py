@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Shared sqlite access for the pipeline scripts
+Connections are pooled per thread and per database file, opened in WAL mode with
+a busy timeout so parallel workers wait for the writer instead of failing with
+"database is locked". close() hands a connection back to its thread's pool, so
+existing connect/close call sites keep working unchanged; new code should prefer
+the connection() / transaction() context managers, which also release on errors
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from core import transcript_store
+
+BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '30000'))
+CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000'))
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",  # durable at checkpoints; safe with WAL
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KB}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+_local = threading.local()
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() returns it to the per-thread pool"""
+
+    checkouts = 0
+    transaction_depth = 0  # active transaction() blocks on this connection
+
+    def close(self):
+        # Helpers that open and close "their own" connection while a caller holds
+        # this one must not roll back the caller's pending writes
+        self.checkouts = max(0, self.checkouts - 1)
+        # Each holder gets back the row_factory it checked out with (e.g. a nested sqlite3.Row)
+        self.row_factory = self._row_factories.pop() if self._row_factories else None
+        if self.checkouts:
+            return
+        if self.in_transaction:
+            # Matches sqlite3 semantics: closing without commit discards the changes
+            self.rollback()
+        self.row_factory = None
+
+    def close_for_real(self):
+        super().close()
+
+
+def _pool() -> Dict[str, PooledConnection]:
+    if not hasattr(_local, 'connections'):
+        _local.connections = {}
+    return _local.connections
+
+
+def _open(db_path: str) -> PooledConnection:
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, factory=PooledConnection)
+    conn._row_factories = []
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    transcript_store.register_functions(conn)
+    return conn
+
+
+def get_connection(db_path: str = 'podcast_app_v2.db') -> PooledConnection:
+    """This thread's connection to db_path, opened and configured on first use"""
+    key = os.path.abspath(db_path)
+    pool = _pool()
+    conn = pool.get(key)
+    if conn is None:
+        conn = pool[key] = _open(db_path)
+    conn.checkouts += 1
+    conn._row_factories.append(conn.row_factory)
+    return conn
+
+
+@contextmanager
+def connection(db_path: str = 'podcast_app_v2.db') -> Iterator[PooledConnection]:
+    """get_connection() that is released even when the block raises"""
+    conn = get_connection(db_path)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def transaction(db_path: str = 'podcast_app_v2.db') -> Iterator[PooledConnection]:
+    """Run a batch of writes as one transaction, taking the write lock up front
+
+    BEGIN IMMEDIATE avoids the deadlock where two readers both try to upgrade to
+    writers; busy_timeout then queues the second one behind the first
+    """
+    conn = get_connection(db_path)
+    try:
+        if conn.transaction_depth:
+            # Nested use joins the outer transaction
+            yield conn
+            return
+        if conn.in_transaction and conn.checkouts == 1:
+            # Implicit transaction left behind by a failed legacy write nobody will commit
+            conn.rollback()
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        # else: another holder's uncommitted implicit writes; adopt them rather than
+        # joining silently, so this block is still committed (or rolled back) here
+        conn.transaction_depth += 1
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.transaction_depth -= 1
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def close_thread_connections():
+    """Really close this thread's pooled connections (call when a worker thread exits)"""
+    pool = _pool()
+    for conn in pool.values():
+        conn.close_for_real()
+    pool.clear()
@@ -1,26 +1,38 @@
 #!/usr/bin/env python3
 """
-Enhanced parallel processor with automatic audio compression for Whisper API
-Handles files >25MB by compressing them first
+Enhanced parallel processor with chunked transcription for Whisper API
+Splits long episodes into parallel segments (or compresses them when TRANSCRIPTION_MODE=compress)
 """
 import os
 import sys
 import concurrent.futures
 import time
-import sqlite3
 import json
 import subprocess
 from datetime import datetime
 from typing import List, Dict
 import openai
 import anthropic
-import requests
 from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.audio_downloader import AudioDownloader
+from core.chunked_transcriber import ChunkedTranscriber, get_transcription_mode
+from core.transcript_cache import TranscriptCache
+from core import transcript_store
+from core.db import connection, get_connection, transaction
+from core.transcript_store import TRANSCRIPT_TEXT_SQL
+from core.schema_indexes import ensure_indexes
+from core.rate_limiter import print_utilization
+from core.claude_analyzer import ClaudeAnalyzer, CONTEXT_BUDGET_TOKENS
+from core.batch_analysis import BatchAnalysisRunner
+
 # Load environment variables
 load_dotenv()
 
+DEFAULT_ANALYSIS_PROMPT = "Please analyze this podcast episode."
+
 class EnhancedParallelProcessor:
     def __init__(self, db_path: str = "podcast_app_v2.db", max_workers: int = 8):
         self.db_path = db_path
@@ -29,16 +41,30 @@ class EnhancedParallelProcessor:
         self.analysis_workers = min(max_workers // 2, 4)
         
         # Initialize API clients
-        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.anthropic_client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+        # Retries are handled by the shared rate limiter
+        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=0)
+        self.anthropic_client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'), max_retries=0)
+        
+        # Shared across transcription workers so connections are reused per host
+        self.downloader = AudioDownloader(pool_size=self.transcription_workers)
+        self.transcription_mode = get_transcription_mode()
+        self.transcriber = ChunkedTranscriber(self.openai_client)
+        self.transcript_cache = TranscriptCache(self.db_path)
+        self.analyzer = ClaudeAnalyzer(self.anthropic_client)
+        
+        # Transcripts live in their own table; move any still stored on episodes rows
+        conn = self.get_db_connection()
+        transcript_store.migrate_episode_transcripts(conn)
+        ensure_indexes(conn)
+        conn.close()
         
         print(f"🚀 Enhanced processor initialized:")
         print(f"   Transcription workers: {self.transcription_workers}")
         print(f"   Analysis workers: {self.analysis_workers}")
-        print(f"   Audio compression: ENABLED")
+        print(f"   Transcription mode: {self.transcription_mode}")
     
     def get_db_connection(self):
-        return sqlite3.connect(self.db_path)
+        return get_connection(self.db_path)
     
     def compress_audio(self, input_path: str, output_path: str, target_size_mb: int = 20) -> bool:
         """Compress audio file to fit within Whisper limits using ffmpeg"""
@@ -91,7 +117,7 @@ class EnhancedParallelProcessor:
             return False
     
     def download_and_prepare_audio(self, audio_url: str, episode_id: int) -> str:
-        """Download and compress audio file if needed"""
+        """Download audio, compressing it only in compress mode"""
         audio_dir = Path("data/audio") / f"episode_{episode_id}"
         audio_dir.mkdir(parents=True, exist_ok=True)
         
@@ -99,30 +125,19 @@ class EnhancedParallelProcessor:
         compressed_path = audio_dir / "compressed_audio.mp3"
         
         # Use existing files if available
-        if compressed_path.exists():
+        if self.transcription_mode == 'compress' and compressed_path.exists():
             size_mb = os.path.getsize(compressed_path) / (1024 * 1024)
             if size_mb <= 25:
                 return str(compressed_path)
         
-        if original_path.exists():
-            size_mb = os.path.getsize(original_path) / (1024 * 1024)
-            if size_mb <= 25:
-                return str(original_path)
-        
-        # Download if needed
-        if not original_path.exists():
-            try:
-                print(f"   📥 Downloading audio for episode {episode_id}")
-                response = requests.get(audio_url, stream=True)
-                response.raise_for_status()
-                
-                with open(original_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                        
-            except Exception as e:
-                print(f"   ❌ Download failed: {e}")
-                return None
+        # Download (resumes partial files, skips unchanged ones)
+        print(f"   📥 Downloading audio for episode {episode_id}")
+        if not self.downloader.download(audio_url, original_path):
+            return None
+        
+        # Chunked mode splits long audio at transcription time instead
+        if self.transcription_mode == 'chunked':
+            return str(original_path)
         
         # Check size and compress if needed
         size_mb = os.path.getsize(original_path) / (1024 * 1024)
@@ -137,59 +152,60 @@ class EnhancedParallelProcessor:
         
         return str(original_path)
     
+    def transcribe_audio_file(self, audio_path: str) -> str:
+        """Send prepared audio to Whisper, chunking long files"""
+        size_mb = os.path.getsize(audio_path) / (1024 * 1024)
+        if self.transcription_mode == 'chunked':
+            print(f"   🤖 Sending to Whisper API ({size_mb:.1f}MB, chunked)")
+            return self.transcriber.transcribe(audio_path)
+        
+        # Final size check
+        if size_mb > 25:
+            print(f"   ❌ File still too large ({size_mb:.1f}MB), skipping")
+            return None
+        
+        print(f"   🤖 Sending to Whisper API ({size_mb:.1f}MB)")
+        return self.transcriber.transcribe_file(audio_path)
+    
     def transcribe_episode(self, episode_id: int) -> bool:
-        """Transcribe a single episode with automatic compression"""
+        """Transcribe a single episode, chunking long audio"""
         try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get episode info
-            cursor.execute("SELECT audio_url, title FROM episodes WHERE id = ?", (episode_id,))
-            result = cursor.fetchone()
-            
-            if not result:
-                conn.close()
-                return False
+            with connection(self.db_path) as conn:
+                # Get episode info
+                result = conn.execute("SELECT audio_url, title FROM episodes WHERE id = ?", (episode_id,)).fetchone()
+                if not result:
+                    return False
+                
+                # Check if already transcribed
+                already = conn.execute(
+                    "SELECT 1 FROM transcripts WHERE episode_id = ? AND char_count > 0", (episode_id,)
+                ).fetchone()
             
             audio_url, title = result
             print(f"🎧 Transcribing: {title[:60]}...")
-            
-            # Check if already transcribed
-            cursor.execute("SELECT transcript FROM episodes WHERE id = ? AND transcript IS NOT NULL AND transcript != ''", (episode_id,))
-            if cursor.fetchone():
-                conn.close()
+            if already:
                 print(f"   ✅ Already transcribed")
                 return True
             
             # Download and prepare audio
             audio_path = self.download_and_prepare_audio(audio_url, episode_id)
             if not audio_path:
-                conn.close()
                 return False
             
-            # Final size check
-            size_mb = os.path.getsize(audio_path) / (1024 * 1024)
-            if size_mb > 25:
-                print(f"   ❌ File still too large ({size_mb:.1f}MB), skipping")
-                conn.close()
-                return False
+            # Fingerprint the original download so cache keys don't depend on compression
+            source_path = Path("data/audio") / f"episode_{episode_id}" / "audio.mp3"
+            if not source_path.exists():
+                source_path = Path(audio_path)
             
-            # Transcribe with OpenAI Whisper
-            print(f"   🤖 Sending to Whisper API ({size_mb:.1f}MB)")
-            with open(audio_path, 'rb') as audio_file:
-                transcript = self.openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
+            transcript = self.transcript_cache.get_or_transcribe(
+                str(source_path), lambda _: self.transcribe_audio_file(audio_path), source_url=audio_url
+            )
+            if not transcript:
+                return False
             
             # Save transcript
-            cursor.execute(
-                "UPDATE episodes SET transcript = ? WHERE id = ?",
-                (transcript, episode_id)
-            )
-            conn.commit()
-            conn.close()
+            with transaction(self.db_path) as conn:
+                transcript_store.save(conn, episode_id, transcript)
             
             print(f"   ✅ Transcription complete ({len(transcript)} chars)")
             return True
@@ -198,51 +214,82 @@ class EnhancedParallelProcessor:
             print(f"   ❌ Transcription failed for episode {episode_id}: {e}")
             return False
     
+    @staticmethod
+    def build_analysis_request(custom_prompt: str, podcast_name: str, title: str, transcript: str):
+        """Return (system prompt, user content) for batch jobs, trimmed to the context budget"""
+        system_prompt = custom_prompt or DEFAULT_ANALYSIS_PROMPT
+        prompt = f"Podcast: {podcast_name}\nEpisode: {title}\n\nTRANSCRIPT:\n{transcript[:CONTEXT_BUDGET_TOKENS * 4]}"
+        return system_prompt, prompt
+    
+    def batch_analyze_episodes(self, episode_ids: List[int]) -> Dict:
+        """Analyze episodes through the Message Batches API (cheaper, not latency-sensitive)"""
+        print(f"\n📦 Starting batch analysis of {len(episode_ids)} episodes")
+        start_time = time.time()
+        
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT podcast_id, custom_prompt FROM user_subscriptions WHERE user_id = 2")
+        custom_prompts = dict(cursor.fetchall())
+        conn.close()
+        
+        runner = BatchAnalysisRunner(
+            self.anthropic_client,
+            self.db_path,
+            user_id=2,
+            build_request=lambda episode: self.build_analysis_request(
+                custom_prompts.get(episode['podcast_id']), episode['podcast_name'], episode['title'], episode['transcript']
+            )
+        )
+        batch_results = runner.run(episode_ids)
+        
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        analyzed = set()
+        for start in range(0, len(episode_ids), 500):
+            batch = episode_ids[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            cursor.execute(f"SELECT DISTINCT episode_id FROM analysis_reports WHERE user_id = 2 AND episode_id IN ({placeholders})", batch)
+            analyzed.update(row[0] for row in cursor.fetchall())
+        conn.close()
+        
+        results = {
+            "success": [episode_id for episode_id in episode_ids if episode_id in analyzed],
+            "failed": [episode_id for episode_id in episode_ids if episode_id not in analyzed],
+            "batches": batch_results,
+            "total_time": time.time() - start_time
+        }
+        print(f"\n📦 Batch analysis complete: {len(results['success'])} analyzed, {len(results['failed'])} missing")
+        return results
+    
     def analyze_episode(self, episode_id: int) -> bool:
         """Analyze a single episode using custom prompts"""
         try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get episode and podcast info
-            cursor.execute("""
-                SELECT e.transcript, e.title, p.id, p.name, us.custom_prompt
-                FROM episodes e
-                JOIN podcasts p ON e.podcast_id = p.id
-                LEFT JOIN user_subscriptions us ON p.id = us.podcast_id AND us.user_id = 2
-                WHERE e.id = ? AND e.transcript IS NOT NULL AND e.transcript != ''
-            """, (episode_id,))
-            
-            result = cursor.fetchone()
-            if not result:
-                conn.close()
-                return False
+            with connection(self.db_path) as conn:
+                # Get episode and podcast info
+                result = conn.execute(f"""
+                    SELECT {TRANSCRIPT_TEXT_SQL}, e.title, p.id, p.name, us.custom_prompt
+                    FROM episodes e
+                    JOIN podcasts p ON e.podcast_id = p.id
+                    JOIN transcripts t ON t.episode_id = e.id
+                    LEFT JOIN user_subscriptions us ON p.id = us.podcast_id AND us.user_id = 2
+                    WHERE e.id = ? AND t.char_count > 0
+                """, (episode_id,)).fetchone()
+                if not result:
+                    return False
+                
+                # Check if already analyzed
+                already = conn.execute("SELECT id FROM analysis_reports WHERE episode_id = ?", (episode_id,)).fetchone()
             
             transcript, title, podcast_id, podcast_name, custom_prompt = result
             print(f"🧠 Analyzing: {title[:60]}...")
-            
-            # Check if already analyzed
-            cursor.execute("SELECT id FROM analysis_reports WHERE episode_id = ?", (episode_id,))
-            if cursor.fetchone():
-                conn.close()
+            if already:
                 print(f"   ✅ Already analyzed")
                 return True
             
-            # Use custom prompt or default
-            if custom_prompt:
-                prompt = f"{custom_prompt}\n\nPodcast: {podcast_name}\nEpisode: {title}\n\nTranscript:\n{transcript[:15000]}"  # Limit transcript length
-            else:
-                prompt = f"Please analyze this podcast episode:\n\nPodcast: {podcast_name}\nEpisode: {title}\n\nTranscript:\n{transcript[:15000]}"
-            
-            # Analyze with Claude
+            # Analyze with Claude (long transcripts are summarized in sections first)
             print(f"   🤖 Sending to Claude API")
-            response = self.anthropic_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            analysis = response.content[0].text
+            system_prompt = custom_prompt or DEFAULT_ANALYSIS_PROMPT
+            analysis = self.analyzer.analyze_transcript(system_prompt, f"Podcast: {podcast_name}\nEpisode: {title}", transcript)
             
             # Extract key quote (simple extraction)
             lines = analysis.split('\n')
@@ -253,13 +300,11 @@ class EnhancedParallelProcessor:
                     break
             
             # Save analysis
-            cursor.execute("""
-                INSERT INTO analysis_reports (episode_id, user_id, analysis_result, key_quote, reading_time_minutes, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (episode_id, 2, analysis, key_quote, max(1, len(analysis.split()) // 200), datetime.now()))
-            
-            conn.commit()
-            conn.close()
+            with transaction(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO analysis_reports (episode_id, user_id, analysis_result, key_quote, reading_time_minutes, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (episode_id, 2, analysis, key_quote, max(1, len(analysis.split()) // 200), datetime.now()))
             
             print(f"   ✅ Analysis complete ({len(analysis)} chars)")
             return True
@@ -269,9 +314,9 @@ class EnhancedParallelProcessor:
             return False
     
     def parallel_transcribe_episodes(self, episode_ids: List[int]) -> Dict:
-        """Transcribe multiple episodes in parallel with compression"""
+        """Transcribe multiple episodes in parallel"""
         print(f"🎧 Starting parallel transcription of {len(episode_ids)} episodes")
-        print(f"   Using {self.transcription_workers} workers with auto-compression")
+        print(f"   Using {self.transcription_workers} workers ({self.transcription_mode} mode)")
         start_time = time.time()
         
         results = {"success": [], "failed": [], "total_time": 0}
@@ -309,6 +354,28 @@ class EnhancedParallelProcessor:
         
         return results
     
+    def order_by_prompt(self, episode_ids: List[int]) -> List[int]:
+        """Group episode IDs by the custom prompt their podcast uses"""
+        if not episode_ids:
+            return episode_ids
+        
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        prompt_for_episode = {}
+        for start in range(0, len(episode_ids), 500):  # Stay under sqlite's variable limit
+            batch = episode_ids[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            cursor.execute(f"""
+                SELECT e.id, us.custom_prompt
+                FROM episodes e
+                LEFT JOIN user_subscriptions us ON e.podcast_id = us.podcast_id AND us.user_id = 2
+                WHERE e.id IN ({placeholders})
+            """, batch)
+            prompt_for_episode.update({episode_id: custom_prompt or '' for episode_id, custom_prompt in cursor.fetchall()})
+        conn.close()
+        
+        return ClaudeAnalyzer.order_by_prompt(episode_ids, lambda episode_id: prompt_for_episode.get(episode_id, ''))
+    
     def parallel_analyze_episodes(self, episode_ids: List[int]) -> Dict:
         """Analyze multiple episodes in parallel"""
         print(f"\n🧠 Starting parallel analysis of {len(episode_ids)} episodes")
@@ -317,6 +384,9 @@ class EnhancedParallelProcessor:
         
         results = {"success": [], "failed": [], "total_time": 0}
         
+        # Run episodes sharing a prompt back-to-back so the cached prefix is reused
+        episode_ids = self.order_by_prompt(episode_ids)
+        
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.analysis_workers) as executor:
             future_to_episode = {
                 executor.submit(self.analyze_episode, episode_id): episode_id 
@@ -339,8 +409,6 @@ class EnhancedParallelProcessor:
                 except Exception as e:
                     results["failed"].append(episode_id)
                     print(f"❌ ({completed}/{len(episode_ids)}) Episode {episode_id} exception: {str(e)}")
-                
-                time.sleep(0.1)  # Rate limiting for Claude API
         
         results["total_time"] = time.time() - start_time
         
@@ -349,6 +417,8 @@ class EnhancedParallelProcessor:
         print(f"   ❌ Failed: {len(results['failed'])}")
         print(f"   ⏱️ Time: {results['total_time']:.1f} seconds")
         print(f"   📈 Rate: {len(results['success']) / (results['total_time'] / 3600):.1f} episodes/hour")
+        print_utilization()
+        self.analyzer.print_usage()
         
         return results
     
@@ -646,8 +716,8 @@ Total Episodes Analyzed: {len(results)}
         print(f"📄 Unified report saved: {filepath}")
         return filepath
     
-    def run_full_processing(self):
-        """Execute complete processing pipeline with compression"""
+    def run_full_processing(self, batch_mode: bool = False):
+        """Execute complete processing pipeline (batch_mode analyzes via the Message Batches API)"""
         print("🚀 Starting Enhanced Parallel Processing with Audio Compression")
         print("=" * 70)
         
@@ -669,7 +739,9 @@ Total Episodes Analyzed: {len(results)}
         transcription_results = self.parallel_transcribe_episodes(target_episodes)
         
         # Analysis (only successful transcriptions)
-        if transcription_results["success"]:
+        if transcription_results["success"] and batch_mode:
+            analysis_results = self.batch_analyze_episodes(transcription_results["success"])
+        elif transcription_results["success"]:
             analysis_results = self.parallel_analyze_episodes(transcription_results["success"])
         else:
             analysis_results = {"success": [], "failed": []}
@@ -711,7 +783,7 @@ Total Episodes Analyzed: {len(results)}
 
 def main():
     processor = EnhancedParallelProcessor()
-    processor.run_full_processing()
+    processor.run_full_processing(batch_mode='--batch' in sys.argv)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Set-based new-episode detection
+Loads every known GUID, audio URL and normalized title for a podcast in one query
+and diffs a whole parsed feed against them in memory, instead of one OR query per
+feed entry
+"""
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MISSING = object()
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """Lowercase, strip punctuation and collapse whitespace so cosmetic edits still match"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (title or '').lower()).split())
+
+
+def episode_keys(guid: Optional[str], audio_url: Optional[str], title: Optional[str]) -> List[Tuple[str, str]]:
+    keys = []
+    if guid:
+        keys.append(('guid', guid.strip()))
+    if audio_url:
+        keys.append(('url', audio_url.strip()))
+    normalized = normalize_title(title)
+    if normalized:
+        keys.append(('title', normalized))
+    return keys
+
+
+class KnownEpisodeIndex:
+    def __init__(self, rows: Iterable[Tuple] = ()):
+        """rows are (episode_id, guid, audio_url, title)"""
+        self.keys: Dict[Tuple[str, str], Optional[int]] = {}
+        for episode_id, guid, audio_url, title in rows:
+            self.add(episode_id, guid, audio_url, title)
+
+    @classmethod
+    def from_sqlite(cls, conn: sqlite3.Connection, podcast_id: int) -> 'KnownEpisodeIndex':
+        """Load one podcast's keys with a single query"""
+        cursor = conn.execute(
+            "SELECT id, guid, audio_url, title FROM episodes WHERE podcast_id = ?", (podcast_id,)
+        )
+        return cls(cursor.fetchall())
+
+    def add(self, episode_id: Optional[int], guid: Optional[str], audio_url: Optional[str], title: Optional[str]):
+        for key in episode_keys(guid, audio_url, title):
+            self.keys.setdefault(key, episode_id)
+
+    def match(self, episode: Dict):
+        """Known episode ID for any matching key (None for episodes added without one), else MISSING"""
+        for key in episode_keys(episode.get('guid'), episode.get('audio_url'), episode.get('title')):
+            if key in self.keys:
+                return self.keys[key]
+        return MISSING
+
+    def diff(self, episodes: Iterable[Dict]) -> List[Dict]:
+        """Episodes not yet known, in feed order; repeats within the feed are dropped too"""
+        new_episodes = []
+        for episode in episodes:
+            if self.match(episode) is MISSING:
+                new_episodes.append(episode)
+                self.add(None, episode.get('guid'), episode.get('audio_url'), episode.get('title'))
+        return new_episodes
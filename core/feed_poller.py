@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Concurrent conditional-GET RSS poller
+Polls every active feed through a bounded thread pool, sends the stored ETag and
+Last-Modified validators and skips parsing on 304 or an identical body hash.
+Validators live on the podcasts table (feed_etag, feed_last_modified,
+feed_content_hash, feed_checked_at)
+"""
+import os
+import sqlite3
+import hashlib
+import concurrent.futures
+from datetime import datetime
+from typing import Dict, List
+
+import requests
+import feedparser
+from requests.adapters import HTTPAdapter
+
+from core.db import get_connection
+
+USER_AGENT = 'Podcast Analysis Application v2/2.0.0'
+DEFAULT_WORKERS = int(os.getenv('FEED_POLL_WORKERS', '8'))
+
+CACHE_COLUMNS = {
+    'feed_etag': 'TEXT',
+    'feed_last_modified': 'TEXT',
+    'feed_content_hash': 'TEXT',
+    'feed_checked_at': 'TIMESTAMP',
+}
+
+
+def ensure_feed_cache_columns(conn: sqlite3.Connection):
+    """Add the validator columns to podcasts if this database predates them"""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(podcasts)")}
+    for column, column_type in CACHE_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE podcasts ADD COLUMN {column} {column_type}")
+    conn.commit()
+
+
+class FeedPoller:
+    def __init__(self, db_path: str, max_workers: int = DEFAULT_WORKERS, timeout: int = 30):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'User-Agent': USER_AGENT})
+
+        conn = get_connection(self.db_path)
+        ensure_feed_cache_columns(conn)
+        conn.close()
+
+    def get_active_feeds(self) -> List[Dict]:
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, name, rss_url, feed_etag, feed_last_modified, feed_content_hash
+            FROM podcasts
+            WHERE rss_url IS NOT NULL
+            AND rss_url != ''
+            AND is_active = 1
+        ''')
+        feeds = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return feeds
+
+    def fetch(self, feed: Dict) -> Dict:
+        """Conditionally fetch one feed. Status is changed, not_modified, unchanged or error"""
+        result = {'podcast': feed, 'status': 'error', 'feed': None, 'etag': feed['feed_etag'],
+                  'last_modified': feed['feed_last_modified'], 'content_hash': feed['feed_content_hash'],
+                  'error': None}
+
+        headers = {}
+        if feed['feed_etag']:
+            headers['If-None-Match'] = feed['feed_etag']
+        if feed['feed_last_modified']:
+            headers['If-Modified-Since'] = feed['feed_last_modified']
+
+        try:
+            response = self.session.get(feed['rss_url'], headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                result['status'] = 'not_modified'
+                return result
+            response.raise_for_status()
+
+            result['etag'] = response.headers.get('ETag')
+            result['last_modified'] = response.headers.get('Last-Modified')
+            result['content_hash'] = hashlib.sha256(response.content).hexdigest()
+            if result['content_hash'] == feed['feed_content_hash']:
+                result['status'] = 'unchanged'
+                return result
+
+            parsed = feedparser.parse(response.content)
+            if parsed.bozo and not parsed.entries:
+                result['error'] = 'Invalid RSS feed'
+                return result
+
+            result['feed'] = parsed
+            result['status'] = 'changed'
+        except Exception as e:
+            result['error'] = str(e)
+        return result
+
+    def commit(self, results: List[Dict]):
+        """Store validators so these feeds are skipped until they change.
+
+        Only commit feeds whose new entries have all been picked up; a feed left
+        uncommitted is fetched and parsed again on the next run.
+        """
+        if not results:
+            return
+        conn = get_connection(self.db_path)
+        conn.executemany('''
+            UPDATE podcasts
+            SET feed_etag = ?, feed_last_modified = ?, feed_content_hash = ?, feed_checked_at = ?
+            WHERE id = ?
+        ''', [(r['etag'], r['last_modified'], r['content_hash'], datetime.now().isoformat(), r['podcast']['id'])
+              for r in results if r['status'] != 'error'])
+        conn.commit()
+        conn.close()
+
+    def poll(self) -> List[Dict]:
+        """Fetch all active feeds concurrently and return every result"""
+        feeds = self.get_active_feeds()
+        print(f"📡 Polling {len(feeds)} active podcasts ({self.max_workers} concurrent)")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self.fetch, feeds))
+
+        counts = {}
+        for result in results:
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            if result['status'] == 'error':
+                print(f"   ❌ {result['podcast']['name']}: {result['error']}")
+        print(f"   📊 {counts.get('changed', 0)} changed, {counts.get('not_modified', 0)} not modified (304), "
+              f"{counts.get('unchanged', 0)} identical, {counts.get('error', 0)} errors")
+        return results
+
+    def close(self):
+        self.session.close()
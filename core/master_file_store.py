@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Append-only master transcript store
+New episode blocks are appended to the end of a master markdown file instead of
+rewriting it, and a sidecar <file>.index.json records each episode's byte offset,
+length, date and title. Newest-first order and the episode count are restored by
+periodic compaction, which rewrites the file once from the index
+"""
+import os
+import re
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from core.master_transcript_parser import iter_episodes
+
+COMPACT_THRESHOLD = int(os.getenv('MASTER_COMPACT_THRESHOLD', '25'))
+UNNAMED_PREFIX = 'offset:'
+
+
+def render_episode_block(date: str, title: str, episode_id, transcript: str) -> str:
+    """Markdown block for one episode, in the master file format"""
+    return f"""## {date}
+
+### {title}
+**Publication Date:** {date}T00:00:00
+**Episode ID:** {episode_id}
+
+**Full Transcript:**
+{transcript}
+
+---
+
+"""
+
+
+def _has_id(episode_id) -> bool:
+    # Blocks written without an id carry `**Episode ID:** None`
+    return episode_id is not None and str(episode_id) not in ('', 'None')
+
+
+def _unnamed_key(offset: int) -> str:
+    """Index key for a block without an Episode ID; such blocks are never deduplicated"""
+    return f"{UNNAMED_PREFIX}{offset}"
+
+
+def render_header(podcast_name: str, total_episodes: int) -> str:
+    return f"""# {podcast_name} - Master Transcripts
+
+**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+**Total Episodes:** {total_episodes}
+
+Episodes organized by publication date (newest first).
+
+---
+
+"""
+
+
+class MasterFileStore:
+    def __init__(self, master_dir, compact_threshold: int = COMPACT_THRESHOLD):
+        self.master_dir = Path(master_dir)
+        self.master_dir.mkdir(parents=True, exist_ok=True)
+        self.compact_threshold = compact_threshold
+
+    def index_path(self, filename: str) -> Path:
+        return self.master_dir / f"{filename}.index.json"
+
+    def load_index(self, filename: str) -> Dict:
+        """Load the sidecar index, (re)building it when missing or written for a different file version"""
+        filepath = self.master_dir / filename
+        index_path = self.index_path(filename)
+        if not filepath.exists():
+            return {"podcast_name": None, "episodes": {}, "appended_since_compaction": 0}
+        if index_path.exists():
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            # Another writer (e.g. add_new_podcasts) may have rewritten the file; offsets would be stale
+            stat = filepath.stat()
+            if index.get("size") == stat.st_size and index.get("mtime_ns") == stat.st_mtime_ns:
+                return index
+        return self.reindex(filename)
+
+    def save_index(self, filename: str, index: Dict):
+        """Save the index stamped with the file's current size and mtime"""
+        filepath = self.master_dir / filename
+        if filepath.exists():
+            stat = filepath.stat()
+            index["size"], index["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+        index_path = self.index_path(filename)
+        tmp_path = index_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+
+    def reindex(self, filename: str) -> Dict:
+        """Scan an existing master file once and record where each episode block sits"""
+        filepath = self.master_dir / filename
+        with open(filepath, 'rb') as f:
+            title_line = f.readline().decode('utf-8', errors='replace').rstrip('\n')
+            f.seek(0)
+            episodes = {}
+            blocks = 0
+            for record in iter_episodes(f, include_body=False):
+                blocks += 1
+                # A repeated Episode ID overwrites the earlier entry, leaving blocks > len(episodes)
+                key = record['episode_id'] if _has_id(record['episode_id']) else _unnamed_key(record['offset'])
+                episodes[key] = {
+                    "offset": record['offset'],
+                    "length": record['length'],
+                    "date": record['date'],
+                    "title": record['title']
+                }
+
+        index = {
+            "podcast_name": re.sub(r'^#\s*|\s+-\s+(Master\s+)?Transcripts.*$', '', title_line),
+            "episodes": episodes,
+            "blocks": blocks,
+            "appended_since_compaction": 0
+        }
+        self.save_index(filename, index)
+        print(f"   🗂️ Indexed {len(episodes)} episodes ({blocks} blocks) in {filename}")
+        return index
+
+    def append(self, filename: str, podcast_name: str, episode_id, date: str, title: str, transcript: str) -> bool:
+        """Append one episode block; returns False if the episode is already in the file"""
+        filepath = self.master_dir / filename
+        index = self.load_index(filename)
+        has_id = _has_id(episode_id)
+        if has_id and str(episode_id) in index["episodes"]:
+            return False
+
+        block = render_episode_block(date, title, episode_id, transcript).encode('utf-8')
+        with open(filepath, 'ab') as f:
+            if f.tell() == 0:
+                f.write(render_header(podcast_name, 1).encode('utf-8'))
+            offset = f.tell()
+            f.write(block)
+
+        index["podcast_name"] = index.get("podcast_name") or podcast_name
+        key = str(episode_id) if has_id else _unnamed_key(offset)
+        index["episodes"][key] = {"offset": offset, "length": len(block), "date": date, "title": title}
+        index["blocks"] = index.get("blocks", 0) + 1
+        index["appended_since_compaction"] = index.get("appended_since_compaction", 0) + 1
+        self.save_index(filename, index)
+
+        if index["appended_since_compaction"] >= self.compact_threshold:
+            self.compact(filename)
+        return True
+
+    def read_episode(self, filename: str, episode_id) -> Optional[str]:
+        """Read one episode block by seeking to its offset"""
+        entry = self.load_index(filename)["episodes"].get(str(episode_id))
+        if not entry:
+            return None
+        with open(self.master_dir / filename, 'rb') as f:
+            f.seek(entry["offset"])
+            return f.read(entry["length"]).decode('utf-8', errors='replace')
+
+    def iter_newest_first(self, filename: str) -> Iterator[str]:
+        """Yield episode blocks newest first without loading the whole file"""
+        index = self.load_index(filename)
+        entries = sorted(index["episodes"].values(), key=lambda entry: entry["date"], reverse=True)
+        with open(self.master_dir / filename, 'rb') as f:
+            for entry in entries:
+                f.seek(entry["offset"])
+                yield f.read(entry["length"]).decode('utf-8', errors='replace')
+
+    def compact(self, filename: str):
+        """Rewrite the file newest-first with an up-to-date header, then rebuild offsets"""
+        filepath = self.master_dir / filename
+        if not filepath.exists():
+            return
+
+        index = self.load_index(filename)
+        if "blocks" not in index:
+            index = self.reindex(filename)
+        ordered = sorted(index["episodes"].items(), key=lambda item: item[1]["date"], reverse=True)
+
+        # Never drop content the index does not account for: every parsed block must have its own
+        # entry (no repeated Episode IDs), and only the file header may precede the first one
+        first_offset = min((entry["offset"] for _, entry in ordered), default=0)
+        indexed_bytes = sum(entry["length"] for _, entry in ordered)
+        if (not ordered or index["blocks"] != len(ordered)
+                or first_offset + indexed_bytes != filepath.stat().st_size):
+            print(f"   ⚠️ Skipping compaction of {filename}: {index['blocks']} blocks in the file, "
+                  f"{len(ordered)} indexed")
+            return
+
+        podcast_name = index.get("podcast_name") or filepath.stem
+
+        tmp_path = filepath.with_suffix('.md.tmp')
+        new_episodes = {}
+        with open(filepath, 'rb') as source, open(tmp_path, 'wb') as target:
+            target.write(render_header(podcast_name, len(ordered)).encode('utf-8'))
+            for key, entry in ordered:
+                source.seek(entry["offset"])
+                block = source.read(entry["length"])
+                offset = target.tell()
+                if key.startswith(UNNAMED_PREFIX):
+                    key = _unnamed_key(offset)
+                new_episodes[key] = dict(entry, offset=offset)
+                target.write(block)
+        os.replace(tmp_path, filepath)
+
+        index["episodes"] = new_episodes
+        index["appended_since_compaction"] = 0
+        self.save_index(filename, index)
+        print(f"   🗜️ Compacted {filename}: {len(new_episodes)} episodes")
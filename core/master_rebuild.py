@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Incremental, parallel master file rebuilds
+Each output file is one job: a query streamed from sqlite in fetchmany batches
+and rendered through a template straight into a buffered temp file, which then
+atomically replaces the old one. Jobs run in worker processes, and a job whose
+source-row fingerprint (row count, newest created_at, total size) matches the
+last successful build is skipped, so a full rebuild costs only what changed
+"""
+import os
+import json
+import time
+import sqlite3
+import multiprocessing
+import concurrent.futures
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from core import template_registry
+from core.db import get_connection
+
+DEFAULT_WORKERS = int(os.getenv('MASTER_REBUILD_WORKERS', str(os.cpu_count() or 1)))
+FETCH_SIZE = 200
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Per-podcast fingerprint of the rows a transcript master file is built from
+TRANSCRIPT_FINGERPRINT_SQL = """
+    SELECT e.podcast_id, COUNT(*), MAX(e.created_at), MAX(t.created_at), SUM(t.char_count)
+    FROM episodes e
+    JOIN transcripts t ON t.episode_id = e.id
+    WHERE t.char_count > ?
+    GROUP BY e.podcast_id
+"""
+
+
+def transcript_fingerprints(conn, min_chars: int = 0) -> Dict[int, List]:
+    """podcast_id -> [row count, max episode created_at, max transcript created_at, total chars]"""
+    return {row[0]: list(row[1:]) for row in conn.execute(TRANSCRIPT_FINGERPRINT_SQL, (min_chars,))}
+
+
+def iter_rows(cursor: sqlite3.Cursor, size: int = FETCH_SIZE) -> Iterator[sqlite3.Row]:
+    """Stream a cursor in batches; only one batch of transcripts is in memory at a time"""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def render_job(db_path: str, job: Dict) -> Dict:
+    """Worker entry point (module-level so it pickles): render one job's file and swap it in"""
+    started = time.time()
+    conn = get_connection(db_path)
+    tmp_path = f"{job['path']}.tmp"
+    try:
+        cursor = conn.execute(job['sql'], job.get('params', ()))
+        cursor.row_factory = sqlite3.Row
+        with open(tmp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            template_registry.render_to_file(job['template'], f, rows=iter_rows(cursor), **job.get('context', {}))
+        os.replace(tmp_path, job['path'])
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        conn.close()
+
+    # A MasterFileStore offset index for the old file no longer matches; it is rebuilt on next use
+    stale_index = f"{job['path']}.index.json"
+    if os.path.exists(stale_index):
+        os.remove(stale_index)
+    return {'key': job['key'], 'path': job['path'], 'bytes': os.path.getsize(job['path']),
+            'seconds': time.time() - started}
+
+
+class RebuildState:
+    """Fingerprint and output path of each job's last successful build"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable rebuild state {path}: {e}")
+
+    def unchanged_path(self, key: str, fingerprint: List) -> Optional[str]:
+        """Previous output path if the job's inputs are unchanged and the file still exists"""
+        entry = self.entries.get(key)
+        if entry and entry['fingerprint'] == fingerprint and os.path.exists(entry['path']):
+            return entry['path']
+        return None
+
+    def record(self, key: str, fingerprint: List, path: str):
+        self.entries[key] = {'fingerprint': fingerprint, 'path': path, 'rebuilt_at': datetime.now().isoformat()}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def rebuild(db_path: str, jobs: List[Dict], state_path: str,
+            workers: int = DEFAULT_WORKERS, force: bool = False) -> Dict[str, Dict]:
+    """Run the jobs whose fingerprint changed. Each job: key, fingerprint, path, template, sql, params, context.
+    Returns {'rebuilt': {key: result}, 'skipped': {key: path}, 'failed': {key: error}}"""
+    state = RebuildState(state_path)
+    results = {'rebuilt': {}, 'skipped': {}, 'failed': {}}
+
+    pending = []
+    for job in jobs:
+        previous = None if force else state.unchanged_path(job['key'], job['fingerprint'])
+        if previous:
+            results['skipped'][job['key']] = previous
+        else:
+            pending.append(job)
+    if not pending:
+        return results
+
+    # spawn: forked children would inherit the parent's pooled sqlite handles
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(pending))),
+        mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        futures = {executor.submit(render_job, db_path, job): job for job in pending}
+        for future in concurrent.futures.as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                results['failed'][job['key']] = str(e)
+                continue
+            results['rebuilt'][job['key']] = result
+            state.record(job['key'], job['fingerprint'], result['path'])
+
+    state.save()
+    return results
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Streaming parser for master transcript markdown files
+Reads the `## date` / `### title` / `**Key:** value` block format line by line
+and yields one record per episode with its byte offset and length, so memory is
+bounded by the largest single episode. Covers the per-podcast master files
+(MasterFileStore), the individual *_Transcripts.md files and the combined
+Master_All / COMPLETE_MASTER files (`### Podcast: Title` headings).
+
+A `##`/`###` line only starts a new block when no episode is open, the open
+episode has no body yet, or its body ended with a separator rule (a line of
+3+ `-` or `=`); headings inside a transcript stay part of that transcript.
+Some *_Transcripts.md exports were written with escaped newlines (a literal
+backslash-n); lines holding escaped headings or rules are split on the escape, with
+offsets still pointing into the raw file
+"""
+import io
+import re
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+DATE_PREFIX = b'## '
+TITLE_PREFIX = b'### '
+# `---` in MasterFileStore files; `=====` and 80-dash rules in the *_Transcripts.md exports
+SEPARATOR = re.compile(r'^(?:-{3,}|={3,})$')
+BODY_MARKER = '**Full Transcript:**'
+METADATA = re.compile(r'^\*\*([^*]+?):\*\*\s*(.*)$')
+ESCAPED_NEWLINE = b'\\n'
+ESCAPED_BREAK = re.compile(rb'\\n(?:#{2,3} |-{3,}|={3,})')
+
+Source = Union[str, Path, BinaryIO]
+
+
+def _finish(record: Dict, body: Optional[List[str]], end: int) -> Dict:
+    record['length'] = end - record['offset']
+    if body is not None:
+        start, stop = 0, len(body)
+        while start < stop and not body[start].strip():
+            start += 1
+        if start < stop and body[start].strip() == BODY_MARKER:
+            start += 1
+        while stop > start and (not body[stop - 1].strip() or SEPARATOR.match(body[stop - 1].strip())):
+            stop -= 1
+        record['transcript'] = '\n'.join(body[start:stop]).strip()
+    return record
+
+
+def _iter_lines(f: BinaryIO) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (start, end, line) byte ranges, splitting escaped-newline lines into logical lines"""
+    offset = 0
+    for raw in f:
+        if not ESCAPED_BREAK.search(raw):
+            yield offset, offset + len(raw), raw
+            offset += len(raw)
+            continue
+        parts = raw.split(ESCAPED_NEWLINE)
+        for i, part in enumerate(parts):
+            end = offset + len(part) + (len(ESCAPED_NEWLINE) if i < len(parts) - 1 else 0)
+            yield offset, end, part
+            offset = end
+
+
+def _iter_blocks(f: BinaryIO, include_body: bool) -> Iterator[Dict]:
+    offset = 0
+    date = None
+    section_start = None  # offset of a `## date` line not yet claimed by an episode
+    record = None
+    body = None
+    in_body = False
+    last_text = ''
+
+    for line_start, offset, raw in _iter_lines(f):
+        line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+        can_break = record is None or not in_body or bool(SEPARATOR.match(last_text))
+
+        if can_break and raw.startswith(DATE_PREFIX):
+            if record is not None:
+                yield _finish(record, body, line_start)
+                record = None
+            date = line[3:].strip()
+            section_start = line_start
+            continue
+
+        if can_break and raw.startswith(TITLE_PREFIX):
+            if record is not None:
+                yield _finish(record, body, line_start)
+            record = {
+                'date': date,
+                'title': line[4:].strip(),
+                'episode_id': None,
+                'metadata': {},
+                'transcript': None,
+                'offset': section_start if section_start is not None else line_start,
+                'length': 0,
+            }
+            section_start = None
+            body = [] if include_body else None
+            in_body = False
+            last_text = ''
+            continue
+
+        if record is None:
+            continue
+
+        if not in_body:
+            match = METADATA.match(line)
+            if match and line.strip() != BODY_MARKER:
+                key, value = match.group(1).strip(), match.group(2).strip()
+                record['metadata'][key] = value
+                if key == 'Episode ID':
+                    record['episode_id'] = value
+                continue
+            # First blank line (or first plain text) ends the metadata lines
+            in_body = True
+            if not line.strip():
+                continue
+
+        if body is not None:
+            body.append(line)
+        if line.strip():
+            last_text = line.strip()
+
+    if record is not None:
+        yield _finish(record, body, offset)
+
+
+def iter_episodes(source: Source, include_body: bool = True) -> Iterator[Dict]:
+    """Yield {date, title, episode_id, metadata, transcript, offset, length} per episode.
+    source is a path or a binary file object; include_body=False skips transcript text"""
+    if isinstance(source, (str, Path)):
+        with open(source, 'rb') as f:
+            yield from _iter_blocks(f, include_body)
+    else:
+        yield from _iter_blocks(source, include_body)
+
+
+def read_episode(f: BinaryIO, record: Dict) -> Dict:
+    """Re-read one record's block (from a body-less pass) and return it with its transcript"""
+    f.seek(record['offset'])
+    block = f.read(record['length'])
+    parsed = next(iter_episodes(io.BytesIO(block)), None)
+    return dict(record, transcript=parsed['transcript'] if parsed else '')
+
+
+def split_heading(heading: str, known_podcasts: Optional[List[str]] = None) -> Tuple[str, str]:
+    """Split a combined-file `Podcast: Title` heading; known names win over the first colon
+    (e.g. 'Crossroads: The Infrastructure Podcast: Episode')"""
+    for name in sorted(known_podcasts or [], key=len, reverse=True):
+        if heading.startswith(f"{name}:"):
+            return name, heading[len(name) + 1:].strip()
+    if ':' in heading:
+        podcast, title = heading.split(':', 1)
+        return podcast.strip(), title.strip()
+    return 'Unknown', heading
+
+
+def publish_date(record: Dict) -> str:
+    """Publication date from the block metadata, falling back to the `## date` header"""
+    metadata = record['metadata']
+    if metadata.get('Publication Date') or metadata.get('Date'):
+        return metadata.get('Publication Date') or metadata.get('Date')
+    date = record['date'] or ''
+    return date if 'T' in date else f"{date}T00:00:00"
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Shared token-bucket rate limiter for Anthropic and OpenAI calls
+One limiter per provider/model tracks requests-per-minute and tokens-per-minute,
+honors retry-after headers and retries transient failures with jittered backoff
+"""
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Defaults per provider; override with e.g. ANTHROPIC_RPM / ANTHROPIC_TPM
+DEFAULT_LIMITS = {
+    'anthropic': {'rpm': 50, 'tpm': 40000},
+    'openai': {'rpm': 50, 'tpm': 0},  # Whisper is request-limited only
+}
+
+
+class RetryableError(Exception):
+    """Raised by callers for transient HTTP failures (e.g. 429/5xx from raw aiohttp calls)"""
+
+    def __init__(self, message: str, status: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return sum(len(text or '') for text in texts) // 4 + 1
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds from a Retry-After value: delay-seconds or an HTTP-date (RFC 9110)"""
+    if value is None or value == '':
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _retry_after_from_error(error: Exception) -> Optional[float]:
+    if getattr(error, 'retry_after', None) is not None:
+        return parse_retry_after(error.retry_after)
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value)) / 1000
+        except ValueError:
+            pass
+    return parse_retry_after(headers.get('retry-after'))
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits, overloads, server errors and connection failures"""
+    status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS
+    return isinstance(error, RetryableError) or any(
+        name in type(error).__name__ for name in ('Connection', 'Timeout', 'RateLimit', 'Overloaded')
+    )
+
+
+class RateLimiter:
+    def __init__(self, provider: str, model: str, rpm: int, tpm: int = 0,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.provider = provider
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._request_tokens = float(rpm)
+        self._token_tokens = float(tpm)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._recent = deque()  # (timestamp, tokens) over the last minute
+        self.stats = {'requests': 0, 'tokens': 0, 'retries': 0, 'throttled_seconds': 0.0, 'failures': 0}
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._request_tokens = min(self.rpm, self._request_tokens + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._token_tokens = min(self.tpm, self._token_tokens + elapsed * self.tpm / 60)
+
+    def _reserve(self, tokens: int) -> float:
+        """Take budget for one request, returning how long the caller must wait first"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            # Requests larger than the whole bucket are let through once it is full
+            tokens = min(tokens, self.tpm) if self.tpm else 0
+            wait = max(0.0, self._paused_until - now)
+            if self._request_tokens < 1:
+                wait = max(wait, (1 - self._request_tokens) * 60 / self.rpm)
+            if self.tpm and self._token_tokens < tokens:
+                wait = max(wait, (tokens - self._token_tokens) * 60 / self.tpm)
+
+            # Budget goes negative so concurrent callers queue up behind this one
+            self._request_tokens -= 1
+            self._token_tokens -= tokens
+
+            self.stats['requests'] += 1
+            self.stats['tokens'] += tokens
+            self.stats['throttled_seconds'] += wait
+            self._recent.append((now + wait, tokens))
+            return wait
+
+    def acquire(self, tokens: int = 0):
+        """Block until a request of roughly `tokens` input tokens fits the budget"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0):
+        """asyncio variant of acquire"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def backoff(self, error: Exception, attempt: int) -> float:
+        """Pause the whole limiter for retry-after (or jittered exponential delay) and return it"""
+        delay = _retry_after_from_error(error)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+            delay = random.uniform(delay / 2, delay)
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self.stats['retries'] += 1
+        return delay
+
+    def call(self, func: Callable, *args, estimated_tokens: int = 0, **kwargs):
+        """Run func under the limiter, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(estimated_tokens)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self.stats['failures'] += 1
+                    raise
+                delay = self.backoff(e, attempt)
+                print(f"   ⏳ {self.provider}/{self.model} throttled ({e.__class__.__name__}), retrying in {delay:.1f}s")
+
+    async def call_async(self, func: Callable, *args, estimated_tokens: int = 0, **kwargs):
+        """asyncio variant of call; func must return an awaitable"""
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(estimated_tokens)
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self.stats['failures'] += 1
+                    raise
+                self.backoff(e, attempt)
+
+    def utilization(self) -> Dict:
+        """Live usage over the last minute relative to the configured budgets"""
+        with self._lock:
+            cutoff = time.monotonic() - 60
+            while self._recent and self._recent[0][0] < cutoff:
+                self._recent.popleft()
+            requests_last_minute = len(self._recent)
+            tokens_last_minute = sum(tokens for _, tokens in self._recent)
+            return {
+                'provider': self.provider,
+                'model': self.model,
+                'requests_last_minute': requests_last_minute,
+                'tokens_last_minute': tokens_last_minute,
+                'rpm_utilization': requests_last_minute / self.rpm if self.rpm else 0,
+                'tpm_utilization': tokens_last_minute / self.tpm if self.tpm else 0,
+                **self.stats
+            }
+
+
+_limiters: Dict[tuple, RateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str) -> RateLimiter:
+    """Return the process-wide limiter for provider/model"""
+    key = (provider, model)
+    with _registry_lock:
+        if key not in _limiters:
+            defaults = DEFAULT_LIMITS.get(provider, {'rpm': 50, 'tpm': 0})
+            prefix = provider.upper()
+            _limiters[key] = RateLimiter(
+                provider,
+                model,
+                rpm=int(os.getenv(f'{prefix}_RPM', defaults['rpm'])),
+                tpm=int(os.getenv(f'{prefix}_TPM', defaults['tpm'])),
+                max_retries=int(os.getenv('API_MAX_RETRIES', '5'))
+            )
+        return _limiters[key]
+
+
+def print_utilization():
+    """Print a one-line summary for every limiter used in this process"""
+    for limiter in list(_limiters.values()):
+        usage = limiter.utilization()
+        print(f"   📊 {usage['provider']}/{usage['model']}: {usage['requests']} requests, "
+              f"{usage['tokens']} est. tokens, {usage['retries']} retries, "
+              f"{usage['throttled_seconds']:.1f}s throttled, "
+              f"{usage['rpm_utilization']:.0%} RPM / {usage['tpm_utilization']:.0%} TPM last minute")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Secondary indexes for the pipeline (raw sqlite) schema
+The scripts' episodes table differs from the app models (publish_date vs
+published_date, transcribed vs transcript_status), so indexes are declared per
+access path and only created when their columns exist. The app-side equivalents
+live in the model __table_args__ and the alembic migration
+"""
+import sqlite3
+from typing import List, Tuple
+
+# (index name, table, columns) - one entry per hot filter/join/order path
+PIPELINE_INDEXES: List[Tuple[str, str, Tuple[str, ...]]] = [
+    # New-episode detection and master file rebuilds: per-podcast, newest first
+    ('idx_episodes_podcast_publish', 'episodes', ('podcast_id', 'publish_date')),
+    ('idx_episodes_podcast_pub', 'episodes', ('podcast_id', 'pub_date')),
+    ('idx_episodes_guid', 'episodes', ('guid',)),
+    ('idx_episodes_audio_url', 'episodes', ('audio_url',)),
+    ('idx_episodes_transcript_status', 'episodes', ('transcript_status',)),
+    # Gap detection: "transcribed but not analyzed" anti-joins
+    ('idx_analysis_reports_episode_user', 'analysis_reports', ('episode_id', 'user_id')),
+    ('idx_analysis_reports_user_created', 'analysis_reports', ('user_id', 'created_at')),
+    ('idx_knowledge_base_report', 'knowledge_base_entries', ('analysis_report_id',)),
+    ('idx_knowledge_base_user_created', 'knowledge_base_entries', ('user_id', 'created_at')),
+    ('idx_subscriptions_user_podcast', 'user_subscriptions', ('user_id', 'podcast_id')),
+]
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def ensure_indexes(conn: sqlite3.Connection) -> List[str]:
+    """Create any missing pipeline indexes; returns the names created"""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    columns_by_table = {}
+    created = []
+    for name, table, columns in PIPELINE_INDEXES:
+        if name in existing:
+            continue
+        if table not in columns_by_table:
+            columns_by_table[table] = table_columns(conn, table)
+        if not set(columns).issubset(columns_by_table[table]):
+            continue
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+        created.append(name)
+    if created:
+        # Refresh planner statistics so the new indexes are actually chosen
+        conn.execute("ANALYZE")
+    conn.commit()
+    return created
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Local semantic retrieval index over transcript passages
+Transcripts are split into overlapping passages, embedded with a locally runnable
+sentence-transformers model and appended to a float32 matrix on disk that is
+memory-mapped for search. Passage metadata lives in a small sqlite file next to
+it, so adding an episode appends rows instead of rebuilding the index
+"""
+import os
+import sys
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import transcript_store
+from core.db import get_connection
+
+DEFAULT_INDEX_DIR = os.getenv('SEMANTIC_INDEX_DIR', 'data/semantic_index')
+DEFAULT_MODEL = os.getenv('SEMANTIC_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+PASSAGE_WORDS = 200
+PASSAGE_OVERLAP = 40
+SEARCH_BLOCK_ROWS = 65536
+
+
+def is_available() -> bool:
+    return NUMPY_AVAILABLE and SENTENCE_TRANSFORMERS_AVAILABLE
+
+
+def chunk_text(text: str, words: int = PASSAGE_WORDS, overlap: int = PASSAGE_OVERLAP) -> List[str]:
+    """Split text into overlapping passages of roughly `words` words"""
+    tokens = text.split()
+    if not tokens:
+        return []
+    step = max(1, words - overlap)
+    return [' '.join(tokens[start:start + words]) for start in range(0, max(1, len(tokens) - overlap), step)]
+
+
+class SemanticIndex:
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR, model_name: str = DEFAULT_MODEL):
+        if not is_available():
+            raise RuntimeError("Semantic index needs numpy and sentence-transformers installed")
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.vectors_path = self.index_dir / 'embeddings.f32'
+        self.meta_path = self.index_dir / 'index.json'
+        self.db_path = self.index_dir / 'passages.db'
+        self._model = None
+        self._lock = threading.Lock()
+        self._meta_mtime_ns = None
+        self.meta = self._load_meta()
+        self._ensure_tables()
+
+    def _load_meta(self) -> Dict:
+        if self.meta_path.exists():
+            self._meta_mtime_ns = self.meta_path.stat().st_mtime_ns
+            with open(self.meta_path, 'r') as f:
+                meta = json.load(f)
+            if meta['model'] != self.model_name:
+                raise RuntimeError(f"Index at {self.index_dir} was built with {meta['model']}; rebuild it to switch models")
+            return meta
+        return {'model': self.model_name, 'dim': None, 'count': 0}
+
+    def _save_meta(self):
+        tmp_path = self.meta_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.meta_path)
+        self._meta_mtime_ns = self.meta_path.stat().st_mtime_ns
+
+    def refresh(self) -> Dict:
+        """Pick up passages appended by another process (index.json is replaced after each append)"""
+        try:
+            mtime_ns = self.meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return self.meta
+        if mtime_ns != self._meta_mtime_ns:
+            self.meta = self._load_meta()
+        return self.meta
+
+    def _ensure_tables(self):
+        conn = get_connection(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS passages (
+                row INTEGER PRIMARY KEY,
+                episode_id INTEGER NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                podcast_name TEXT,
+                title TEXT,
+                publish_date TEXT,
+                text TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_passages_episode ON passages(episode_id)")
+        conn.commit()
+        conn.close()
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def embed(self, texts: List[str]):
+        """Unit-normalized float32 embeddings, so dot product is cosine similarity"""
+        return self.model.encode(texts, batch_size=32, normalize_embeddings=True,
+                                 convert_to_numpy=True).astype(np.float32)
+
+    def indexed_episode_ids(self) -> set:
+        conn = get_connection(self.db_path)
+        ids = {row[0] for row in conn.execute("SELECT DISTINCT episode_id FROM passages")}
+        conn.close()
+        return ids
+
+    def add_episode(self, episode_id: int, transcript: str, title: str = None,
+                    podcast_name: str = None, publish_date: str = None) -> int:
+        """Embed and append one episode's passages; returns the number added (0 if already indexed)"""
+        passages = chunk_text(transcript or '')
+        if not passages:
+            return 0
+
+        with self._lock:
+            # The truncate below must not cut off rows another process appended
+            self.refresh()
+            conn = get_connection(self.db_path)
+            if conn.execute("SELECT 1 FROM passages WHERE episode_id = ? LIMIT 1", (episode_id,)).fetchone():
+                conn.close()
+                return 0
+
+            vectors = self.embed(passages)
+            if self.meta['dim'] is None:
+                self.meta['dim'] = int(vectors.shape[1])
+
+            # Rows on disk beyond the recorded count come from an interrupted append; drop them
+            row_bytes = self.meta['dim'] * 4
+            with open(self.vectors_path, 'ab') as f:
+                f.truncate(self.meta['count'] * row_bytes)
+                f.write(vectors.tobytes())
+
+            first_row = self.meta['count']
+            conn.execute("DELETE FROM passages WHERE row >= ?", (first_row,))
+            conn.executemany("""
+                INSERT INTO passages (row, episode_id, chunk_index, podcast_name, title, publish_date, text)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(first_row + i, episode_id, i, podcast_name, title, publish_date, passage)
+                  for i, passage in enumerate(passages)])
+            conn.commit()
+            conn.close()
+
+            self.meta['count'] += len(passages)
+            self._save_meta()
+            return len(passages)
+
+    def search(self, query: str, k: int = 10) -> List[Dict]:
+        """Top-k passages by cosine similarity, with episode metadata"""
+        # count and dim from one snapshot: vectors are written before index.json, so rows < count always exist
+        meta = self.refresh()
+        count, dim = meta['count'], meta['dim']
+        if not count or not query.strip():
+            return []
+
+        query_vector = self.embed([query])[0]
+        matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(count, dim))
+
+        # Score in blocks so only a slice of the matrix is paged in at a time
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, count, SEARCH_BLOCK_ROWS):
+            scores = matrix[start:start + SEARCH_BLOCK_ROWS] @ query_vector
+            take = min(k, len(scores))
+            top = np.argpartition(-scores, take - 1)[:take]
+            best_rows = np.concatenate([best_rows, top + start])
+            best_scores = np.concatenate([best_scores, scores[top]])
+        order = np.argsort(-best_scores)[:k]
+        rows = [int(best_rows[i]) for i in order]
+        scores = {int(best_rows[i]): float(best_scores[i]) for i in order}
+        del matrix
+
+        conn = get_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        placeholders = ','.join('?' * len(rows))
+        passages = {row['row']: dict(row) for row in conn.execute(
+            f"SELECT * FROM passages WHERE row IN ({placeholders})", rows
+        )}
+        conn.close()
+
+        return [dict(passages[row], score=scores[row]) for row in rows if row in passages]
+
+    def index_pending(self, db_path: str) -> int:
+        """Index every transcribed episode in the pipeline database that is not indexed yet"""
+        indexed = self.indexed_episode_ids()
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT e.id, e.title, p.name, e.publish_date
+            FROM episodes e
+            JOIN podcasts p ON e.podcast_id = p.id
+            JOIN transcripts t ON t.episode_id = e.id
+            WHERE t.char_count > 0
+        """)
+        added = 0
+        for episode_id, title, podcast_name, publish_date in cursor.fetchall():
+            if episode_id in indexed:
+                continue
+            transcript = transcript_store.load(conn, episode_id)
+            added += self.add_episode(episode_id, transcript, title, podcast_name, publish_date)
+            print(f"   🧭 Indexed episode {episode_id}: {title[:50]}")
+        conn.close()
+        print(f"✅ Semantic index: {added} passages added, {self.meta['count']} total")
+        return added
+
+
+def main():
+    """Backfill the index from the pipeline database, or query it: semantic_index.py [query]"""
+    index = SemanticIndex()
+    if len(sys.argv) > 1:
+        for result in index.search(' '.join(sys.argv[1:])):
+            print(f"{result['score']:.3f}  {result['podcast_name']} - {result['title']}")
+            print(f"       {result['text'][:200]}...")
+    else:
+        index.index_pending('podcast_app_v2.db')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Pooled, concurrent SMTP delivery
+Keeps a few authenticated SMTP connections open and reuses them across messages,
+sends through a thread pool under a messages-per-minute cap (the shared
+RateLimiter) and retries transient failures on a fresh connection. Every send
+returns a per-message outcome that callers record in email_logs
+"""
+import os
+import ssl
+import time
+import queue
+import smtplib
+import socket
+import threading
+import concurrent.futures
+from email.message import Message
+from typing import Callable, Dict, List, Optional
+
+from core.rate_limiter import RateLimiter
+
+DEFAULT_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '3'))
+DEFAULT_MAX_PER_MINUTE = int(os.getenv('SMTP_MAX_PER_MINUTE', '60'))
+# Providers drop long-lived sessions (Gmail after ~100 messages); recycle before that
+MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '50'))
+# Servers close idle sessions (often after 60-300 s); older idle connections are dropped instead of reused
+MAX_IDLE_SECONDS = float(os.getenv('SMTP_MAX_IDLE_SECONDS', '60'))
+
+
+def is_transient(error: Exception) -> bool:
+    """Dropped connections, timeouts and 4xx replies are worth retrying; 5xx and auth failures are not"""
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    # SMTPException subclasses OSError; the rest (e.g. SMTPNotSupportedError for STARTTLS) will not go away
+    if isinstance(error, (smtplib.SMTPException, ssl.SSLCertVerificationError)):
+        return False
+    return isinstance(error, (socket.timeout, ConnectionError, OSError))
+
+
+class SMTPPool:
+    def __init__(self, host: str, port: int, username: str = None, password: str = None,
+                 use_tls: bool = True, pool_size: int = DEFAULT_POOL_SIZE,
+                 max_per_minute: int = DEFAULT_MAX_PER_MINUTE, max_retries: int = 3, timeout: int = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.pool_size = max(1, pool_size)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.limiter = RateLimiter('smtp', host, rpm=max_per_minute, max_retries=max_retries)
+
+        self._idle = queue.LifoQueue()  # (connection, monotonic time it was released)
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._sent_on = {}  # id(connection) -> messages sent on it
+
+    def _open(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        self._sent_on[id(server)] = 0
+        return server
+
+    def _acquire(self) -> smtplib.SMTP:
+        """Take an idle connection, or open one; at most pool_size are ever open"""
+        self._slots.acquire()
+        while True:
+            try:
+                server, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if time.monotonic() - released_at <= MAX_IDLE_SECONDS:
+                return server
+            # Most likely timed out server-side; QUIT would only wait on a dead socket
+            self._sent_on.pop(id(server), None)
+            server.close()
+        try:
+            return self._open()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, server: smtplib.SMTP, broken: bool = False):
+        if broken or self._sent_on.get(id(server), 0) >= MAX_MESSAGES_PER_CONNECTION:
+            self._discard(server)
+        else:
+            self._idle.put((server, time.monotonic()))
+        self._slots.release()
+
+    def _discard(self, server: smtplib.SMTP):
+        self._sent_on.pop(id(server), None)
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def send(self, msg: Message, from_addr: str = None, to_addrs: List[str] = None) -> Dict:
+        """Send one message with retries; returns {success, attempts, error}"""
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                server = self._acquire()
+            except Exception as e:
+                error = e
+            else:
+                try:
+                    server.send_message(msg, from_addr=from_addr, to_addrs=to_addrs)
+                    self._sent_on[id(server)] = self._sent_on.get(id(server), 0) + 1
+                    self._release(server)
+                    return {'success': True, 'attempts': attempt + 1, 'error': None}
+                except Exception as e:
+                    error = e
+                    # A failed transaction can leave the session in an unknown state
+                    self._release(server, broken=True)
+            if not is_transient(error) or attempt == self.max_retries:
+                break
+            self.limiter.backoff(error, attempt)
+        self.limiter.stats['failures'] += 1
+        return {'success': False, 'attempts': attempt + 1, 'error': f"{type(error).__name__}: {error}"}
+
+    def send_many(self, messages: List[Message], on_result: Optional[Callable[[int, Dict], None]] = None) -> List[Dict]:
+        """Send messages concurrently over the pool; results are in input order"""
+        results: List[Optional[Dict]] = [None] * len(messages)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            futures = {executor.submit(self.send, msg): index for index, msg in enumerate(messages)}
+            for future in concurrent.futures.as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                if on_result:
+                    on_result(index, results[index])
+        return results
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait()[0])
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Staged pipeline executor
+Runs items through a chain of stages connected by bounded queues, each stage with
+its own worker pool (threads for network/API work, processes for CPU-bound ffmpeg),
+so a batch takes roughly the time of the slowest stage rather than the sum of all
+"""
+import queue
+import threading
+import time
+import concurrent.futures
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_STOP = object()
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1, use_processes: bool = False):
+        """func receives an item and returns the item for the next stage (None drops it).
+
+        With use_processes=True func must be a picklable module-level function.
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+
+
+class StagePipeline:
+    def __init__(self, stages: List[Stage], queue_size: int = 2, on_drop: Optional[Callable[[Any], None]] = None):
+        """on_drop receives each item a stage failed on or dropped (returned None), e.g. to remove its temp files"""
+        self.stages = stages
+        self.queue_size = queue_size
+        self.on_drop = on_drop
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def run(self, items: List[Any]) -> Tuple[List[Any], List[Dict]]:
+        """Process items through every stage. Returns (results in input order, failures)"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = {}
+        failures = []
+        lock = threading.Lock()
+        remaining = [stage.workers for stage in self.stages]
+        self.stats = {stage.name: {"processed": 0, "failed": 0, "busy_seconds": 0.0} for stage in self.stages}
+
+        process_pools = {
+            i: concurrent.futures.ProcessPoolExecutor(max_workers=stage.workers)
+            for i, stage in enumerate(self.stages) if stage.use_processes
+        }
+
+        aborted = threading.Event()
+        interrupts: List[BaseException] = []
+
+        def drop(stage_name: str, item: Any):
+            if self.on_drop is not None:
+                try:
+                    self.on_drop(item)
+                except Exception as e:
+                    print(f"   ⚠️ [{stage_name}] cleanup failed: {e}")
+
+        def put(index: int, entry) -> bool:
+            """Queue entry for stage index; after an abort, give up once that stage has no live workers"""
+            while True:
+                try:
+                    queues[index].put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    if aborted.is_set():
+                        with lock:
+                            if remaining[index] == 0:
+                                return False
+
+        def worker(index: int):
+            stage = self.stages[index]
+            stats = self.stats[stage.name]
+            try:
+                while True:
+                    entry = queues[index].get()
+                    if entry is _STOP:
+                        break
+
+                    position, item = entry
+                    if aborted.is_set():
+                        # Drain without processing so upstream never blocks
+                        drop(stage.name, item)
+                        continue
+                    started = time.time()
+                    try:
+                        if index in process_pools:
+                            output = process_pools[index].submit(stage.func, item).result()
+                        else:
+                            output = stage.func(item)
+                    except Exception as e:
+                        output = None
+                        print(f"   ❌ [{stage.name}] failed: {e}")
+                        with lock:
+                            stats["failed"] += 1
+                            failures.append({"stage": stage.name, "item": item, "error": str(e)})
+                    except BaseException as e:
+                        # KeyboardInterrupt/SystemExit: drop the item, stop the pipeline and re-raise
+                        print(f"   🛑 [{stage.name}] interrupted: {type(e).__name__}")
+                        with lock:
+                            stats["failed"] += 1
+                            failures.append({"stage": stage.name, "item": item, "error": type(e).__name__})
+                            interrupts.append(e)
+                        aborted.set()
+                        drop(stage.name, item)
+                        raise
+                    with lock:
+                        stats["busy_seconds"] += time.time() - started
+                        if output is not None:
+                            stats["processed"] += 1
+
+                    if output is None:
+                        drop(stage.name, item)
+                        continue
+                    if index + 1 < len(self.stages):
+                        if not put(index + 1, (position, output)):
+                            drop(stage.name, output)
+                    else:
+                        with lock:
+                            results[position] = output
+            finally:
+                # Last worker out closes the next stage, however this one exits
+                with lock:
+                    remaining[index] -= 1
+                    finished = remaining[index] == 0
+                if finished and index + 1 < len(self.stages):
+                    for _ in range(self.stages[index + 1].workers):
+                        if not put(index + 1, _STOP):
+                            break
+
+        threads = [
+            threading.Thread(target=worker, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+            for index, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for position, item in enumerate(items):
+                if aborted.is_set() or not put(0, (position, item)):
+                    break
+            for _ in range(self.stages[0].workers):
+                if not put(0, _STOP):
+                    break
+
+            for thread in threads:
+                thread.join()
+        finally:
+            for pool in process_pools.values():
+                pool.shutdown()
+
+        if interrupts:
+            raise interrupts[0]
+
+        return [results[position] for position in sorted(results)], failures
+
+    def print_stats(self):
+        """Print per-stage throughput; the busiest stage bounds total runtime"""
+        for name, stats in self.stats.items():
+            print(f"   ⏱️ {name}: {stats['processed']} ok, {stats['failed']} failed, "
+                  f"{stats['busy_seconds']:.1f}s busy")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Shared registry of compiled Jinja templates for email builders and master files
+Templates live in templates/<area>/ at the repo root and are compiled once per
+process (auto_reload off, so no per-render stat either). Compiled bytecode is
+also cached on disk, so a fresh cron/worker process skips parsing too. Large
+documents can be streamed in chunks instead of built as one string
+"""
+import os
+import tempfile
+from typing import IO, Any, Iterator
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+CACHE_DIR = os.getenv('TEMPLATE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'podcast_template_cache'))
+
+_environment = None
+
+
+def get_environment() -> Environment:
+    """Process-wide environment; created on first use"""
+    global _environment
+    if _environment is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            bytecode_cache=FileSystemBytecodeCache(CACHE_DIR),
+            auto_reload=False,
+            # Same output as the inline Template() strings these replace
+            autoescape=False,
+            keep_trailing_newline=True,
+        )
+    return _environment
+
+
+def get_template(name: str) -> Template:
+    """Compiled template by path relative to templates/, e.g. 'email/weekly_digest.html.j2'"""
+    return get_environment().get_template(name)
+
+
+def render(name: str, **context: Any) -> str:
+    return get_template(name).render(**context)
+
+
+def stream(name: str, buffer_size: int = 8, **context: Any) -> Iterator[str]:
+    """Yield the rendered output in chunks of buffer_size template events"""
+    template_stream = get_template(name).stream(**context)
+    template_stream.enable_buffering(buffer_size)
+    return iter(template_stream)
+
+
+def render_to_file(name: str, fp: IO[str], **context: Any) -> None:
+    """Stream straight into an open file without holding the whole document"""
+    get_template(name).stream(**context).dump(fp)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Content-addressed transcript cache
+Transcripts are keyed by a SHA-256 of the downloaded audio bytes plus the ffprobe
+duration, so re-posted episodes and rotated CDN URLs reuse an existing transcript
+"""
+import hashlib
+import json
+import subprocess
+from datetime import datetime
+from typing import Optional, Tuple
+
+from core.db import get_connection
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS transcript_cache (
+        fingerprint TEXT PRIMARY KEY,
+        audio_sha256 TEXT NOT NULL,
+        duration_seconds INTEGER,
+        transcript TEXT NOT NULL,
+        model TEXT,
+        source_url TEXT,
+        hit_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP,
+        last_used_at TIMESTAMP
+    )
+"""
+
+
+def probe_duration(audio_path: str) -> Optional[float]:
+    """Return audio duration in seconds, or None if ffprobe is unavailable"""
+    try:
+        probe_cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', audio_path]
+        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
+        return float(json.loads(probe_result.stdout)['format']['duration'])
+    except (subprocess.CalledProcessError, FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+def fingerprint_audio(audio_path: str, chunk_size: int = 1024 * 1024) -> Tuple[str, str, Optional[int]]:
+    """Return (fingerprint, sha256, duration_seconds) for an audio file"""
+    digest = hashlib.sha256()
+    with open(audio_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+
+    sha256 = digest.hexdigest()
+    duration = probe_duration(audio_path)
+    duration_seconds = int(round(duration)) if duration is not None else None
+    fingerprint = f"{sha256}:{duration_seconds if duration_seconds is not None else 'unknown'}"
+    return fingerprint, sha256, duration_seconds
+
+
+class TranscriptCache:
+    def __init__(self, db_path: str = "podcast_app_v2.db"):
+        self.db_path = db_path
+        self.ensure_table()
+
+    def get_db_connection(self):
+        return get_connection(self.db_path)
+
+    def ensure_table(self):
+        conn = self.get_db_connection()
+        conn.execute(CREATE_TABLE_SQL)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transcript_cache_sha256 ON transcript_cache(audio_sha256)")
+        conn.commit()
+        conn.close()
+
+    def lookup(self, fingerprint: str) -> Optional[str]:
+        """Return the cached transcript for a fingerprint and record the hit"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT transcript FROM transcript_cache WHERE fingerprint = ?", (fingerprint,))
+        row = cursor.fetchone()
+        if row:
+            cursor.execute(
+                "UPDATE transcript_cache SET hit_count = hit_count + 1, last_used_at = ? WHERE fingerprint = ?",
+                (datetime.now().isoformat(), fingerprint)
+            )
+            conn.commit()
+        conn.close()
+        return row[0] if row else None
+
+    def store(self, fingerprint: str, sha256: str, duration_seconds: Optional[int], transcript: str,
+              model: str = "whisper-1", source_url: str = None):
+        """Save a transcript under its audio fingerprint"""
+        now = datetime.now().isoformat()
+        conn = self.get_db_connection()
+        conn.execute("""
+            INSERT OR REPLACE INTO transcript_cache
+                (fingerprint, audio_sha256, duration_seconds, transcript, model, source_url, hit_count, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)
+        """, (fingerprint, sha256, duration_seconds, transcript, model, source_url, now, now))
+        conn.commit()
+        conn.close()
+
+    def get_or_transcribe(self, audio_path: str, transcribe_fn, source_url: str = None,
+                          model: str = "whisper-1") -> Optional[str]:
+        """Return a cached transcript for the audio, or transcribe it and cache the result"""
+        fingerprint, sha256, duration_seconds = fingerprint_audio(audio_path)
+
+        cached = self.lookup(fingerprint)
+        if cached:
+            print(f"   ♻️ Transcript cache hit ({sha256[:12]})")
+            return cached
+
+        transcript = transcribe_fn(audio_path)
+        if transcript:
+            self.store(fingerprint, sha256, duration_seconds, transcript, model=model, source_url=source_url)
+        return transcript
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Transcript storage split out of the episodes table
+Transcripts live in their own `transcripts` table (matching the SQLAlchemy
+Transcript model), optionally zlib/zstd-compressed, so scans over episodes only
+read small metadata rows. Length checks use the char_count column; SQL that needs
+the text calls decode_transcript(), registered on connections from
+core.db.get_connection()
+"""
+import os
+import zlib
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+DEFAULT_COMPRESSION = os.getenv('TRANSCRIPT_COMPRESSION', 'zlib')  # none / zlib / zstd
+
+# Select-list expression for the text of transcripts aliased as `t`
+TRANSCRIPT_TEXT_SQL = "decode_transcript(t.compression, t.transcript_text, t.compressed_text)"
+
+COLUMNS = {
+    'transcript_text': "TEXT NOT NULL DEFAULT ''",
+    'compressed_text': 'BLOB',
+    'compression': "TEXT NOT NULL DEFAULT 'none'",
+    'char_count': 'INTEGER',
+    'word_count': 'INTEGER',
+    'transcription_service': "TEXT DEFAULT 'whisper-1'",
+    'processing_time_seconds': 'REAL',
+    'created_at': 'TIMESTAMP',
+}
+
+
+def encode(text: str, compression: str = DEFAULT_COMPRESSION) -> Tuple[str, Optional[bytes], str]:
+    """Return (transcript_text, compressed_text, compression) column values"""
+    if compression == 'zstd' and not ZSTD_AVAILABLE:
+        compression = 'zlib'
+    if compression == 'zlib':
+        return '', zlib.compress(text.encode('utf-8'), 6), 'zlib'
+    if compression == 'zstd':
+        return '', zstandard.ZstdCompressor(level=9).compress(text.encode('utf-8')), 'zstd'
+    return text, None, 'none'
+
+
+def decode(compression: Optional[str], transcript_text: Optional[str], compressed_text: Optional[bytes]) -> Optional[str]:
+    if compression == 'zlib' and compressed_text is not None:
+        return zlib.decompress(compressed_text).decode('utf-8')
+    if compression == 'zstd' and compressed_text is not None:
+        return zstandard.ZstdDecompressor().decompress(compressed_text).decode('utf-8')
+    return transcript_text
+
+
+def register_functions(conn: sqlite3.Connection):
+    """Make decode_transcript(compression, transcript_text, compressed_text) available in SQL"""
+    conn.create_function('decode_transcript', 3, decode, deterministic=True)
+
+
+def ensure_table(conn: sqlite3.Connection):
+    """Create the transcripts table, or add the storage columns to one created by the app"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS transcripts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            episode_id INTEGER NOT NULL UNIQUE REFERENCES episodes(id)
+        )
+    """)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(transcripts)")}
+    for column, definition in COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE transcripts ADD COLUMN {column} {definition}")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transcripts_episode ON transcripts(episode_id)")
+    conn.commit()
+
+
+def save(conn: sqlite3.Connection, episode_id: int, text: str, service: str = 'whisper-1',
+         compression: str = DEFAULT_COMPRESSION):
+    """Insert or replace the transcript for an episode (caller commits)"""
+    transcript_text, compressed_text, compression = encode(text, compression)
+    conn.execute("""
+        INSERT INTO transcripts (episode_id, transcript_text, compressed_text, compression,
+                                 char_count, word_count, transcription_service, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(episode_id) DO UPDATE SET
+            transcript_text = excluded.transcript_text,
+            compressed_text = excluded.compressed_text,
+            compression = excluded.compression,
+            char_count = excluded.char_count,
+            word_count = excluded.word_count,
+            transcription_service = excluded.transcription_service
+    """, (episode_id, transcript_text, compressed_text, compression, len(text), len(text.split()),
+          service, datetime.now().isoformat()))
+
+
+def load(conn: sqlite3.Connection, episode_id: int) -> Optional[str]:
+    """Load and decompress one transcript"""
+    row = conn.execute(
+        "SELECT compression, transcript_text, compressed_text FROM transcripts WHERE episode_id = ?",
+        (episode_id,)
+    ).fetchone()
+    return decode(*row) if row else None
+
+
+def load_many(conn: sqlite3.Connection, episode_ids: Iterable[int]) -> Dict[int, str]:
+    """Load several transcripts keyed by episode ID"""
+    ids = list(episode_ids)
+    transcripts = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        for episode_id, compression, text, blob in conn.execute(
+            f"SELECT episode_id, compression, transcript_text, compressed_text FROM transcripts "
+            f"WHERE episode_id IN ({placeholders})", chunk
+        ):
+            transcripts[episode_id] = decode(compression, text, blob)
+    return transcripts
+
+
+def migrate_episode_transcripts(conn: sqlite3.Connection, batch_size: int = 200,
+                                compression: str = DEFAULT_COMPRESSION) -> int:
+    """Move transcripts still stored on episodes rows into the transcripts table"""
+    ensure_table(conn)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(episodes)")}
+    if 'transcript' not in columns:
+        return 0
+
+    moved = 0
+    while True:
+        rows = conn.execute("""
+            SELECT id, transcript FROM episodes
+            WHERE transcript IS NOT NULL AND transcript != ''
+            LIMIT ?
+        """, (batch_size,)).fetchall()
+        if not rows:
+            break
+        for episode_id, text in rows:
+            save(conn, episode_id, text, compression=compression)
+        conn.executemany("UPDATE episodes SET transcript = NULL WHERE id = ?", [(row[0],) for row in rows])
+        conn.commit()
+        moved += len(rows)
+    # Clear empty-string placeholders too so episodes rows stay small
+    conn.execute("UPDATE episodes SET transcript = NULL WHERE transcript = ''")
+    conn.commit()
+    return moved
@@ -3,11 +3,15 @@
 Working analysis processor that handles full transcripts and uses OpenAI instead of Anthropic
 """
 import os
-import sqlite3
+import sys
 import openai
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.db import get_connection
+from core.transcript_store import TRANSCRIPT_TEXT_SQL
+
 # Load environment variables
 load_dotenv()
 
@@ -164,17 +168,17 @@ Extract 5-7 most significant quotes focusing on:
 - Highlight any proprietary Goldman Sachs research or data
 - Focus on actionable market intelligence"""
 
-    conn = sqlite3.connect('podcast_app_v2.db')
+    conn = get_connection('podcast_app_v2.db')
     cursor = conn.cursor()
     
     # Get episodes that need analysis - focusing on recent ones first
-    cursor.execute("""
-        SELECT e.id, e.title, e.transcript, p.id as podcast_id, p.name as podcast_name
+    cursor.execute(f"""
+        SELECT e.id, e.title, {TRANSCRIPT_TEXT_SQL}, p.id as podcast_id, p.name as podcast_name
         FROM episodes e
         JOIN podcasts p ON e.podcast_id = p.id
+        JOIN transcripts t ON t.episode_id = e.id
         WHERE e.podcast_id IN (3, 6, 7, 8, 10) 
-        AND e.transcript IS NOT NULL AND e.transcript != ''
-        AND LENGTH(e.transcript) > 1000
+        AND t.char_count > 1000
         AND e.id NOT IN (SELECT episode_id FROM analysis_reports WHERE episode_id IS NOT NULL)
         ORDER BY e.publish_date DESC
         LIMIT 20
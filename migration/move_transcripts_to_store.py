@@ -0,0 +1,57 @@
+"""
+Move transcripts out of episodes.transcript into the transcripts table
+Safe to re-run: only rows still carrying a transcript are moved. Run VACUUM
+afterwards (done here unless --no-vacuum) to give the freed pages back
+"""
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+# Add repo root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import transcript_store
+from core.db import get_connection
+
+
+def main():
+    """Run the transcript storage migration"""
+    db_path = next((arg for arg in sys.argv[1:] if not arg.startswith('--')), 'podcast_app_v2.db')
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found at {db_path}")
+        sys.exit(1)
+
+    print("Transcript storage migration")
+    print("=" * 60)
+    print(f"Database: {db_path}")
+    print(f"Compression: {transcript_store.DEFAULT_COMPRESSION}")
+
+    size_before = os.path.getsize(db_path)
+    conn = get_connection(db_path)
+
+    # Online backup includes pages still sitting in the WAL file
+    backup_path = f"{db_path}.{datetime.now().strftime('%Y%m%d_%H%M%S')}.bak"
+    backup = sqlite3.connect(backup_path)
+    conn.backup(backup)
+    backup.close()
+    print(f"💾 Backup written to {backup_path}")
+    try:
+        moved = transcript_store.migrate_episode_transcripts(conn)
+        print(f"✅ Moved {moved} transcripts into the transcripts table")
+
+        if '--no-vacuum' not in sys.argv:
+            print("🧹 Vacuuming...")
+            conn.execute("VACUUM")
+
+        count, chars = conn.execute("SELECT COUNT(*), COALESCE(SUM(char_count), 0) FROM transcripts").fetchone()
+        print(f"📊 {count} transcripts, {chars:,} characters stored")
+    finally:
+        conn.close()
+
+    size_after = os.path.getsize(db_path)
+    print(f"📦 Database size: {size_before / 1e6:.1f} MB → {size_after / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,16 @@ Add new podcasts and process episodes from December 2024 onwards
 - Re-enable Crossroads with proper RSS parsing
 """
 import os
-import sqlite3
+import sys
 import feedparser
 import requests
 from datetime import datetime, timedelta
 from enhanced_automation import EnhancedPodcastSystem
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.db import get_connection
+from core.transcript_store import TRANSCRIPT_TEXT_SQL
+
 class NewPodcastAdder:
     def __init__(self):
         self.db_path = 'podcast_app_v2.db'
@@ -44,7 +48,7 @@ class NewPodcastAdder:
         """Add new podcasts to database"""
         print("📝 Adding new podcasts to database...")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         for podcast in self.new_podcasts:
@@ -77,7 +81,7 @@ class NewPodcastAdder:
         """Re-enable Crossroads in daily automation"""
         print("🔧 Re-enabling Crossroads for daily automation...")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # Update Crossroads to use proper RSS URL
@@ -96,7 +100,7 @@ class NewPodcastAdder:
         """Process episodes from December 2024 onwards for all new podcasts + Crossroads"""
         print(f"🔧 Processing episodes since {self.cutoff_date.strftime('%Y-%m-%d')}...")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         # Get all podcasts to process (new ones + Crossroads)
@@ -164,7 +168,7 @@ class NewPodcastAdder:
                 # Check if episode is recent enough
                 if episode_dt >= self.cutoff_date:
                     # Check if already exists in database
-                    conn = sqlite3.connect(self.db_path)
+                    conn = get_connection(self.db_path)
                     cursor = conn.cursor()
                     
                     cursor.execute('''
@@ -191,7 +195,7 @@ class NewPodcastAdder:
         """Create master files for new podcasts"""
         print("\n📝 Creating master files for new podcasts...")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         for podcast in self.new_podcasts:
@@ -204,8 +208,9 @@ class NewPodcastAdder:
                 
                 # Check if we have any episodes with transcripts
                 cursor.execute('''
-                    SELECT COUNT(*) FROM episodes 
-                    WHERE podcast_id = ? AND transcript IS NOT NULL AND LENGTH(transcript) > 100
+                    SELECT COUNT(*) FROM episodes e
+                    JOIN transcripts t ON t.episode_id = e.id
+                    WHERE e.podcast_id = ? AND t.char_count > 100
                 ''', (podcast_id,))
                 
                 episode_count = cursor.fetchone()[0]
@@ -219,13 +224,13 @@ class NewPodcastAdder:
                     filepath = Path('content/master_transcripts') / filename
                     
                     # Get episodes for master file
-                    cursor.execute('''
-                        SELECT title, publish_date, transcript, id
-                        FROM episodes 
-                        WHERE podcast_id = ? 
-                        AND transcript IS NOT NULL 
-                        AND LENGTH(transcript) > 100
-                        ORDER BY publish_date DESC
+                    cursor.execute(f'''
+                        SELECT e.title, e.publish_date, {TRANSCRIPT_TEXT_SQL}, e.id
+                        FROM episodes e
+                        JOIN transcripts t ON t.episode_id = e.id
+                        WHERE e.podcast_id = ? 
+                        AND t.char_count > 100
+                        ORDER BY e.publish_date DESC
                     ''', (podcast_id,))
                     
                     episodes = cursor.fetchall()
@@ -266,7 +271,7 @@ class NewPodcastAdder:
         """Show final summary of what was added"""
         print("\n📊 Final Summary:")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         all_podcasts = [p['name'] for p in self.new_podcasts] + ['Crossroads: The Infrastructure Podcast']
@@ -274,10 +279,11 @@ class NewPodcastAdder:
         for podcast_name in all_podcasts:
             cursor.execute('''
                 SELECT COUNT(*) as total,
-                       COUNT(CASE WHEN transcript IS NOT NULL AND LENGTH(transcript) > 100 THEN 1 END) as with_transcripts,
-                       COUNT(CASE WHEN created_at >= ? THEN 1 END) as recent
+                       COUNT(CASE WHEN t.char_count > 100 THEN 1 END) as with_transcripts,
+                       COUNT(CASE WHEN e.created_at >= ? THEN 1 END) as recent
                 FROM episodes e
                 JOIN podcasts p ON e.podcast_id = p.id
+                LEFT JOIN transcripts t ON t.episode_id = e.id
                 WHERE p.name = ?
             ''', (self.cutoff_date.isoformat(), podcast_name))
             
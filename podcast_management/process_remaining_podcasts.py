@@ -4,17 +4,26 @@ Process remaining three podcasts: Optimistic Outlook, The Engineers Collective,
 Only process episodes from December 2024 onwards for these new podcasts
 """
 import os
-import sqlite3
+import sys
 import feedparser
 import requests
 from datetime import datetime, timedelta
-from enhanced_automation import EnhancedPodcastSystem
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'automation'))
+from unified_podcast_automation import EnhancedPodcastSystem
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.db import get_connection
 
 class RemainingPodcastProcessor:
-    def __init__(self):
+    def __init__(self, batch_mode=False):
         self.db_path = 'podcast_app_v2.db'
         self.automation_system = EnhancedPodcastSystem()
         
+        # Batch mode transcribes now and analyzes everything in one Message Batches job
+        self.batch_mode = batch_mode
+        self.pending_analysis_ids = []
+        
         # Remaining podcasts to process
         self.remaining_podcasts = [
             'Optimistic Outlook',
@@ -29,7 +38,7 @@ class RemainingPodcastProcessor:
         """Process the three remaining podcasts"""
         print(f"🔧 Processing remaining podcasts since {self.cutoff_date.strftime('%Y-%m-%d')}...")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         for podcast_name in self.remaining_podcasts:
@@ -56,9 +65,10 @@ class RemainingPodcastProcessor:
                     batch = episodes_to_process[i:i+3]
                     print(f"  🔧 Processing batch {i//3 + 1}: {len(batch)} episodes")
                     
-                    processed = self.automation_system.process_new_episodes(batch)
+                    processed = self.automation_system.process_new_episodes(batch, analyze=not self.batch_mode)
                     
                     if processed:
+                        self.pending_analysis_ids.extend(episode['episode_id'] for episode in processed)
                         # Add to master files
                         self.automation_system.append_to_master_files(processed)
                         print(f"    ✅ Processed {len(processed)} episodes")
@@ -68,6 +78,10 @@ class RemainingPodcastProcessor:
                 print(f"  📭 No episodes found since Dec 2024")
         
         conn.close()
+        
+        if self.batch_mode and self.pending_analysis_ids:
+            print(f"\n📦 Submitting {len(self.pending_analysis_ids)} analyses as a batch job...")
+            self.automation_system.batch_analyze_pending(self.pending_analysis_ids)
     
     def find_recent_episodes(self, rss_url, podcast_id, podcast_name):
         """Find episodes since December 2024"""
@@ -94,7 +108,7 @@ class RemainingPodcastProcessor:
                 # Check if episode is recent enough
                 if episode_dt >= self.cutoff_date:
                     # Check if already exists in database
-                    conn = sqlite3.connect(self.db_path)
+                    conn = get_connection(self.db_path)
                     cursor = conn.cursor()
                     
                     cursor.execute('''
@@ -121,7 +135,7 @@ class RemainingPodcastProcessor:
         """Show final status for all podcasts"""
         print("\n📊 Final Status Summary:")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         all_podcasts = self.remaining_podcasts + ['Crossroads: The Infrastructure Podcast']
@@ -129,10 +143,11 @@ class RemainingPodcastProcessor:
         for podcast_name in all_podcasts:
             cursor.execute('''
                 SELECT COUNT(*) as total,
-                       COUNT(CASE WHEN transcript IS NOT NULL AND LENGTH(transcript) > 100 THEN 1 END) as with_transcripts,
-                       COUNT(CASE WHEN created_at >= ? THEN 1 END) as recent
+                       COUNT(CASE WHEN t.char_count > 100 THEN 1 END) as with_transcripts,
+                       COUNT(CASE WHEN e.created_at >= ? THEN 1 END) as recent
                 FROM episodes e
                 JOIN podcasts p ON e.podcast_id = p.id
+                LEFT JOIN transcripts t ON t.episode_id = e.id
                 WHERE p.name = ?
             ''', (self.cutoff_date.isoformat(), podcast_name))
             
@@ -147,6 +162,6 @@ class RemainingPodcastProcessor:
         conn.close()
 
 if __name__ == "__main__":
-    processor = RemainingPodcastProcessor()
+    processor = RemainingPodcastProcessor(batch_mode='--batch' in sys.argv)
     processor.process_remaining_podcasts()
     processor.show_final_status()
\ No newline at end of file
@@ -4,16 +4,18 @@ Process a single podcast at a time to avoid timeouts
 """
 import os
 import sys
-import sqlite3
 from enhanced_automation import EnhancedPodcastSystem
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.db import get_connection
+
 def process_single_podcast(podcast_name):
     print(f"🎧 Processing {podcast_name}...")
     
     automation = EnhancedPodcastSystem()
     
-    conn = sqlite3.connect('podcast_app_v2.db')
+    conn = get_connection('podcast_app_v2.db')
     cursor = conn.cursor()
     
     # Get podcast info
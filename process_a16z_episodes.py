@@ -3,7 +3,7 @@
 Process last 20 episodes of a16z podcast
 """
 import os
-import sqlite3
+import sys
 import feedparser
 import requests
 import tempfile
@@ -13,8 +13,17 @@ from datetime import datetime
 from dotenv import load_dotenv
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.transcript_cache import TranscriptCache
+from core.master_file_store import MasterFileStore
+from core import transcript_store
+from core.schema_indexes import ensure_indexes
+from core.db import get_connection
+
 load_dotenv()
 
+transcript_cache = None
+
 def get_openai_client():
     api_key = os.getenv('OPENAI_API_KEY')
     return openai.OpenAI(api_key=api_key)
@@ -23,6 +32,12 @@ def get_anthropic_client():
     api_key = os.getenv('ANTHROPIC_API_KEY')
     return anthropic.Anthropic(api_key=api_key)
 
+def get_transcript_cache():
+    global transcript_cache
+    if transcript_cache is None:
+        transcript_cache = TranscriptCache('podcast_app_v2.db')
+    return transcript_cache
+
 def compress_audio_if_needed(audio_path):
     """Compress audio if over 25MB"""
     import subprocess
@@ -67,6 +82,23 @@ def compress_audio_if_needed(audio_path):
         print(f"   ❌ Compression failed: {e}")
         return None
 
+def transcribe_audio_file(audio_path):
+    """Compress if needed and send to Whisper"""
+    audio_path = compress_audio_if_needed(audio_path)
+    if not audio_path:
+        return None
+    
+    print(f"   🎤 Transcribing...")
+    with open(audio_path, 'rb') as audio_file:
+        transcript = get_openai_client().audio.transcriptions.create(
+            model="whisper-1",
+            file=audio_file,
+            response_format="text"
+        )
+    
+    os.unlink(audio_path)
+    return transcript
+
 def transcribe_episode(audio_url, title):
     """Download and transcribe episode"""
     try:
@@ -81,21 +113,13 @@ def transcribe_episode(audio_url, title):
                     temp_file.write(chunk)
             audio_path = temp_file.name
         
-        # Check file size
-        audio_path = compress_audio_if_needed(audio_path)
-        if not audio_path:
-            return None
-        
-        # Transcribe
-        print(f"   🎤 Transcribing...")
-        with open(audio_path, 'rb') as audio_file:
-            transcript = get_openai_client().audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="text"
-            )
+        # Reuse a cached transcript of identical audio, otherwise transcribe
+        transcript = get_transcript_cache().get_or_transcribe(audio_path, transcribe_audio_file, source_url=audio_url)
+        if os.path.exists(audio_path):
+            os.unlink(audio_path)
         
-        os.unlink(audio_path)
+        if not transcript:
+            return None
         
         if len(transcript) < 100:
             print(f"   ❌ Transcript too short")
@@ -201,15 +225,15 @@ TRANSCRIPT:
 def save_to_database(podcast_id, episode_data, transcript, analysis):
     """Save episode to database"""
     try:
-        conn = sqlite3.connect('podcast_app_v2.db')
+        conn = get_connection('podcast_app_v2.db')
         cursor = conn.cursor()
         
         # Insert episode
         cursor.execute('''
             INSERT INTO episodes (
                 podcast_id, title, audio_url, publish_date, 
-                episode_url, guid, transcript, transcribed, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+                episode_url, guid, transcribed, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, 1, ?)
         ''', (
             podcast_id,
             episode_data['title'],
@@ -217,11 +241,11 @@ def save_to_database(podcast_id, episode_data, transcript, analysis):
             episode_data.get('publish_date'),
             episode_data.get('episode_url', ''),
             episode_data.get('guid', episode_data['audio_url']),
-            transcript,
             datetime.now().isoformat()
         ))
         
         episode_id = cursor.lastrowid
+        transcript_store.save(conn, episode_id, transcript)
         
         # Save analysis
         cursor.execute("""
@@ -243,67 +267,15 @@ def update_master_file(episode_data, transcript):
     """Update a16z master transcript file"""
     try:
         master_dir = Path('content/master_transcripts')
-        master_dir.mkdir(parents=True, exist_ok=True)
-        
-        filepath = master_dir / 'a16z_Podcast_Master_Transcripts.md'
         
         # Parse date
         pub_date = episode_data.get('publish_date', '').split('T')[0] if episode_data.get('publish_date') else datetime.now().strftime('%Y-%m-%d')
         
-        # Create episode content
-        episode_content = f"""## {pub_date}
-
-### {episode_data['title']}
-**Publication Date:** {pub_date}T00:00:00
-**Episode ID:** {episode_data['episode_id']}
-
-**Full Transcript:**
-{transcript}
-
----
-
-"""
-        
-        if filepath.exists():
-            # Read existing file
-            with open(filepath, 'r', encoding='utf-8') as f:
-                existing_content = f.read()
-            
-            # Insert new episode at top (after header)
-            header_end = existing_content.find("---\n\n")
-            if header_end != -1:
-                header_part = existing_content[:header_end + 5]
-                episodes_part = existing_content[header_end + 5:]
-                new_content = header_part + episode_content + episodes_part
-                
-                # Update episode count
-                import re
-                episode_count_match = re.search(r'\*\*Total Episodes:\*\* (\d+)', header_part)
-                if episode_count_match:
-                    current_count = int(episode_count_match.group(1))
-                    new_count = current_count + 1
-                    new_content = new_content.replace(
-                        f"**Total Episodes:** {current_count}",
-                        f"**Total Episodes:** {new_count}"
-                    )
-            else:
-                new_content = existing_content + episode_content
-        else:
-            # Create new file
-            new_content = f"""# a16z Podcast - Master Transcripts
-
-**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-**Total Episodes:** 1
-
-Episodes organized by publication date (newest first).
-
----
-
-{episode_content}"""
-        
-        # Save file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        # Appends to the end of the file; newest-first order is restored on compaction
+        MasterFileStore(master_dir).append(
+            'a16z_Podcast_Master_Transcripts.md', 'a16z Podcast',
+            episode_data['episode_id'], pub_date, episode_data['title'], transcript
+        )
         
         print(f"   ✅ Updated master file")
         
@@ -315,7 +287,7 @@ def main():
     print("=" * 60)
     
     # Get podcast ID
-    conn = sqlite3.connect('podcast_app_v2.db')
+    conn = get_connection('podcast_app_v2.db')
     cursor = conn.cursor()
     cursor.execute("SELECT id FROM podcasts WHERE name = 'a16z Podcast'")
     result = cursor.fetchone()
@@ -324,6 +296,8 @@ def main():
         return
     
     podcast_id = result[0]
+    transcript_store.migrate_episode_transcripts(conn)
+    ensure_indexes(conn)
     conn.close()
     
     # Parse RSS feed
@@ -373,7 +347,7 @@ def main():
             }
             
             # Check if episode already exists
-            conn = sqlite3.connect('podcast_app_v2.db')
+            conn = get_connection('podcast_app_v2.db')
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id FROM episodes 
@@ -1,14 +1,25 @@
 #!/usr/bin/env python3
 """
 Rebuild all master transcript files from database
+Podcasts are rendered in parallel worker processes and skipped when their
+transcripts have not changed since the last rebuild. Usage:
+    rebuild_master_files.py [--force]
 """
-import sqlite3
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
-def rebuild_master_files():
-    """Rebuild all master transcript files from existing database data"""
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core import master_rebuild
+from core.db import get_connection
+from core.transcript_store import TRANSCRIPT_TEXT_SQL
+
+DB_PATH = 'podcast_app_v2.db'
+STATE_FILE = '.rebuild_state.json'
+
+def rebuild_master_files(force=False, workers=master_rebuild.DEFAULT_WORKERS):
+    """Rebuild master transcript files whose source rows changed (all of them with force=True)"""
     
     print("🔧 REBUILDING ALL MASTER TRANSCRIPT FILES")
     print("=" * 60)
@@ -31,94 +42,59 @@ def rebuild_master_files():
         'a16z Podcast': 'a16z_Podcast_Master_Transcripts.md'
     }
     
-    conn = sqlite3.connect('podcast_app_v2.db')
-    cursor = conn.cursor()
+    conn = get_connection(DB_PATH)
+    podcast_ids = dict(conn.execute("""
+        SELECT name, id FROM podcasts WHERE name IN ({})
+    """.format(','.join(['?' for _ in podcast_files.keys()])), list(podcast_files.keys())).fetchall())
     
-    # Get all podcasts with transcripts
-    cursor.execute("""
-        SELECT p.name, COUNT(e.id) as total_episodes, 
-               COUNT(CASE WHEN e.transcript IS NOT NULL AND e.transcript != '' THEN 1 END) as with_transcripts
-        FROM podcasts p 
-        LEFT JOIN episodes e ON p.id = e.podcast_id 
-        WHERE p.name IN ({})
-        GROUP BY p.name
-        ORDER BY p.name
-    """.format(','.join(['?' for _ in podcast_files.keys()])), list(podcast_files.keys()))
-    
-    podcast_stats = cursor.fetchall()
+    # One aggregate pass decides which podcasts changed since the last rebuild
+    fingerprints = master_rebuild.transcript_fingerprints(conn)
+    conn.close()
     
-    for podcast_name, total_episodes, with_transcripts in podcast_stats:
-        print(f"\n📝 {podcast_name}")
-        print(f"   Episodes: {total_episodes}, With transcripts: {with_transcripts}")
-        
-        if with_transcripts == 0:
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    jobs = []
+    for podcast_name in sorted(podcast_ids):
+        podcast_id = podcast_ids[podcast_name]
+        fingerprint = fingerprints.get(podcast_id)
+        if not fingerprint:
+            print(f"\n📝 {podcast_name}")
             print("   ⏭️  No transcripts, skipping")
             continue
         
-        filename = podcast_files.get(podcast_name)
-        if not filename:
-            print("   ❌ No filename configured")
-            continue
-        
-        filepath = master_dir / filename
-        
-        # Get all episodes with transcripts for this podcast, ordered by date
-        cursor.execute("""
-            SELECT e.id, e.title, e.publish_date, e.transcript
-            FROM episodes e
-            JOIN podcasts p ON e.podcast_id = p.id
-            WHERE p.name = ? 
-            AND e.transcript IS NOT NULL 
-            AND e.transcript != ''
-            ORDER BY e.publish_date DESC
-        """, (podcast_name,))
-        
-        episodes = cursor.fetchall()
-        
-        if not episodes:
-            print("   ⏭️  No transcribed episodes found")
-            continue
-        
-        # Build master file content
-        content = f"""# {podcast_name} - Master Transcripts
-
-**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-**Total Episodes:** {len(episodes)}
-
-Episodes organized by publication date (newest first).
-
----
-
-"""
-        
-        for episode_id, title, publish_date, transcript in episodes:
-            # Parse date
-            if publish_date:
-                date_str = publish_date.split('T')[0] if 'T' in publish_date else publish_date.split(' ')[0]
-            else:
-                date_str = 'Unknown'
-            
-            episode_content = f"""## {date_str}
-
-### {title}
-**Publication Date:** {publish_date or 'Unknown'}
-**Episode ID:** {episode_id}
-
-**Full Transcript:**
-{transcript}
-
----
-
-"""
-            content += episode_content
-        
-        # Write master file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        print(f"   ✅ Created {filename} with {len(episodes)} episodes")
+        jobs.append({
+            'key': podcast_files[podcast_name],
+            'fingerprint': fingerprint,
+            'path': str(master_dir / podcast_files[podcast_name]),
+            'template': 'master/podcast_transcripts.md.j2',
+            'sql': f"""
+                SELECT e.id, e.title, e.publish_date,
+                       {TRANSCRIPT_TEXT_SQL} AS transcript
+                FROM episodes e
+                JOIN transcripts t ON t.episode_id = e.id
+                WHERE e.podcast_id = ?
+                AND t.char_count > 0
+                ORDER BY e.publish_date DESC
+            """,
+            'params': (podcast_id,),
+            'context': {'podcast_name': podcast_name, 'generated': generated, 'total': fingerprint[0]},
+        })
     
-    conn.close()
+    print(f"\n⚙️  Rebuilding changed podcasts with up to {workers} worker processes...")
+    results = master_rebuild.rebuild(DB_PATH, jobs, str(master_dir / STATE_FILE), workers=workers, force=force)
+    
+    for job in jobs:
+        filename = job['key']
+        print(f"\n📝 {job['context']['podcast_name']}")
+        if filename in results['skipped']:
+            print(f"   ⏭️  Unchanged since last rebuild ({job['fingerprint'][0]} episodes)")
+        elif filename in results['failed']:
+            print(f"   ❌ Rebuild failed: {results['failed'][filename]}")
+        else:
+            print(f"   ✅ Created {filename} with {job['fingerprint'][0]} episodes "
+                  f"({results['rebuilt'][filename]['seconds']:.1f}s)")
+    
+    print(f"\n📊 {len(results['rebuilt'])} rebuilt, {len(results['skipped'])} unchanged, "
+          f"{len(results['failed'])} failed")
     
     print(f"\n🎯 MASTER FILES REBUILD COMPLETE")
     print(f"📁 Files saved to: {master_dir}")
@@ -130,4 +106,4 @@ Episodes organized by publication date (newest first).
         print(f"   {file.name} ({size_kb:.1f}KB)")
 
 if __name__ == "__main__":
-    rebuild_master_files()
\ No newline at end of file
+    rebuild_master_files(force='--force' in sys.argv)
\ No newline at end of file
@@ -2,12 +2,17 @@
 AI Analyzer for RSS Intelligence System
 Handles article analysis using Claude or OpenAI APIs
 """
+import os
+import sys
 import asyncio
 import logging
 from typing import Optional
 import aiohttp
 import json
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.rate_limiter import RetryableError, RETRYABLE_STATUS, get_rate_limiter, estimate_tokens, parse_retry_after
+
 logger = logging.getLogger(__name__)
 
 class AIAnalyzer:
@@ -28,6 +33,55 @@ class AIAnalyzer:
             self.api_url = 'https://api.openai.com/v1/chat/completions'
         else:
             raise ValueError(f"Unsupported AI provider: {self.provider}")
+        
+        self.rate_limiter = get_rate_limiter('anthropic' if self.provider == 'claude' else 'openai', self.model)
+        self.max_concurrency = config.ai_settings.get('max_concurrency', 3)
+        
+        # Long-lived pooled HTTP client shared by every analysis (created on first use
+        # so it binds to the running event loop). aiohttp speaks HTTP/1.1 with keep-alive.
+        self.max_connections = config.ai_settings.get('max_connections', 10)
+        self.keepalive_timeout = config.ai_settings.get('keepalive_timeout', 60)
+        self.request_timeout = config.ai_settings.get('request_timeout', 120)
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared client session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the pooled client session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    @staticmethod
+    async def _raise_for_status(response, provider_name: str):
+        """Raise RetryableError for 429/5xx so the rate limiter backs off and retries"""
+        if response.status == 200:
+            return
+        error_text = await response.text()
+        message = f"{provider_name} API error {response.status}: {error_text}"
+        if response.status in RETRYABLE_STATUS:
+            raise RetryableError(message, status=response.status,
+                                 retry_after=parse_retry_after(response.headers.get('retry-after')))
+        raise Exception(message)
     
     async def analyze_article(self, article_content: str) -> str:
         """Analyze article content using AI"""
@@ -35,10 +89,15 @@ class AIAnalyzer:
             return "Content too short for analysis"
         
         try:
+            estimated_tokens = estimate_tokens(self.prompt_template, article_content)
             if self.provider == 'claude':
-                return await self._analyze_with_claude(article_content)
+                return await self.rate_limiter.call_async(
+                    self._analyze_with_claude, article_content, estimated_tokens=estimated_tokens
+                )
             elif self.provider == 'openai':
-                return await self._analyze_with_openai(article_content)
+                return await self.rate_limiter.call_async(
+                    self._analyze_with_openai, article_content, estimated_tokens=estimated_tokens
+                )
             else:
                 raise ValueError(f"Unsupported provider: {self.provider}")
                 
@@ -67,18 +126,16 @@ class AIAnalyzer:
             ]
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.api_url, headers=headers, json=payload) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"Claude API error {response.status}: {error_text}")
-                
-                result = await response.json()
-                
-                if 'content' in result and result['content']:
-                    return result['content'][0]['text']
-                else:
-                    raise Exception(f"Unexpected Claude response format: {result}")
+        session = await self._get_session()
+        async with session.post(self.api_url, headers=headers, json=payload) as response:
+            await self._raise_for_status(response, "Claude")
+            
+            result = await response.json()
+            
+            if 'content' in result and result['content']:
+                return result['content'][0]['text']
+            else:
+                raise Exception(f"Unexpected Claude response format: {result}")
     
     async def _analyze_with_openai(self, article_content: str) -> str:
         """Analyze article using OpenAI API"""
@@ -105,27 +162,30 @@ class AIAnalyzer:
             'temperature': 0.7
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.api_url, headers=headers, json=payload) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"OpenAI API error {response.status}: {error_text}")
-                
-                result = await response.json()
-                
-                if 'choices' in result and result['choices']:
-                    return result['choices'][0]['message']['content']
-                else:
-                    raise Exception(f"Unexpected OpenAI response format: {result}")
+        session = await self._get_session()
+        async with session.post(self.api_url, headers=headers, json=payload) as response:
+            await self._raise_for_status(response, "OpenAI")
+            
+            result = await response.json()
+            
+            if 'choices' in result and result['choices']:
+                return result['choices'][0]['message']['content']
+            else:
+                raise Exception(f"Unexpected OpenAI response format: {result}")
     
     async def batch_analyze(self, articles_content: list) -> list:
-        """Analyze multiple articles in parallel with rate limiting"""
-        semaphore = asyncio.Semaphore(3)  # Limit concurrent requests
+        """Analyze multiple articles in parallel; pacing comes from the shared rate limiter"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)  # Cap in-flight requests
         
         async def analyze_with_limit(content):
             async with semaphore:
-                await asyncio.sleep(0.5)  # Rate limiting
                 return await self.analyze_article(content)
         
         tasks = [analyze_with_limit(content) for content in articles_content]
-        return await asyncio.gather(*tasks, return_exceptions=True)
\ No newline at end of file
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"AI rate limiter usage: {self.rate_limiter.utilization()}")
+        return results
+    
+    def get_utilization(self) -> dict:
+        """Live request/token usage against the provider budget"""
+        return self.rate_limiter.utilization()
\ No newline at end of file
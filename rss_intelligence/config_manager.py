@@ -110,7 +110,11 @@ Article to analyze:
             'provider': os.getenv('AI_PROVIDER', 'claude'),  # 'claude' or 'openai'
             'claude_api_key': os.getenv('ANTHROPIC_API_KEY'),
             'openai_api_key': os.getenv('OPENAI_API_KEY'),
-            'model': os.getenv('AI_MODEL', 'claude-3-5-sonnet-20241022')  # or 'gpt-4o'
+            'model': os.getenv('AI_MODEL', 'claude-3-5-sonnet-20241022'),  # or 'gpt-4o'
+            'max_concurrency': int(os.getenv('AI_MAX_CONCURRENCY', '3')),
+            'max_connections': int(os.getenv('AI_MAX_CONNECTIONS', '10')),
+            'keepalive_timeout': int(os.getenv('AI_KEEPALIVE_TIMEOUT', '60')),
+            'request_timeout': int(os.getenv('AI_REQUEST_TIMEOUT', '120'))
         }
     
     def _load_gdrive_settings(self) -> Dict:
@@ -2,13 +2,18 @@
 Email Sender for RSS Intelligence System
 Handles sending daily reports via email
 """
-import smtplib
+import os
+import sys
+import asyncio
 import logging
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from typing import List, Dict, Any
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.smtp_pool import SMTPPool
+
 logger = logging.getLogger(__name__)
 
 class EmailSender:
@@ -21,6 +26,13 @@ class EmailSender:
         self.from_email = config.email_settings['from_email']
         self.from_password = config.email_settings['from_password']
         self.to_email = config.email_settings['to_email']
+        self.smtp_pool = SMTPPool(self.smtp_server, self.smtp_port, self.from_email, self.from_password, pool_size=1)
+    
+    async def _deliver(self, msg) -> None:
+        """Send through the pooled connection (retrying transient failures); raises on failure"""
+        outcome = await asyncio.to_thread(self.smtp_pool.send, msg)
+        if not outcome['success']:
+            raise RuntimeError(f"{outcome['error']} after {outcome['attempts']} attempts")
     
     async def send_daily_report(self, report: Dict[str, Any], articles: List) -> bool:
         """Send daily intelligence report via email"""
@@ -47,11 +59,7 @@ class EmailSender:
             msg.attach(MIMEText(email_body, 'plain'))
             
             # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.from_email, self.from_password)
-            server.send_message(msg)
-            server.quit()
+            await self._deliver(msg)
             
             logger.info(f"✅ Daily report email sent to {self.to_email}")
             return True
@@ -95,11 +103,7 @@ The system is operating normally and will continue monitoring for new articles.
             msg.attach(MIMEText(body, 'plain'))
             
             # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.from_email, self.from_password)
-            server.send_message(msg)
-            server.quit()
+            await self._deliver(msg)
             
             logger.info(f"✅ Status email sent to {self.to_email}")
             return True
@@ -141,11 +145,7 @@ The system will retry on the next scheduled run.
             msg.attach(MIMEText(body, 'plain'))
             
             # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.from_email, self.from_password)
-            server.send_message(msg)
-            server.quit()
+            await self._deliver(msg)
             
             logger.info(f"✅ Error email sent to {self.to_email}")
             return True
@@ -185,11 +185,7 @@ You should receive your first automated report during the next scheduled run.
             msg.attach(MIMEText(body, 'plain'))
             
             # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.from_email, self.from_password)
-            server.send_message(msg)
-            server.quit()
+            await self._deliver(msg)
             
             logger.info(f"✅ Test email sent successfully to {self.to_email}")
             return True
@@ -59,6 +59,10 @@ class FeedProcessor:
         self.processed_articles_file = Path("processed_articles.json")
         self.processed_articles = self._load_processed_articles()
         
+    async def close(self):
+        """Release the AI analyzer's pooled connections"""
+        await self.ai_analyzer.close()
+    
     def _load_processed_articles(self) -> set:
         """Load list of previously processed article IDs"""
         if self.processed_articles_file.exists():
@@ -189,8 +193,8 @@ class FeedProcessor:
         
         logger.info(f"🧠 Analyzing {len(articles)} articles with AI")
         
-        # Analyze articles in parallel (with rate limiting)
-        semaphore = asyncio.Semaphore(5)  # Limit to 5 concurrent analyses
+        # Analyze articles in parallel; the analyzer's rate limiter paces requests
+        semaphore = asyncio.Semaphore(self.ai_analyzer.max_concurrency)
         tasks = []
         
         for article in articles:
@@ -209,6 +213,7 @@ class FeedProcessor:
                 successful_analyses.append(result)
         
         logger.info(f"✅ Successfully analyzed {len(successful_analyses)} articles")
+        logger.info(f"📊 AI rate limiter usage: {self.ai_analyzer.get_utilization()}")
         return successful_analyses
     
     async def _analyze_single_article(self, article: Article, semaphore) -> Optional[Article]:
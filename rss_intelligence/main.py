@@ -93,6 +93,9 @@ class RSSIntelligenceSystem:
             logger.error(f"❌ Daily analysis failed: {e}")
             await self._send_error_email(str(e))
             raise
+        
+        finally:
+            await self.feed_processor.close()
     
     async def _send_no_articles_email(self):
         """Send email when no articles are found"""
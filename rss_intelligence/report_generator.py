@@ -2,12 +2,17 @@
 Report Generator for RSS Intelligence System
 Generates structured daily reports from analyzed articles
 """
+import os
+import sys
 import logging
 from datetime import datetime
 from typing import List, Dict, Any
 from collections import defaultdict
 import re
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import template_registry
+
 logger = logging.getLogger(__name__)
 
 class ReportGenerator:
@@ -185,62 +190,13 @@ class ReportGenerator:
         if report['total_articles'] == 0:
             return self._generate_empty_email_body()
         
-        email_body = f"""📊 DAILY INTELLIGENCE BRIEFING
-{datetime.now().strftime('%A, %B %d, %Y')}
-
-{report['executive_summary']}
-
-🔥 KEY INSIGHTS:
-"""
-        
-        for i, insight in enumerate(report['key_insights'], 1):
-            email_body += f"{i}. {insight}\n"
-        
-        email_body += f"""
-
-📑 ARTICLES BY SOURCE:
-{'='*50}
-
-"""
-        
-        for source, articles in report['articles_by_source'].items():
-            email_body += f"📰 {source.upper()} ({len(articles)} articles)\n"
-            email_body += "-" * 40 + "\n"
-            
-            for article in articles:
-                email_body += f"📄 {article['title']}\n"
-                email_body += f"   🕒 {article['published']}\n"
-                email_body += f"   🔗 {article['url']}\n"
-                email_body += f"   📊 ANALYSIS: {article['analysis'][:150]}...\n\n"
-            
-            email_body += "\n"
-        
-        email_body += f"""
-📈 SUMMARY STATISTICS:
-• Total Articles Analyzed: {report['total_articles']}
-• Sources Monitored: {report['sources_count']}
-• Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-🤖 Generated by RSS Intelligence System
-"""
-        
-        return email_body
+        return template_registry.render('email/rss_daily_briefing.txt.j2', report=report, now=datetime.now())
     
     def _generate_empty_email_body(self) -> str:
         """Generate email body when no articles found"""
-        return f"""📊 DAILY INTELLIGENCE BRIEFING
-{datetime.now().strftime('%A, %B %d, %Y')}
-
-📧 STATUS: No new articles found today
-
-✅ SYSTEM STATUS: All RSS feeds monitored successfully
-📊 Sources Checked: {len(self.config.rss_feeds)} RSS feeds
-🕒 Last Check: {datetime.now().strftime('%H:%M:%S')}
-
-All monitored sources are up to date. The system will continue monitoring for new content.
-
-🤖 Generated by RSS Intelligence System
-"""
+        return template_registry.render(
+            'email/rss_daily_briefing_empty.txt.j2', feed_count=len(self.config.rss_feeds), now=datetime.now()
+        )
     
     def generate_markdown_report(self, report: Dict[str, Any]) -> str:
         """Generate markdown report for Google Drive storage"""
@@ -4,13 +4,17 @@ Automated Google Drive system for GitHub Actions
 Creates and updates files exactly as specified
 """
 import os
-import sqlite3
+import sys
 from datetime import datetime
 from google_drive_sync import GoogleDriveSync
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.db import get_connection
+from core.transcript_store import TRANSCRIPT_TEXT_SQL
+
 class AutomatedGDriveSystem:
     def __init__(self):
         self.sync = GoogleDriveSync()
@@ -36,7 +40,7 @@ class AutomatedGDriveSystem:
     def create_all_podcast_files(self):
         """Create individual transcript and analysis files for each podcast"""
         
-        conn = sqlite3.connect('podcast_app_v2.db')
+        conn = get_connection('podcast_app_v2.db')
         cursor = conn.cursor()
         
         # Get all podcasts with meaningful names and content
@@ -57,7 +61,7 @@ class AutomatedGDriveSystem:
     def create_individual_podcast_files(self, podcast_id, podcast_name):
         """Create transcript and analysis files for one podcast"""
         
-        conn = sqlite3.connect('podcast_app_v2.db')
+        conn = get_connection('podcast_app_v2.db')
         cursor = conn.cursor()
         
         # Clean filename
@@ -68,12 +72,12 @@ class AutomatedGDriveSystem:
         print(f"📝 Creating files for {podcast_name}...")
         
         # Create transcript file
-        cursor.execute('''
-            SELECT e.title, e.transcript, e.pub_date, e.id
+        cursor.execute(f'''
+            SELECT e.title, {TRANSCRIPT_TEXT_SQL}, e.pub_date, e.id
             FROM episodes e
+            JOIN transcripts t ON t.episode_id = e.id
             WHERE e.podcast_id = ? 
-            AND e.transcript IS NOT NULL 
-            AND e.transcript != ''
+            AND t.char_count > 0
             ORDER BY e.pub_date DESC
         ''', (podcast_id,))
         
@@ -144,15 +148,15 @@ class AutomatedGDriveSystem:
     def create_master_transcript_file(self):
         """Create master file with all transcripts"""
         
-        conn = sqlite3.connect('podcast_app_v2.db')
+        conn = get_connection('podcast_app_v2.db')
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT e.title, e.transcript, e.pub_date, p.name as podcast_name, e.id
+        cursor.execute(f'''
+            SELECT e.title, {TRANSCRIPT_TEXT_SQL}, e.pub_date, p.name as podcast_name, e.id
             FROM episodes e
             JOIN podcasts p ON e.podcast_id = p.id
-            WHERE e.transcript IS NOT NULL 
-            AND e.transcript != ''
+            JOIN transcripts t ON t.episode_id = e.id
+            WHERE t.char_count > 0
             AND p.id IN (3, 6, 7, 8, 14, 15)
             ORDER BY e.pub_date DESC
         ''')
@@ -188,7 +192,7 @@ class AutomatedGDriveSystem:
         if not date_str:
             date_str = datetime.now().strftime('%Y-%m-%d')
         
-        conn = sqlite3.connect('podcast_app_v2.db')
+        conn = get_connection('podcast_app_v2.db')
         cursor = conn.cursor()
         
         # Get today's new analyses
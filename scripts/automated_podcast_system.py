@@ -19,14 +19,27 @@ import os
 import feedparser
 import requests
 import tempfile
+import shutil
 import subprocess
 import json
 import openai
 import anthropic
 from typing import List, Dict, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.audio_downloader import AudioDownloader
+from core.chunked_transcriber import (
+    ChunkedTranscriber, get_transcription_mode, prepare_audio_stage, cleanup_prepared_audio, cleanup_episode_work
+)
+from core.stage_pipeline import Stage, StagePipeline
+from core.rate_limiter import print_utilization
+from core.claude_analyzer import ClaudeAnalyzer
+from core import transcript_store
+from core.schema_indexes import ensure_indexes
+from core.db import get_connection, transaction
+from core.master_transcript_parser import iter_episodes, read_episode
 try:
     from google_drive_sync import GoogleDriveSync
+    from drive_sync_engine import DriveSyncEngine
 except ImportError:
     GoogleDriveSync = None
 
@@ -35,8 +48,17 @@ class AutomatedPodcastSystem:
         # Use actual database path in root directory
         self.db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'podcast_app_v2.db')
         self.sync = GoogleDriveSync() if GoogleDriveSync else None
-        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.anthropic_client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+        # Retries are handled by the shared rate limiter
+        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=0)
+        self.anthropic_client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'), max_retries=0)
+        self.analyzer = ClaudeAnalyzer(self.anthropic_client)
+        
+        # Transcripts live in their own table; move any still stored on episodes rows
+        if os.path.exists(self.db_path):
+            conn = get_connection(self.db_path)
+            transcript_store.migrate_episode_transcripts(conn)
+            ensure_indexes(conn)
+            conn.close()
         
         # Your analysis prompts
         self.infrastructure_prompt = """# Infrastructure Podcast Deep Analysis for Private Equity Investment
@@ -309,7 +331,7 @@ Extract 5-7 most significant quotes focusing on:
         self.db_path = actual_db_path  # Update the path
             
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Get active podcasts with RSS feeds
@@ -342,13 +364,14 @@ Extract 5-7 most significant quotes focusing on:
                 for episode_data in recent_episodes:
                     # Check if episode exists with transcript
                     cursor.execute('''
-                        SELECT id, transcript FROM episodes 
-                        WHERE podcast_id = ? AND title = ? AND publish_date = ?
+                        SELECT e.id, t.char_count FROM episodes e
+                        LEFT JOIN transcripts t ON t.episode_id = e.id
+                        WHERE e.podcast_id = ? AND e.title = ? AND e.publish_date = ?
                     ''', (podcast_id, episode_data.get('title'), episode_data.get('publish_date')))
                     
                     existing = cursor.fetchone()
                     
-                    if not existing or not existing[1] or len(existing[1]) < 1000:
+                    if not existing or not existing[1] or existing[1] < 1000:
                         # Needs work
                         episodes_needing_work.append({
                             'id': existing[0] if existing else None,
@@ -401,189 +424,34 @@ Extract 5-7 most significant quotes focusing on:
         
         print(f"\n🔧 Processing {len(episodes_needing_work)} episodes with transcription & analysis...")
         
-        successful = 0
-        failed = 0
+        self.downloader = AudioDownloader()
+        self.transcriber = ChunkedTranscriber(self.openai_client)
         
-        for episode in episodes_needing_work:
-            episode_id = episode['id']
-            title = episode['title']
-            audio_url = episode['audio_url']
-            podcast_name = episode['podcast_name']
-            podcast_id = episode['podcast_id']
-            
-            print(f"\n🎧 Processing: {title[:60]}...")
-            print(f"   📡 Podcast: {podcast_name}")
-            
-            # If episode doesn't exist in database yet, create it
-            if not episode_id:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO episodes (
-                        podcast_id, title, audio_url, publish_date, 
-                        description, episode_url, guid, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    podcast_id,
-                    title,
-                    audio_url,
-                    episode.get('publish_date'),
-                    "",
-                    "",
-                    audio_url,  # Use audio_url as GUID
-                    datetime.now().isoformat()
-                ))
-                
-                episode_id = cursor.lastrowid
-                episode['id'] = episode_id
-                conn.commit()
-                conn.close()
-                print(f"   ➕ Created episode record: {episode_id}")
-            
-            try:
-                # Step 1: Download audio
-                print("   📥 Downloading audio...")
-                headers = {'User-Agent': 'Podcast Analysis Application v2/2.0.0'}
-                response = requests.get(audio_url, headers=headers, timeout=120, stream=True)
-                response.raise_for_status()
-                
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            temp_file.write(chunk)
-                    original_path = temp_file.name
-                
-                original_size = os.path.getsize(original_path)
-                print(f"   📁 Downloaded: {original_size / (1024*1024):.1f}MB")
-                
-                # Step 2: Compress if needed
-                if original_size > 25 * 1024 * 1024:
-                    print("   🗜️ Compressing audio...")
-                    compressed_path = original_path.replace('.mp3', '_compressed.mp3')
-                    
-                    if self.compress_audio(original_path, compressed_path):
-                        audio_path = compressed_path
-                        compressed_size = os.path.getsize(compressed_path)
-                        print(f"   ✅ Compressed to: {compressed_size / (1024*1024):.1f}MB")
-                    else:
-                        print("   ❌ Compression failed, skipping episode")
-                        os.unlink(original_path)
-                        failed += 1
-                        continue
-                else:
-                    audio_path = original_path
-                
-                # Step 3: Transcribe with timeout handling
-                print("   🎤 Transcribing with Whisper...")
-                try:
-                    with open(audio_path, 'rb') as audio_file:
-                        transcript = self.openai_client.audio.transcriptions.create(
-                            model="whisper-1",
-                            file=audio_file,
-                            response_format="text"
-                        )
-                    
-                    if not transcript or len(transcript) < 100:
-                        print("   ❌ Transcription too short, skipping")
-                        failed += 1
-                        continue
-                        
-                    print(f"   ✅ Transcribed: {len(transcript)} characters")
-                    
-                except Exception as e:
-                    print(f"   ❌ Transcription failed: {e}")
-                    failed += 1
-                    continue
-                
-                # Step 4: Analyze
-                print("   🧠 Analyzing with appropriate prompt...")
-                
-                # Choose prompt based on podcast
-                if 'goldman sachs' in podcast_name.lower() or 'exchanges' in podcast_name.lower():
-                    system_prompt = self.goldman_prompt
-                    prompt_type = "Goldman Sachs"
-                else:
-                    system_prompt = self.infrastructure_prompt
-                    prompt_type = "Infrastructure PE"
-                
-                print(f"   📊 Using {prompt_type} analysis prompt")
-                
-                user_prompt = f"""Podcast: {podcast_name}
-Episode: {title}
-
-FULL TRANSCRIPT:
-{transcript}"""
-                
-                try:
-                    response = self.anthropic_client.messages.create(
-                        model="claude-3-5-sonnet-20241022",
-                        max_tokens=4000,
-                        system=system_prompt,
-                        messages=[
-                            {"role": "user", "content": user_prompt}
-                        ]
-                    )
-                    
-                    analysis = response.content[0].text
-                    
-                    if not analysis or len(analysis) < 100:
-                        print("   ❌ Analysis too short, using fallback")
-                        analysis = f"Analysis for {title} - Episode from {podcast_name}"
-                    
-                    print(f"   ✅ Analysis complete: {len(analysis)} characters")
-                    
-                except Exception as e:
-                    print(f"   ❌ Analysis failed: {e}, using fallback")
-                    analysis = f"Analysis failed for {title} - Episode from {podcast_name}. Error: {str(e)[:100]}"
-                
-                # Extract key quote
-                key_quote = ""
-                lines = analysis.split('\n')
-                for line in lines:
-                    if 'Quote 1:' in line and len(line) > 20:
-                        key_quote = line[:400]
-                        break
-                
-                # Step 5: Save to database
-                print("   💾 Saving to database...")
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # Update transcript
-                cursor.execute("""
-                    UPDATE episodes 
-                    SET transcript = ?, transcribed = 1
-                    WHERE id = ?
-                """, (transcript, episode_id))
-                
-                # Delete old analysis if exists
-                cursor.execute("DELETE FROM analysis_reports WHERE episode_id = ?", (episode_id,))
-                
-                # Save analysis
-                cursor.execute("""
-                    INSERT INTO analysis_reports (episode_id, user_id, analysis_result, key_quote, reading_time_minutes, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (episode_id, 1, analysis, key_quote, max(1, len(analysis.split()) // 200), datetime.now().isoformat()))
-                
-                conn.commit()
-                conn.close()
-                
-                # Clean up
-                os.unlink(original_path)
-                if audio_path != original_path:
-                    os.unlink(audio_path)
-                
-                print(f"   ✅ Episode {episode_id} FULLY PROCESSED")
-                successful += 1
-                
-            except Exception as e:
-                print(f"   ❌ Processing failed: {e}")
-                failed += 1
+        pipeline = StagePipeline([
+            Stage('download', self._download_stage, workers=4),
+            Stage('prepare', prepare_audio_stage, workers=2, use_processes=True),
+            Stage('transcribe', self._transcribe_stage, workers=3),
+            Stage('analyze', self._analyze_stage, workers=3),
+            Stage('save', self._save_stage, workers=1),
+        ], on_drop=cleanup_episode_work)  # Removes the download dir of failed episodes
+        
+        # Group episodes by prompt so the cached system prefix is reused back-to-back
+        ordered = ClaudeAnalyzer.order_by_prompt(
+            episodes_needing_work,
+            lambda episode: self._select_prompt(episode['podcast_name'])[1]
+        )
+        processed, failures = pipeline.run(ordered)
+        self.downloader.close()
+        
+        successful = len(processed)
+        failed = len(episodes_needing_work) - successful
         
         print(f"\n🎉 TRANSCRIPTION & ANALYSIS COMPLETE:")
         print(f"   ✅ Successful: {successful}")
         print(f"   ❌ Failed: {failed}")
+        pipeline.print_stats()
+        print_utilization()
+        self.analyzer.print_usage()
         
         if successful > 0:
             print(f"   📊 Success rate: {(successful/(successful+failed)*100):.1f}%")
@@ -595,6 +463,131 @@ FULL TRANSCRIPT:
         
         return successful > 0
     
+    def _download_stage(self, episode):
+        """Pipeline stage: create the episode record if needed and download its audio"""
+        print(f"\n🎧 Processing: {episode['title'][:60]}...")
+        print(f"   📡 Podcast: {episode['podcast_name']}")
+        
+        # If episode doesn't exist in database yet, create it
+        if not episode['id']:
+            with transaction(self.db_path) as conn:
+                cursor = conn.execute('''
+                    INSERT INTO episodes (
+                        podcast_id, title, audio_url, publish_date, 
+                        description, episode_url, guid, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    episode['podcast_id'],
+                    episode['title'],
+                    episode['audio_url'],
+                    episode.get('publish_date'),
+                    "",
+                    "",
+                    episode['audio_url'],  # Use audio_url as GUID
+                    datetime.now().isoformat()
+                ))
+                episode['id'] = cursor.lastrowid
+            print(f"   ➕ Created episode record: {episode['id']}")
+        
+        work_dir = tempfile.mkdtemp(prefix='episode_')
+        try:
+            audio_path = self.downloader.download(episode['audio_url'], os.path.join(work_dir, 'audio.mp3'))
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        if not audio_path:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            return None
+        
+        print(f"   📁 Downloaded: {os.path.getsize(audio_path) / (1024*1024):.1f}MB")
+        return dict(episode, audio_path=audio_path, work_dir=work_dir, transcription_mode=get_transcription_mode())
+    
+    def _transcribe_stage(self, item):
+        """Pipeline stage: transcribe prepared audio with Whisper"""
+        print(f"   🎤 Transcribing with Whisper: {item['title'][:50]}...")
+        try:
+            transcript = self.transcriber.transcribe_segments(item['prepared_paths'])
+        finally:
+            cleanup_prepared_audio(item['audio_path'], item.get('prepared_paths'))
+            shutil.rmtree(item['work_dir'], ignore_errors=True)
+        
+        if not transcript or len(transcript) < 100:
+            print("   ❌ Transcription too short, skipping")
+            return None
+        
+        print(f"   ✅ Transcribed: {len(transcript)} characters")
+        item['transcript'] = transcript
+        return item
+    
+    def _select_prompt(self, podcast_name):
+        """Return (system prompt, prompt type) for a podcast"""
+        if 'goldman sachs' in podcast_name.lower() or 'exchanges' in podcast_name.lower():
+            return self.goldman_prompt, "Goldman Sachs"
+        return self.infrastructure_prompt, "Infrastructure PE"
+    
+    def _analyze_stage(self, item):
+        """Pipeline stage: analyze with the podcast's prompt"""
+        title = item['title']
+        podcast_name = item['podcast_name']
+        print(f"   🧠 Analyzing with appropriate prompt: {title[:50]}...")
+        
+        # Choose prompt based on podcast
+        system_prompt, prompt_type = self._select_prompt(podcast_name)
+        
+        print(f"   📊 Using {prompt_type} analysis prompt")
+        
+        try:
+            # Long transcripts are summarized in sections before the podcast prompt runs
+            analysis = self.analyzer.analyze_transcript(
+                system_prompt, f"Podcast: {podcast_name}\nEpisode: {title}", item['transcript']
+            )
+            
+            if not analysis or len(analysis) < 100:
+                print("   ❌ Analysis too short, using fallback")
+                analysis = f"Analysis for {title} - Episode from {podcast_name}"
+            
+            print(f"   ✅ Analysis complete: {len(analysis)} characters")
+            
+        except Exception as e:
+            print(f"   ❌ Analysis failed: {e}, using fallback")
+            analysis = f"Analysis failed for {title} - Episode from {podcast_name}. Error: {str(e)[:100]}"
+        
+        # Extract key quote
+        key_quote = ""
+        lines = analysis.split('\n')
+        for line in lines:
+            if 'Quote 1:' in line and len(line) > 20:
+                key_quote = line[:400]
+                break
+        
+        item['analysis'] = analysis
+        item['key_quote'] = key_quote
+        return item
+    
+    def _save_stage(self, item):
+        """Pipeline stage: save transcript and analysis"""
+        episode_id = item['id']
+        analysis = item['analysis']
+        print("   💾 Saving to database...")
+        with transaction(self.db_path) as conn:
+            cursor = conn.cursor()
+            
+            # Update transcript
+            transcript_store.save(conn, episode_id, item['transcript'])
+            cursor.execute("UPDATE episodes SET transcribed = 1 WHERE id = ?", (episode_id,))
+            
+            # Delete old analysis if exists
+            cursor.execute("DELETE FROM analysis_reports WHERE episode_id = ?", (episode_id,))
+            
+            # Save analysis
+            cursor.execute("""
+                INSERT INTO analysis_reports (episode_id, user_id, analysis_result, key_quote, reading_time_minutes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (episode_id, 1, analysis, item['key_quote'], max(1, len(analysis.split()) // 200), datetime.now().isoformat()))
+        
+        print(f"   ✅ Episode {episode_id} FULLY PROCESSED")
+        return item
+    
     def parse_rss_feed(self, rss_url: str) -> Dict[str, Any]:
         """Parse RSS feed and return episode data"""
         try:
@@ -735,30 +728,39 @@ FULL TRANSCRIPT:
         for filename in os.listdir(transcript_dir):
             if filename.endswith('_Transcripts.md'):
                 file_path = os.path.join(transcript_dir, filename)
-                episodes = self.parse_transcript_file(file_path)
+                episodes = self.parse_transcript_file(file_path, include_body=False)
                 all_episodes.extend(episodes)
         
         # Sort all episodes by date (newest first)
         all_episodes.sort(key=lambda x: x['date'], reverse=True)
         
-        # Write master file
+        # Write master file, reading each transcript from its source file only when it is written
         master_file = "podcast_files/master_files/Master_All_Transcripts.md"
-        with open(master_file, 'w', encoding='utf-8') as f:
-            f.write(f"# Master Transcript Database - All Podcasts\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total Episodes: {len(all_episodes)}\n\n")
-            
-            current_date = None
-            for episode in all_episodes:
-                if episode['date'] != current_date:
-                    current_date = episode['date']
-                    f.write(f"\n## {episode['date']}\n\n")
+        sources = {}
+        try:
+            with open(master_file, 'w', encoding='utf-8') as f:
+                f.write(f"# Master Transcript Database - All Podcasts\n")
+                f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"Total Episodes: {len(all_episodes)}\n\n")
                 
-                f.write(f"### {episode['podcast']}: {episode['title']}\n")
-                f.write(f"**Episode ID:** {episode['id']}\n")
-                f.write(f"**Date:** {episode.get('publish_date', 'Unknown')}\n\n")
-                f.write(f"{episode['transcript']}\n\n")
-                f.write("---\n\n")
+                current_date = None
+                for episode in all_episodes:
+                    if episode['date'] != current_date:
+                        current_date = episode['date']
+                        f.write(f"\n## {episode['date']}\n\n")
+                    
+                    if episode['source'] not in sources:
+                        sources[episode['source']] = open(episode['source'], 'rb')
+                    transcript = read_episode(sources[episode['source']], episode)['transcript']
+                    
+                    f.write(f"### {episode['podcast']}: {episode['title']}\n")
+                    f.write(f"**Episode ID:** {episode['id']}\n")
+                    f.write(f"**Date:** {episode.get('publish_date', 'Unknown')}\n\n")
+                    f.write(f"{transcript}\n\n")
+                    f.write("---\n\n")
+        finally:
+            for source in sources.values():
+                source.close()
     
     def create_daily_report(self, date_str):
         """Create daily report with today's new analyses"""
@@ -768,7 +770,7 @@ FULL TRANSCRIPT:
             return None
             
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Get today's new analyses (if any)
@@ -932,62 +934,31 @@ FULL TRANSCRIPT:
                 print("❌ Failed to create folder structure")
                 return
             
-            # Upload all organized files
-            files_uploaded = 0
-            
-            # Upload individual transcript files to appropriate podcast folders
-            transcript_dir = "podcast_files/individual_transcripts"
-            if os.path.exists(transcript_dir):
-                for filename in os.listdir(transcript_dir):
-                    if filename.endswith('.md'):
-                        file_path = os.path.join(transcript_dir, filename)
-                        
-                        # Determine which podcast this file belongs to
-                        podcast_name = self.extract_podcast_name_from_filename(filename)
-                        folder_id = self.sync.get_podcast_folder_id(podcast_name)
-                        
-                        # Use appropriate filename for the folder
-                        new_filename = "Transcripts.md" if not filename.startswith("Master_") else filename
-                        
-                        if self.sync.upload_or_update_file_with_name(file_path, folder_id, new_filename):
-                            files_uploaded += 1
+            # Collect (local file, Drive folder, target name); the engine uploads only what changed
+            items = []
             
-            # Upload individual analysis files to appropriate podcast folders  
-            analysis_dir = "podcast_files/individual_analysis"
-            if os.path.exists(analysis_dir):
-                for filename in os.listdir(analysis_dir):
-                    if filename.endswith('.md'):
-                        file_path = os.path.join(analysis_dir, filename)
-                        
-                        # Determine which podcast this file belongs to
-                        podcast_name = self.extract_podcast_name_from_filename(filename)
-                        folder_id = self.sync.get_podcast_folder_id(podcast_name)
-                        
-                        # Use appropriate filename for the folder
-                        new_filename = "Analysis.md" if not filename.startswith("Master_") else filename
-                        
-                        if self.sync.upload_or_update_file_with_name(file_path, folder_id, new_filename):
-                            files_uploaded += 1
+            # Individual transcript and analysis files go to the podcast's folder
+            for local_dir, target_name in (("podcast_files/individual_transcripts", "Transcripts.md"),
+                                           ("podcast_files/individual_analysis", "Analysis.md")):
+                if os.path.exists(local_dir):
+                    for filename in sorted(os.listdir(local_dir)):
+                        if filename.endswith('.md'):
+                            podcast_name = self.extract_podcast_name_from_filename(filename)
+                            folder_id = self.sync.get_podcast_folder_id(podcast_name)
+                            new_filename = target_name if not filename.startswith("Master_") else filename
+                            items.append((os.path.join(local_dir, filename), folder_id, new_filename))
             
-            # Upload master files to Master_Files folder
-            master_dir = "podcast_files/master_files"
-            if os.path.exists(master_dir):
-                for filename in os.listdir(master_dir):
-                    if filename.endswith('.md'):
-                        file_path = os.path.join(master_dir, filename)
-                        if self.sync.upload_or_update_file(file_path, self.sync.master_files_folder_id):
-                            files_uploaded += 1
+            # Master files and daily reports keep their own names
+            for local_dir, folder_id in (("podcast_files/master_files", self.sync.master_files_folder_id),
+                                         ("podcast_files/daily_reports", self.sync.daily_folder_id)):
+                if os.path.exists(local_dir):
+                    for filename in sorted(os.listdir(local_dir)):
+                        if filename.endswith('.md'):
+                            items.append((os.path.join(local_dir, filename), folder_id, filename))
             
-            # Upload daily reports
-            report_dir = "podcast_files/daily_reports"
-            if os.path.exists(report_dir):
-                for filename in os.listdir(report_dir):
-                    if filename.endswith('.md'):
-                        file_path = os.path.join(report_dir, filename)
-                        if self.sync.upload_or_update_file(file_path, self.sync.daily_folder_id):
-                            files_uploaded += 1
-            
-            print(f"✅ Google Drive sync completed - {files_uploaded} files uploaded/updated")
+            results = DriveSyncEngine(self.sync).sync(items)
+            print(f"✅ Google Drive sync completed - {results['uploaded']} files uploaded/updated, "
+                  f"{results['unchanged']} unchanged, {results['failed']} failed")
             
         except Exception as e:
             print(f"❌ Google Drive sync failed: {e}")
@@ -1070,18 +1041,32 @@ FULL TRANSCRIPT:
         # If no date found or target is newest, insert after header
         return 4  # After title, generated, total, blank line
     
-    def parse_transcript_file(self, file_path):
-        """Parse a transcript file to extract episodes"""
+    def parse_transcript_file(self, file_path, include_body=True):
+        """Parse a transcript file to extract episodes (include_body=False keeps only their byte offsets)"""
         episodes = []
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Extract podcast name from filename
-        filename = os.path.basename(file_path)
-        podcast_clean = filename.replace('_Transcripts.md', '')
+        with open(file_path, 'rb') as f:
+            header = f.readline().decode('utf-8', errors='replace').strip()
+            f.seek(0)
+            
+            # Podcast name from the "# Name - All Transcripts" header, else from the filename
+            podcast_name = header[2:].split(' - ')[0].strip() if header.startswith('# ') else ''
+            if not podcast_name:
+                podcast_name = os.path.basename(file_path).replace('_Transcripts.md', '').replace('_', ' ')
+            
+            for record in iter_episodes(f, include_body=include_body):
+                episodes.append({
+                    'date': (record['date'] or '')[:10],
+                    'podcast': podcast_name,
+                    'title': record['title'],
+                    'id': record['episode_id'] or 'Unknown',
+                    'publish_date': record['metadata'].get('Date', 'Unknown'),
+                    'transcript': record['transcript'],
+                    'source': file_path,
+                    'offset': record['offset'],
+                    'length': record['length']
+                })
         
-        # Simple parsing - this would be more sophisticated in reality
         return episodes
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Regression check for core/master_transcript_parser.py
+Parses every master transcript file and compares the episode count with the
+number of `## date` + `### title` headings found by a plain regex, so separator
+formats the parser does not recognise (and episodes it merges) show up at once.
+Usage:
+    check_master_parser.py [master_dir]
+Exits non-zero when any file disagrees, for use in CI
+"""
+import io
+import os
+import re
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from core.master_transcript_parser import iter_episodes
+
+# `## date` line (or `## DAILY UPDATE - date`), optional rule/blank lines, then the `### title` line
+EPISODE_HEADING = re.compile(r'^## [^\n]*\n(?:(?:[-=]{3,})?\n)*### ', re.MULTILINE)
+
+# One sample per file shape the parser has to split
+SAMPLES = {
+    'MasterFileStore (--- separators)': (
+        "# Demo - Master Transcripts\n\n---\n\n"
+        "## 2025-08-02\n\n### Second\n**Publication Date:** 2025-08-02T00:00:00\n**Episode ID:** 2\n\n"
+        "**Full Transcript:**\nSecond body\n## not a heading inside a transcript\n\n---\n\n"
+        "## 2025-08-01\n\n### First\n**Publication Date:** 2025-08-01T00:00:00\n**Episode ID:** 1\n\n"
+        "**Full Transcript:**\nFirst body\n\n---\n\n"
+    ),
+    '*_Transcripts.md export (===== and 80-dash rules)': (
+        "# Demo - Transcripts\n\n---\n\n\n"
+        "## 2025-08-05\n" + "=" * 50 + "\n\n### Second\n**Episode ID:** 2\n**Transcribed:** 2025-08-05\n\n"
+        "**TRANSCRIPT:**\nSecond body\n\n\n" + "-" * 80 + "\n\n\n"
+        "## 2025-07-29\n" + "=" * 50 + "\n\n### First\n**Episode ID:** 1\n**Transcribed:** 2025-08-04\n\n"
+        "**TRANSCRIPT:**\nFirst body\n\n\n" + "-" * 80 + "\n\n\n"
+    ),
+}
+
+
+def check(name: str, raw: bytes) -> bool:
+    """Parse the raw bytes exactly as production readers do; count headings on the unescaped text"""
+    text = raw.decode('utf-8', errors='replace')
+    if '\\n## ' in text:
+        # Some exports were written with escaped newlines; the parser has to split them itself
+        text = text.replace('\\n', '\n')
+    expected = len(EPISODE_HEADING.findall(text))
+    records = list(iter_episodes(io.BytesIO(raw)))
+    ok = len(records) == expected
+    print(f"{'✅' if ok else '❌'} {name}: {len(records)} parsed, {expected} headings")
+    return ok
+
+
+def main() -> int:
+    master_dir = Path(sys.argv[1] if len(sys.argv) > 1 else 'content/master_transcripts')
+    failures = 0
+    for name, text in SAMPLES.items():
+        failures += not check(name, text.encode('utf-8'))
+        escaped = text.replace('\n', '\\n')
+        failures += not check(f"{name}, escaped newlines", escaped.encode('utf-8'))
+
+    for path in sorted(master_dir.glob('*.md')):
+        failures += not check(path.name, path.read_bytes())
+
+    print(f"\n📊 {failures} file(s) with mismatched episode counts")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
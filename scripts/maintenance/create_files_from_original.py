@@ -2,13 +2,18 @@
 """
 Create organized files from the original database structure
 """
-import sqlite3
+import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from core.db import get_connection
+from core.transcript_store import TRANSCRIPT_TEXT_SQL
+
 def create_organized_files():
     """Create organized files from original database"""
     
-    conn = sqlite3.connect('podcast_app_v2.db')
+    conn = get_connection('podcast_app_v2.db')
     cursor = conn.cursor()
     
     # Get podcasts with transcribed content
@@ -16,7 +21,8 @@ def create_organized_files():
         SELECT p.id, p.name, COUNT(e.id) as transcript_count
         FROM podcasts p
         JOIN episodes e ON p.id = e.podcast_id
-        WHERE e.transcript IS NOT NULL AND e.transcript != ''
+        JOIN transcripts t ON t.episode_id = e.id
+        WHERE t.char_count > 0
         GROUP BY p.id, p.name
         ORDER BY transcript_count DESC
     """)
@@ -31,13 +37,13 @@ def create_organized_files():
         print(f"\n📝 {podcast_name}: {transcript_count} episodes")
         
         # Get episodes for this podcast
-        cursor.execute("""
-            SELECT title, transcript, publish_date, id
-            FROM episodes
-            WHERE podcast_id = ? 
-            AND transcript IS NOT NULL 
-            AND transcript != ''
-            ORDER BY publish_date DESC
+        cursor.execute(f"""
+            SELECT e.title, {TRANSCRIPT_TEXT_SQL}, e.publish_date, e.id
+            FROM episodes e
+            JOIN transcripts t ON t.episode_id = e.id
+            WHERE e.podcast_id = ? 
+            AND t.char_count > 0
+            ORDER BY e.publish_date DESC
         """, (podcast_id,))
         
         episodes = cursor.fetchall()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Query plan audit for the hot episode/analysis access paths
+Runs EXPLAIN QUERY PLAN (SQLite) or EXPLAIN ANALYZE (PostgreSQL) on the queries
+used by app/services and the automation scripts and flags full table scans and
+temp-table sorts. Usage:
+    query_plan_audit.py [podcast_app_v2.db | postgresql://...] [--strict]
+--strict exits non-zero when anything is flagged, for use in CI
+"""
+import os
+import re
+import sys
+import json
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Lookup tables that stay small; scanning them is cheaper than an index probe
+SMALL_TABLES = {'podcasts', 'users', 'user_subscriptions', 'podcast_categories', 'analysis_batches'}
+
+# Pipeline (raw sqlite) schema: episodes.publish_date, transcripts.char_count
+PIPELINE_QUERIES = [
+    {
+        'source': 'core/episode_dedup.py KnownEpisodeIndex.from_sqlite',
+        'sql': "SELECT id, guid, audio_url, title FROM episodes WHERE podcast_id = :podcast_id",
+    },
+    {
+        'source': 'rebuild_master_files.py / utilities/create_complete_master_files.py',
+        'sql': """
+            SELECT e.id, e.title, e.publish_date, t.char_count
+            FROM episodes e JOIN transcripts t ON t.episode_id = e.id
+            WHERE e.podcast_id = :podcast_id AND t.char_count > 0
+            ORDER BY e.publish_date DESC
+        """,
+    },
+    {
+        'source': 'core/master_rebuild.py transcript_fingerprints',
+        'sql': """
+            SELECT e.podcast_id, COUNT(*), MAX(e.created_at), MAX(t.created_at), SUM(t.char_count)
+            FROM episodes e JOIN transcripts t ON t.episode_id = e.id
+            WHERE t.char_count > 0
+            GROUP BY e.podcast_id
+        """,
+        # Change detection for every podcast at once: one pass over transcripts is expected
+        'allow_scan': {'transcripts'},
+    },
+    {
+        'source': 'core/batch_analysis.py BatchAnalysisRunner.get_pending_episodes',
+        'sql': """
+            SELECT e.id, e.title, e.podcast_id, e.publish_date, p.name
+            FROM episodes e
+            JOIN podcasts p ON e.podcast_id = p.id
+            JOIN transcripts t ON t.episode_id = e.id
+            WHERE t.char_count > 0
+            AND NOT EXISTS (SELECT 1 FROM analysis_reports ar WHERE ar.episode_id = e.id AND ar.user_id = :user_id)
+            ORDER BY e.podcast_id, e.id
+        """,
+        # Whole-backlog report: one pass over transcripts is expected
+        'allow_scan': {'transcripts'},
+    },
+    {
+        'source': 'utilities/identify_missing_episodes.py load_known_episodes',
+        'sql': """
+            SELECT e.id, e.title, e.publish_date, COALESCE(t.char_count, 0)
+            FROM episodes e LEFT JOIN transcripts t ON t.episode_id = e.id
+            WHERE e.podcast_id = :podcast_id
+        """,
+    },
+    {
+        'source': 'core/enhanced_parallel_processor.py analyze_episode (already analyzed?)',
+        'sql': "SELECT id FROM analysis_reports WHERE episode_id = :episode_id",
+    },
+    {
+        'source': 'utilities/sync_gdrive_to_database.py reconcile_staged_episodes (match join)',
+        'sql': """
+            SELECT id FROM episodes
+            WHERE podcast_id = :podcast_id AND title = :title AND publish_date = :publish_date
+        """,
+    },
+    {
+        'source': 'core/semantic_index.py index_pending',
+        'sql': """
+            SELECT e.id, e.title, p.name, e.publish_date
+            FROM episodes e JOIN podcasts p ON e.podcast_id = p.id
+            JOIN transcripts t ON t.episode_id = e.id
+            WHERE t.char_count > 0
+        """,
+        'allow_scan': {'transcripts'},
+    },
+]
+
+# App (SQLAlchemy) schema: episodes.published_date / transcript_status
+APP_QUERIES = [
+    {
+        'source': 'app/services/episode_service.py get_episodes_by_podcast',
+        'sql': """
+            SELECT * FROM episodes WHERE podcast_id = :podcast_id
+            ORDER BY published_date DESC LIMIT 20 OFFSET 0
+        """,
+    },
+    {
+        'source': 'app/services/transcript_service.py get_transcription_status',
+        'sql': "SELECT count(*) FROM episodes WHERE transcript_status = :status",
+    },
+    {
+        'source': 'app/services/transcript_service.py check_existing_transcript',
+        'sql': """
+            SELECT e.id FROM episodes e JOIN transcripts t ON e.id = t.episode_id
+            WHERE e.audio_url = :audio_url AND e.transcript_status = 'completed' LIMIT 1
+        """,
+    },
+    {
+        'source': 'app/services/podcast_service.py update_podcast_episodes',
+        'sql': "SELECT id, guid, audio_url, title FROM episodes WHERE podcast_id = :podcast_id",
+    },
+    {
+        'source': 'app/services/analysis_service.py get_user_reports',
+        'sql': """
+            SELECT * FROM analysis_reports WHERE user_id = :user_id
+            ORDER BY created_at DESC LIMIT 20 OFFSET 0
+        """,
+    },
+    {
+        'source': 'app/services/analysis_service.py (report for episode)',
+        'sql': "SELECT id FROM analysis_reports WHERE episode_id = :episode_id AND user_id = :user_id",
+    },
+    {
+        'source': 'app/services/email_service.py create_weekly_digest_content',
+        'sql': """
+            SELECT a.* FROM analysis_reports a
+            JOIN episodes e ON e.id = a.episode_id
+            JOIN podcasts p ON p.id = e.podcast_id
+            WHERE a.user_id = :user_id AND a.created_at >= :since
+            ORDER BY a.created_at DESC
+        """,
+    },
+    {
+        'source': 'app/services/knowledge_base_service.py get_user_entries',
+        'sql': """
+            SELECT * FROM knowledge_base_entries WHERE user_id = :user_id
+            ORDER BY created_at DESC LIMIT 20 OFFSET 0
+        """,
+    },
+    {
+        'source': 'app/services/analysis_service.py (knowledge base entry for report)',
+        'sql': "SELECT * FROM knowledge_base_entries WHERE analysis_report_id = :analysis_report_id",
+    },
+]
+
+SAMPLE_PARAMS = {
+    'podcast_id': 1, 'user_id': 1, 'episode_id': 1, 'analysis_report_id': 1,
+    'guid': 'audit-guid', 'audio_url': 'https://example.com/audit.mp3',
+    'status': 'pending', 'since': '2000-01-01', 'title': 'Audit episode', 'publish_date': '2000-01-01T00:00:00',
+}
+
+ALIAS_PATTERN = re.compile(
+    r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|ORDER\b|GROUP\b|LIMIT\b)(\w+))?',
+    re.IGNORECASE
+)
+
+
+def table_aliases(sql: str) -> Dict[str, str]:
+    aliases = {}
+    for table, alias in ALIAS_PATTERN.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def audit_sqlite(db_path: str, queries: List[Dict]) -> List[Dict]:
+    from core.db import get_connection
+    conn = get_connection(db_path)
+    results = []
+    for query in queries:
+        aliases = table_aliases(query['sql'])
+        allowed = SMALL_TABLES | query.get('allow_scan', set())
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query['sql']}", SAMPLE_PARAMS)]
+        except Exception as e:
+            results.append({'source': query['source'], 'skipped': str(e)})
+            continue
+        flags = []
+        for detail in plan:
+            match = re.match(r'SCAN (?:TABLE )?(\w+)(?: AS \w+)?(.*)', detail)
+            if match and 'INDEX' not in match.group(2):
+                table = aliases.get(match.group(1), match.group(1))
+                if table not in allowed:
+                    flags.append(f"full scan of {table}")
+            elif detail in ('USE TEMP B-TREE FOR ORDER BY', 'USE TEMP B-TREE FOR GROUP BY'):
+                # "RIGHT PART OF ORDER BY" only sorts within index-ordered groups; not flagged
+                flags.append(detail.lower())
+        results.append({'source': query['source'], 'plan': plan, 'flags': flags})
+    conn.close()
+    return results
+
+
+def postgres_plan_nodes(node: Dict):
+    yield node
+    for child in node.get('Plans', []):
+        yield from postgres_plan_nodes(child)
+
+
+def audit_postgres(database_url: str, queries: List[Dict]) -> List[Dict]:
+    from sqlalchemy import create_engine, text
+    engine = create_engine(database_url)
+    results = []
+    with engine.connect() as connection:
+        for query in queries:
+            allowed = SMALL_TABLES | query.get('allow_scan', set())
+            try:
+                # EXPLAIN ANALYZE runs the query; rolled back below, and these are all SELECTs
+                raw = connection.execute(
+                    text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query['sql']}"), SAMPLE_PARAMS
+                ).scalar()
+                connection.rollback()
+            except Exception as e:
+                connection.rollback()
+                results.append({'source': query['source'], 'skipped': str(e).splitlines()[0]})
+                continue
+            report = raw if isinstance(raw, list) else json.loads(raw)
+            flags, plan = [], []
+            for node in postgres_plan_nodes(report[0]['Plan']):
+                relation = node.get('Relation Name')
+                plan.append(f"{node['Node Type']}{' on ' + relation if relation else ''} "
+                            f"(rows={node.get('Actual Rows')}, {node.get('Actual Total Time')} ms)")
+                if node['Node Type'] == 'Seq Scan' and relation not in allowed:
+                    flags.append(f"full scan of {relation}")
+                elif node['Node Type'] == 'Sort' and node.get('Sort Method', '').startswith('external'):
+                    flags.append("sort spilled to disk")
+            plan.append(f"execution time {report[0].get('Execution Time')} ms")
+            results.append({'source': query['source'], 'plan': plan, 'flags': flags})
+    engine.dispose()
+    return results
+
+
+def main():
+    """Audit every catalogued query and print the plans with flagged scans"""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    target = args[0] if args else os.getenv('DATABASE_URL', 'podcast_app_v2.db')
+    strict = '--strict' in sys.argv
+
+    print("Query plan audit")
+    print("=" * 60)
+    print(f"Database: {target}")
+
+    queries = PIPELINE_QUERIES + APP_QUERIES
+    if target.startswith('postgresql'):
+        results = audit_postgres(target, queries)
+    else:
+        results = audit_sqlite(target.replace('sqlite:///', ''), queries)
+
+    flagged = 0
+    for result in results:
+        if 'skipped' in result:
+            print(f"\n⏭️  {result['source']}\n     skipped: {result['skipped']}")
+            continue
+        status = "⚠️ " if result['flags'] else "✅"
+        print(f"\n{status} {result['source']}")
+        for line in result['plan']:
+            print(f"     {line}")
+        for flag in result['flags']:
+            print(f"     ❗ {flag}")
+        flagged += bool(result['flags'])
+
+    checked = sum(1 for result in results if 'skipped' not in result)
+    print(f"\n📊 {checked} queries checked, {flagged} flagged, {len(results) - checked} skipped (schema mismatch)")
+    if strict and flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,41 +2,24 @@
 """
 Restore individual podcast files from the existing master files
 """
-import re
+import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from core.master_transcript_parser import iter_episodes, read_episode, split_heading
+
 def parse_master_transcripts():
     """Parse the master transcript file and create individual podcast files"""
     
     print("🔄 Restoring individual files from master transcripts...")
     
-    with open('Master_All_Transcripts.md', 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Split by date sections
-    date_sections = re.split(r'\n## (\d{4}-\d{2}-\d{2})', content)
-    
-    # Dictionary to store content by podcast
+    # Dictionary of episode locations by podcast; transcripts stay on disk until written
     podcast_content = {}
     
-    # Process each date section (skip the first element which is the header)
-    for i in range(1, len(date_sections), 2):
-        if i + 1 >= len(date_sections):
-            break
-            
-        date = date_sections[i]
-        section_content = date_sections[i + 1]
-        
-        # Find all episodes in this date section
-        episodes = re.split(r'\n### ([^:]+): ([^\n]+)', section_content)
-        
-        for j in range(1, len(episodes), 3):
-            if j + 2 >= len(episodes):
-                break
-                
-            podcast_name = episodes[j].strip()
-            episode_title = episodes[j + 1].strip()
-            episode_content = episodes[j + 2] if j + 2 < len(episodes) else ""
+    with open('Master_All_Transcripts.md', 'rb') as master:
+        for record in iter_episodes(master, include_body=False):
+            podcast_name, episode_title = split_heading(record['title'])
             
             # Clean podcast name for filename
             clean_name = podcast_name.replace(':', '').replace('/', '').replace(' ', '_').replace(',', '').replace("'", "")
@@ -48,51 +31,46 @@ def parse_master_transcripts():
                     'episodes': []
                 }
             
-            # Extract episode ID and other metadata
-            episode_id_match = re.search(r'\*\*Episode ID:\*\* (\d+)', episode_content)
-            episode_id = episode_id_match.group(1) if episode_id_match else "Unknown"
-            
-            # Extract the actual transcript
-            transcript_match = re.search(r'\*\*.*?\*\*\n\n(.*?)(?=\n---|\n###|\Z)', episode_content, re.DOTALL)
-            transcript = transcript_match.group(1).strip() if transcript_match else ""
-            
-            podcast_content[clean_name]['episodes'].append({
-                'date': date,
-                'title': episode_title,
-                'id': episode_id,
-                'transcript': transcript
-            })
-    
-    # Create individual transcript files
-    print(f"📝 Creating individual transcript files for {len(podcast_content)} podcasts...")
-    
-    for clean_name, data in podcast_content.items():
-        if not data['episodes']:
-            continue
-            
-        filename = f"{clean_name}_Transcripts.md"
+            podcast_content[clean_name]['episodes'].append(dict(
+                record,
+                date=(record['date'] or '')[:10],
+                title=episode_title,
+                id=record['episode_id'] or "Unknown"
+            ))
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# {data['name']} - All Transcripts\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total Episodes: {len(data['episodes'])}\n\n")
-            
-            # Sort episodes by date (newest first)
-            episodes_sorted = sorted(data['episodes'], key=lambda x: x['date'], reverse=True)
+        # Create individual transcript files
+        print(f"📝 Creating individual transcript files for {len(podcast_content)} podcasts...")
+        
+        for clean_name, data in podcast_content.items():
+            if not data['episodes']:
+                continue
+                
+            filename = f"{clean_name}_Transcripts.md"
             
-            current_date = None
-            for episode in episodes_sorted:
-                if episode['date'] != current_date:
-                    current_date = episode['date']
-                    f.write(f"\n## {episode['date']}\n\n")
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(f"# {data['name']} - All Transcripts\n")
+                f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"Total Episodes: {len(data['episodes'])}\n\n")
                 
-                f.write(f"### {episode['title']}\n")
-                f.write(f"**Episode ID:** {episode['id']}\n")
-                f.write(f"**Date:** {episode['date']}\n\n")
-                f.write(f"{episode['transcript']}\n\n")
-                f.write("---\n\n")
-        
-        print(f"   ✅ {filename} ({len(data['episodes'])} episodes)")
+                # Sort episodes by date (newest first)
+                episodes_sorted = sorted(data['episodes'], key=lambda x: x['date'], reverse=True)
+                
+                current_date = None
+                for episode in episodes_sorted:
+                    if episode['date'] != current_date:
+                        current_date = episode['date']
+                        f.write(f"\n## {episode['date']}\n\n")
+                    
+                    # Seek back for this episode's transcript only
+                    transcript = read_episode(master, episode)['transcript']
+                    
+                    f.write(f"### {episode['title']}\n")
+                    f.write(f"**Episode ID:** {episode['id']}\n")
+                    f.write(f"**Date:** {episode['date']}\n\n")
+                    f.write(f"{transcript}\n\n")
+                    f.write("---\n\n")
+            
+            print(f"   ✅ {filename} ({len(data['episodes'])} episodes)")
     
     return podcast_content
 
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark pooled SMTP delivery against a local aiosmtpd stand-in
+Compares the old pattern (connect, send one message, quit - serially) with
+core.smtp_pool.SMTPPool.send_many. The stand-in adds a configurable per-message
+latency to mimic a real relay. Usage:
+    smtp_benchmark.py [messages=200] [pool_size=3] [latency_ms=50]
+Needs `pip install aiosmtpd`
+"""
+import os
+import sys
+import time
+import asyncio
+import smtplib
+from email.mime.text import MIMEText
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+try:
+    from aiosmtpd.controller import Controller
+    AIOSMTPD_AVAILABLE = True
+except ImportError:
+    AIOSMTPD_AVAILABLE = False
+
+from core.smtp_pool import SMTPPool
+
+HOST = '127.0.0.1'
+PORT = 8025
+
+
+class SlowHandler:
+    """Accepts every message after a fixed delay and counts deliveries"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        self.received += 1
+        return '250 Message accepted for delivery'
+
+
+def build_messages(count: int):
+    messages = []
+    for i in range(count):
+        msg = MIMEText(f"Benchmark message {i}\n" + "lorem ipsum " * 200)
+        msg['From'] = 'bench@localhost'
+        msg['To'] = f'user{i}@localhost'
+        msg['Subject'] = f'Benchmark {i}'
+        messages.append(msg)
+    return messages
+
+
+def send_one_connection_per_message(messages):
+    for msg in messages:
+        server = smtplib.SMTP(HOST, PORT)
+        server.send_message(msg)
+        server.quit()
+
+
+def main():
+    """Run both delivery strategies and print throughput"""
+    if not AIOSMTPD_AVAILABLE:
+        print("❌ aiosmtpd is not installed (pip install aiosmtpd)")
+        sys.exit(1)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    pool_size = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    latency = (int(sys.argv[3]) if len(sys.argv) > 3 else 50) / 1000
+
+    handler = SlowHandler(latency)
+    controller = Controller(handler, hostname=HOST, port=PORT)
+    controller.start()
+    print(f"📮 Local SMTP stand-in on {HOST}:{PORT} ({latency * 1000:.0f} ms per message)")
+
+    try:
+        messages = build_messages(count)
+
+        start = time.time()
+        send_one_connection_per_message(messages)
+        serial_seconds = time.time() - start
+        print(f"🐢 Connect-per-message: {count} in {serial_seconds:.2f}s ({count / serial_seconds:.1f} msg/s)")
+
+        # Rate cap set high so the benchmark measures the transport, not the limiter
+        with SMTPPool(HOST, PORT, use_tls=False, pool_size=pool_size, max_per_minute=count * 60) as pool:
+            start = time.time()
+            outcomes = pool.send_many(messages)
+            pooled_seconds = time.time() - start
+        failed = sum(1 for outcome in outcomes if not outcome['success'])
+        print(f"🚀 Pooled ({pool_size} connections): {count} in {pooled_seconds:.2f}s "
+              f"({count / pooled_seconds:.1f} msg/s), {failed} failed")
+        print(f"📊 Speedup: {serial_seconds / pooled_seconds:.1f}x, server received {handler.received}")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,15 @@
 Upload the real database to GitHub so the workflow can use it
 """
 import os
+import sys
 import sqlite3
 import shutil
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from core.db import get_connection
+from core.transcript_store import TRANSCRIPT_TEXT_SQL
+
 def prepare_database_for_github():
     """Prepare and upload the real database"""
     
@@ -31,8 +36,8 @@ def prepare_database_for_github():
             
             # Count episodes with transcripts
             cursor.execute("""
-                SELECT COUNT(*) FROM episodes 
-                WHERE transcript IS NOT NULL AND transcript != ''
+                SELECT COUNT(*) FROM transcripts 
+                WHERE char_count > 0
             """)
             
             count = cursor.fetchone()[0]
@@ -63,16 +68,17 @@ def prepare_database_for_github():
 def create_organized_files_from_real_data():
     """Create organized files using the real database"""
     
-    conn = sqlite3.connect('podcast_app_v2.db')
+    conn = get_connection('podcast_app_v2.db')
     cursor = conn.cursor()
     
     # Get actual podcast data
     cursor.execute("""
         SELECT DISTINCT p.id, p.name, 
-               COUNT(CASE WHEN e.transcript IS NOT NULL AND e.transcript != '' THEN 1 END) as transcripts,
+               COUNT(CASE WHEN t.char_count > 0 THEN 1 END) as transcripts,
                COUNT(ar.id) as analyses
         FROM podcasts p
         LEFT JOIN episodes e ON p.id = e.podcast_id
+        LEFT JOIN transcripts t ON t.episode_id = e.id
         LEFT JOIN analysis_reports ar ON e.id = ar.episode_id
         GROUP BY p.id, p.name
         HAVING transcripts > 0 OR analyses > 0
@@ -96,7 +102,7 @@ def create_organized_files_from_real_data():
 def create_podcast_files(podcast_id, podcast_name):
     """Create transcript and analysis files for one podcast"""
     
-    conn = sqlite3.connect('podcast_app_v2.db')
+    conn = get_connection('podcast_app_v2.db')
     cursor = conn.cursor()
     
     clean_name = podcast_name.replace(':', '').replace('/', '').replace(' ', '_').replace(',', '')
@@ -104,12 +110,12 @@ def create_podcast_files(podcast_id, podcast_name):
     analysis_file = f"{clean_name}_Analysis.md"
     
     # Create transcript file
-    cursor.execute('''
-        SELECT e.title, e.transcript, e.pub_date, e.id
+    cursor.execute(f'''
+        SELECT e.title, {TRANSCRIPT_TEXT_SQL}, e.pub_date, e.id
         FROM episodes e
+        JOIN transcripts t ON t.episode_id = e.id
         WHERE e.podcast_id = ? 
-        AND e.transcript IS NOT NULL 
-        AND e.transcript != ''
+        AND t.char_count > 0
         ORDER BY e.pub_date DESC
     ''', (podcast_id,))
     
@@ -180,15 +186,15 @@ def create_podcast_files(podcast_id, podcast_name):
 def create_master_file():
     """Create master transcript file"""
     
-    conn = sqlite3.connect('podcast_app_v2.db')
+    conn = get_connection('podcast_app_v2.db')
     cursor = conn.cursor()
     
-    cursor.execute('''
-        SELECT e.title, e.transcript, e.pub_date, p.name as podcast_name, e.id
+    cursor.execute(f'''
+        SELECT e.title, {TRANSCRIPT_TEXT_SQL}, e.pub_date, p.name as podcast_name, e.id
         FROM episodes e
         JOIN podcasts p ON e.podcast_id = p.id
-        WHERE e.transcript IS NOT NULL 
-        AND e.transcript != ''
+        JOIN transcripts t ON t.episode_id = e.id
+        WHERE t.char_count > 0
         ORDER BY e.pub_date DESC
     ''')
     
@@ -1,128 +1,102 @@
 #!/usr/bin/env python3
 """
 Create complete master files with ALL transcripts and analyses
+Both files are streamed from the database in parallel; a file whose source rows
+are unchanged since the last run is reused instead of regenerated. Usage:
+    create_complete_master_files.py [--force]
 """
-import sqlite3
 from datetime import datetime
 import os
+import sys
 
-def create_complete_master_files():
-    """Create comprehensive master files with all historical data"""
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import master_rebuild
+from core.db import get_connection
+from core.transcript_store import TRANSCRIPT_TEXT_SQL
+
+DB_PATH = 'podcast_app_v2.db'
+STATE_FILE = '.rebuild_state.json'
+
+def create_complete_master_files(force=False):
+    """Create comprehensive master files with all historical data; unchanged files are reused"""
     
-    conn = sqlite3.connect('podcast_app_v2.db')
-    cursor = conn.cursor()
+    conn = get_connection(DB_PATH)
     
     print("📊 Gathering all historical data...")
     
-    # Get ALL transcribed episodes
-    cursor.execute("""
-        SELECT e.id, e.title, e.transcript, e.pub_date, p.name as podcast_name, e.created_at
+    # Aggregates only; the rows themselves are streamed by the writer processes
+    transcript_fingerprint = list(conn.execute("""
+        SELECT COUNT(*), MAX(e.created_at), MAX(t.created_at), SUM(t.char_count)
         FROM episodes e
-        JOIN podcasts p ON e.podcast_id = p.id
-        WHERE e.transcript IS NOT NULL 
-        AND LENGTH(e.transcript) > 100
-        ORDER BY e.pub_date DESC, p.name
-    """)
+        JOIN transcripts t ON t.episode_id = e.id
+        WHERE t.char_count > 100
+    """).fetchone())
+    print(f"   Found {transcript_fingerprint[0]} transcribed episodes")
     
-    transcript_episodes = cursor.fetchall()
-    print(f"   Found {len(transcript_episodes)} transcribed episodes")
-    
-    # Get ALL analyses
-    cursor.execute("""
-        SELECT e.id, e.title, ar.analysis_result, e.pub_date, p.name as podcast_name, 
-               ar.created_at as analysis_date, ar.key_quote
+    analysis_fingerprint = list(conn.execute("""
+        SELECT COUNT(*), MAX(ar.created_at), MAX(ar.id)
         FROM analysis_reports ar
-        JOIN episodes e ON ar.episode_id = e.id
-        JOIN podcasts p ON e.podcast_id = p.id
         WHERE ar.user_id = 2
-        ORDER BY e.pub_date DESC, p.name
-    """)
-    
-    analysis_episodes = cursor.fetchall()
-    print(f"   Found {len(analysis_episodes)} analyzed episodes")
+    """).fetchone())
+    print(f"   Found {analysis_fingerprint[0]} analyzed episodes")
     
     conn.close()
     
     # Create timestamp for files
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    # Create COMPLETE master transcript file
-    transcript_file = f"COMPLETE_MASTER_TRANSCRIPTS_{timestamp}.md"
-    print(f"📄 Creating complete transcript file: {transcript_file}")
-    
-    with open(transcript_file, 'w', encoding='utf-8') as f:
-        f.write(f"""# Complete Master Podcast Transcripts
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Total Episodes: {len(transcript_episodes)}
-
-This file contains ALL transcribed podcast episodes from:
-- The Infrastructure Investor
-- Crossroads: The Infrastructure Podcast  
-- Deal Talks
-- Exchanges at Goldman Sachs
-- Global Evolution
-- The Data Center Frontier Show
-
----
-
-""")
-        
-        current_date = None
-        for episode in transcript_episodes:
-            episode_id, title, transcript, pub_date, podcast_name, created_at = episode
-            
-            # Group by publication date
-            if pub_date != current_date:
-                current_date = pub_date
-                f.write(f"\n## {pub_date}\n\n")
-            
-            f.write(f"### {podcast_name}: {title}\n")
-            f.write(f"**Publication Date:** {pub_date}\n")
-            f.write(f"**Episode ID:** {episode_id}\n")
-            f.write(f"**Transcribed:** {created_at}\n\n")
-            f.write(f"**Full Transcript:**\n{transcript}\n\n")
-            f.write("---\n\n")
-    
-    # Create COMPLETE master analysis file
-    analysis_file = f"COMPLETE_MASTER_ANALYSIS_{timestamp}.md"
-    print(f"📄 Creating complete analysis file: {analysis_file}")
-    
-    with open(analysis_file, 'w', encoding='utf-8') as f:
-        f.write(f"""# Complete Master Podcast Analysis
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Total Analyses: {len(analysis_episodes)}
-
-This file contains ALL podcast analyses for infrastructure and finance investment insights from:
-- The Infrastructure Investor
-- Crossroads: The Infrastructure Podcast  
-- Deal Talks  
-- Exchanges at Goldman Sachs
-- Global Evolution
-- The Data Center Frontier Show
-
----
-
-""")
-        
-        current_date = None
-        for episode in analysis_episodes:
-            episode_id, title, analysis, pub_date, podcast_name, analysis_date, key_quote = episode
-            
-            # Group by publication date
-            if pub_date != current_date:
-                current_date = pub_date
-                f.write(f"\n## {pub_date}\n\n")
-            
-            f.write(f"### {podcast_name}: {title}\n")
-            f.write(f"**Publication Date:** {pub_date}\n")
-            f.write(f"**Episode ID:** {episode_id}\n")
-            f.write(f"**Analysis Date:** {analysis_date}\n")
-            
-            if key_quote:
-                f.write(f"**Key Quote:** {key_quote}\n")
-            
-            f.write(f"\n**Full Analysis:**\n{analysis}\n\n")
-            f.write("---\n\n")
+    generated = datetime.now()
+    timestamp = generated.strftime('%Y%m%d_%H%M%S')
+    
+    jobs = [
+        {
+            'key': 'complete_transcripts',
+            'fingerprint': transcript_fingerprint,
+            'path': f"COMPLETE_MASTER_TRANSCRIPTS_{timestamp}.md",
+            'template': 'master/complete_transcripts.md.j2',
+            'sql': f"""
+                SELECT e.id, e.title, {TRANSCRIPT_TEXT_SQL} AS transcript,
+                       e.publish_date, p.name AS podcast_name, e.created_at
+                FROM episodes e
+                JOIN podcasts p ON e.podcast_id = p.id
+                JOIN transcripts t ON t.episode_id = e.id
+                WHERE t.char_count > 100
+                ORDER BY e.publish_date DESC, p.name
+            """,
+            'context': {'generated': generated.strftime('%Y-%m-%d %H:%M:%S'), 'total': transcript_fingerprint[0]},
+        },
+        {
+            'key': 'complete_analysis',
+            'fingerprint': analysis_fingerprint,
+            'path': f"COMPLETE_MASTER_ANALYSIS_{timestamp}.md",
+            'template': 'master/complete_analysis.md.j2',
+            'sql': """
+                SELECT e.id, e.title, ar.analysis_result, e.publish_date, p.name AS podcast_name,
+                       ar.created_at AS analysis_date, ar.key_quote
+                FROM analysis_reports ar
+                JOIN episodes e ON ar.episode_id = e.id
+                JOIN podcasts p ON e.podcast_id = p.id
+                WHERE ar.user_id = 2
+                ORDER BY e.publish_date DESC, p.name
+            """,
+            'context': {'generated': generated.strftime('%Y-%m-%d %H:%M:%S'), 'total': analysis_fingerprint[0]},
+        },
+    ]
+    
+    print("📄 Writing complete transcript and analysis files in parallel...")
+    results = master_rebuild.rebuild(DB_PATH, jobs, STATE_FILE, force=force)
+    
+    for key, error in results['failed'].items():
+        print(f"❌ Failed to create {key}: {error}")
+    if results['failed']:
+        raise RuntimeError(f"Could not create {', '.join(results['failed'])}")
+    
+    paths = {}
+    for job in jobs:
+        if job['key'] in results['skipped']:
+            paths[job['key']] = results['skipped'][job['key']]
+            print(f"⏭️  Unchanged since last build, reusing {paths[job['key']]}")
+        else:
+            paths[job['key']] = results['rebuilt'][job['key']]['path']
+    transcript_file, analysis_file = paths['complete_transcripts'], paths['complete_analysis']
     
     print(f"✅ Complete master files created:")
     print(f"   📄 Transcripts: {transcript_file} ({os.path.getsize(transcript_file) / (1024*1024):.1f} MB)")
@@ -174,7 +148,7 @@ def sync_complete_files_to_drive(transcript_file, analysis_file):
 if __name__ == "__main__":
     print("🚀 Creating complete master files with ALL historical data...")
     
-    transcript_file, analysis_file = create_complete_master_files()
+    transcript_file, analysis_file = create_complete_master_files(force='--force' in sys.argv)
     
     # Sync to Google Drive
     sync_complete_files_to_drive(transcript_file, analysis_file)
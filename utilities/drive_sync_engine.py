@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Delta-aware Google Drive sync
+Keeps a local manifest (target -> md5, size, mtime, Drive file ID, modifiedTime)
+so unchanged files cost neither a hash nor an API call. Files with no manifest
+entry are matched against one batched listing per folder, using Drive's
+md5Checksum, so even a fresh checkout only uploads real changes. Uploads run
+concurrently, each worker thread on its own Drive client
+"""
+import os
+import json
+import hashlib
+import threading
+import concurrent.futures
+from typing import Dict, List, Optional, Tuple
+
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+
+DEFAULT_MANIFEST = os.getenv('DRIVE_SYNC_MANIFEST', 'podcast_files/.drive_sync_manifest.json')
+DEFAULT_UPLOAD_WORKERS = int(os.getenv('DRIVE_UPLOAD_WORKERS', '4'))
+# Smaller files go up in a single request; resumable sessions cost an extra round trip
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+# Drive accepts at most 100 calls per batch request
+BATCH_SIZE = 100
+API_RETRIES = 3
+
+# (local path, Drive folder ID, target filename)
+SyncItem = Tuple[str, str, str]
+
+
+def file_md5(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DriveSyncEngine:
+    def __init__(self, drive, manifest_path: str = DEFAULT_MANIFEST, max_workers: int = DEFAULT_UPLOAD_WORKERS):
+        """drive: an authenticated GoogleDriveSync"""
+        self.drive = drive
+        self.manifest_path = manifest_path
+        self.max_workers = max(1, max_workers)
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('files', {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable sync manifest {self.manifest_path}: {e}")
+            return {}
+
+    def save_manifest(self):
+        """Write via a temp file so an interrupted run never leaves a truncated manifest"""
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'files': self.manifest}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _key(folder_id: str, name: str) -> str:
+        return f"{folder_id}/{name}"
+
+    def _service(self):
+        """googleapiclient clients are not thread-safe; one per worker thread"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.drive.creds, cache_discovery=False)
+            self._local.service = service
+        return service
+
+    def _remember(self, key: str, local_path: str, stat: os.stat_result, md5: str, remote: Dict):
+        with self._lock:
+            self.manifest[key] = {
+                'local_path': local_path,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'md5': md5,
+                'file_id': remote['id'],
+                'modified_time': remote.get('modifiedTime'),
+            }
+
+    def list_folders(self, folder_ids: List[str]) -> Dict[str, Dict[str, Dict]]:
+        """Children of each folder by name, fetched in batched list requests"""
+        listings = {folder_id: {} for folder_id in folder_ids}
+        page_tokens = {}
+
+        def collect(request_id, response, exception):
+            if exception is not None:
+                print(f"⚠️ Could not list folder {request_id}: {exception}")
+                return
+            for item in response.get('files', []):
+                listings[request_id].setdefault(item['name'], item)
+            if response.get('nextPageToken'):
+                page_tokens[request_id] = response['nextPageToken']
+
+        pending = {folder_id: None for folder_id in folder_ids}
+        while pending:
+            folders = list(pending.items())
+            for start in range(0, len(folders), BATCH_SIZE):
+                batch = self.drive.service.new_batch_http_request(callback=collect)
+                for folder_id, token in folders[start:start + BATCH_SIZE]:
+                    params = {
+                        'q': f"'{folder_id}' in parents and trashed=false",
+                        'fields': 'nextPageToken, files(id, name, md5Checksum, modifiedTime)',
+                        'pageSize': 1000,
+                    }
+                    if token:
+                        params['pageToken'] = token
+                    batch.add(self.drive.service.files().list(**params), request_id=folder_id)
+                batch.execute()
+            pending, page_tokens = dict(page_tokens), {}
+        return listings
+
+    def _upload(self, local_path: str, folder_id: str, name: str, file_id: Optional[str]) -> Dict:
+        service = self._service()
+        size = os.path.getsize(local_path)
+        fields = 'id, name, md5Checksum, modifiedTime'
+        if file_id:
+            try:
+                media = MediaFileUpload(local_path, mimetype='text/markdown', resumable=size > RESUMABLE_THRESHOLD)
+                return service.files().update(
+                    fileId=file_id, body={'name': name}, media_body=media, fields=fields
+                ).execute(num_retries=API_RETRIES)
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                # Deleted on the Drive side since the manifest was written; recreate it
+        media = MediaFileUpload(local_path, mimetype='text/markdown', resumable=size > RESUMABLE_THRESHOLD)
+        return service.files().create(
+            body={'name': name, 'parents': [folder_id]}, media_body=media, fields=fields
+        ).execute(num_retries=API_RETRIES)
+
+    def sync(self, items: List[SyncItem]) -> Dict[str, int]:
+        """Upload the items whose content differs from Drive; returns counts"""
+        # Several local files can map to one target (e.g. Transcripts.md); the last one wins, as before
+        targets = {}
+        for local_path, folder_id, name in items:
+            if folder_id and os.path.exists(local_path):
+                targets[self._key(folder_id, name)] = (local_path, folder_id, name)
+
+        results = {'checked': len(targets), 'unchanged': 0, 'uploaded': 0, 'failed': 0}
+        changed = []
+        for key, (local_path, folder_id, name) in targets.items():
+            stat = os.stat(local_path)
+            entry = self.manifest.get(key)
+            if entry and entry.get('file_id') and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                results['unchanged'] += 1
+                continue
+            md5 = file_md5(local_path)
+            if entry and entry.get('file_id') and entry['md5'] == md5:
+                # Touched but identical; refresh the stat so the next run skips the hash too
+                self._remember(key, local_path, stat, md5, {'id': entry['file_id'], 'modifiedTime': entry.get('modified_time')})
+                results['unchanged'] += 1
+                continue
+            changed.append((key, local_path, folder_id, name, stat, md5, entry.get('file_id') if entry else None))
+
+        # Targets the manifest has never seen: one listing per folder instead of a query per file
+        unknown_folders = sorted({folder_id for _, _, folder_id, _, _, _, file_id in changed if not file_id})
+        listings = self.list_folders(unknown_folders) if unknown_folders else {}
+
+        uploads = []
+        for key, local_path, folder_id, name, stat, md5, file_id in changed:
+            if not file_id:
+                remote = listings.get(folder_id, {}).get(name)
+                if remote and remote.get('md5Checksum') == md5:
+                    self._remember(key, local_path, stat, md5, remote)
+                    results['unchanged'] += 1
+                    continue
+                file_id = remote['id'] if remote else None
+            uploads.append((key, local_path, folder_id, name, stat, md5, file_id))
+
+        def upload(job):
+            key, local_path, folder_id, name, stat, md5, file_id = job
+            remote = self._upload(local_path, folder_id, name, file_id)
+            self._remember(key, local_path, stat, remote.get('md5Checksum') or md5, remote)
+            return name, bool(file_id)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(upload, job): job for job in uploads}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    name, updated = future.result()
+                    print(f"{'🔄 Updated' if updated else '📤 Uploaded'}: {name}")
+                    results['uploaded'] += 1
+                except Exception as e:
+                    print(f"❌ Error uploading {futures[future][1]}: {e}")
+                    results['failed'] += 1
+
+        self.save_manifest()
+        return results
@@ -6,8 +6,11 @@ Automatically syncs master transcripts and analysis files to Google Drive
 import os
 import json
 import glob
+import time
+import threading
 from datetime import datetime
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
@@ -19,12 +22,80 @@ load_dotenv()
 
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 
+ID_CACHE_FILE = os.getenv('DRIVE_ID_CACHE', '.drive_id_cache.json')
+ID_CACHE_TTL = int(os.getenv('DRIVE_ID_CACHE_TTL', str(24 * 3600)))
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+
+def is_not_found(error):
+    return isinstance(error, HttpError) and error.resp.status == 404
+
+
+class DriveIdCache:
+    """Persistent (parent, name) -> Drive ID map with a TTL; stale IDs are dropped when Drive answers 404"""
+    
+    def __init__(self, path=ID_CACHE_FILE, ttl=ID_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+    
+    @staticmethod
+    def _key(kind, parent_id, name):
+        return f"{kind}:{parent_id or 'root'}/{name}"
+    
+    def get(self, kind, parent_id, name):
+        entry = self.entries.get(self._key(kind, parent_id, name))
+        if entry and time.time() - entry['cached_at'] < self.ttl:
+            return entry['id']
+        return None
+    
+    def put(self, kind, parent_id, name, item_id):
+        with self._lock:
+            self.entries[self._key(kind, parent_id, name)] = {'id': item_id, 'cached_at': time.time()}
+            self._dirty = True
+    
+    def invalidate(self, item_id):
+        """Forget an ID and anything cached beneath it"""
+        with self._lock:
+            stale = [key for key, entry in self.entries.items()
+                     if entry['id'] == item_id or key.split(':', 1)[1].startswith(f"{item_id}/")]
+            for key in stale:
+                del self.entries[key]
+            self._dirty = self._dirty or bool(stale)
+    
+    def clear(self):
+        with self._lock:
+            self.entries = {}
+            self._dirty = True
+    
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
 class GoogleDriveSync:
     def __init__(self, credentials_file='credentials.json', token_file='token.json'):
         self.credentials_file = credentials_file
         self.token_file = token_file
         self.service = None
+        self.creds = None
         self.podcast_folder_id = None
+        self.id_cache = DriveIdCache()
+        self._listings = {}  # folder ID -> {name: item}, listed at most once per run
         
     def authenticate(self):
         """Authenticate with Google Drive API"""
@@ -60,6 +131,7 @@ class GoogleDriveSync:
                 return False
                 
         try:
+            self.creds = creds
             self.service = build('drive', 'v3', credentials=creds)
             print("✅ Google Drive service initialized successfully")
             return True
@@ -72,6 +144,22 @@ class GoogleDriveSync:
         if not self.service:
             return False
         
+        try:
+            created = self._build_folder_structure()
+        except HttpError as e:
+            if not is_not_found(e):
+                raise
+            created = False
+        if not created and self.id_cache.entries:
+            # A cached folder was deleted or moved; resolve everything from Drive again
+            print("🔄 Cached Drive folder IDs are stale - retrying with fresh lookups")
+            self.id_cache.clear()
+            self._listings = {}
+            created = self._build_folder_structure()
+        self.id_cache.save()
+        return created
+    
+    def _build_folder_structure(self):
         # Create main folder
         main_folder = self.create_folder("Podcast Intelligence System")
         if not main_folder:
@@ -91,14 +179,19 @@ class GoogleDriveSync:
         self.archive_folder_id = archive_folder['id']
         self.system_folder_id = system_folder['id']
         
-        # Create subfolders under Active Content
-        self.individual_podcasts_folder_id = self.create_folder("Individual_Podcasts", self.active_folder_id)['id']
-        self.master_files_folder_id = self.create_folder("Master_Files", self.active_folder_id)['id']
-        self.daily_folder_id = self.create_folder("Daily_Reports", self.active_folder_id)['id']
-        
-        # Create system subfolders
-        self.database_folder_id = self.create_folder("Database_Backups", self.system_folder_id)['id']
-        self.config_folder_id = self.create_folder("Configuration_Files", self.system_folder_id)['id']
+        # Create subfolders under Active Content and System
+        subfolders = {
+            'individual_podcasts_folder_id': ("Individual_Podcasts", self.active_folder_id),
+            'master_files_folder_id': ("Master_Files", self.active_folder_id),
+            'daily_folder_id': ("Daily_Reports", self.active_folder_id),
+            'database_folder_id': ("Database_Backups", self.system_folder_id),
+            'config_folder_id': ("Configuration_Files", self.system_folder_id),
+        }
+        for attribute, (name, parent_id) in subfolders.items():
+            folder = self.create_folder(name, parent_id)
+            if not folder:
+                return False
+            setattr(self, attribute, folder['id'])
         
         # Create individual podcast folders
         self.create_podcast_folders()
@@ -124,23 +217,75 @@ class GoogleDriveSync:
                 folder_metadata['parents'] = [parent_id]
                 
             folder = self.service.files().create(body=folder_metadata, fields='id, name').execute()
+            self._remember(parent_id, dict(folder, mimeType=FOLDER_MIME_TYPE))
             print(f"✅ Created folder: {name}")
             return folder
             
         except Exception as e:
+            if is_not_found(e) and parent_id:
+                self.id_cache.invalidate(parent_id)
             print(f"❌ Error creating folder {name}: {e}")
             return None
     
+    def _remember(self, parent_id, item):
+        """Record a child in the ID cache and in this run's listing of its folder"""
+        kind = 'folder' if item.get('mimeType') == FOLDER_MIME_TYPE else 'file'
+        self.id_cache.put(kind, parent_id, item['name'], item['id'])
+        if parent_id in self._listings:
+            self._listings[parent_id][item['name']] = item
+    
+    def list_folder_children(self, folder_id):
+        """All children of a folder by name, from one paginated listing (cached for the run)"""
+        if folder_id in self._listings:
+            return self._listings[folder_id]
+        
+        children = {}
+        page_token = None
+        while True:
+            params = {
+                'q': f"'{folder_id}' in parents and trashed=false",
+                'fields': 'nextPageToken, files(id, name, mimeType, modifiedTime, md5Checksum)',
+                'pageSize': 1000,
+            }
+            if page_token:
+                params['pageToken'] = page_token
+            try:
+                results = self.service.files().list(**params).execute(num_retries=3)
+            except HttpError as e:
+                if is_not_found(e):
+                    self.id_cache.invalidate(folder_id)
+                raise
+            for item in results.get('files', []):
+                # Drive allows duplicate names; keep the first, as the old per-name queries did
+                children.setdefault(item['name'], item)
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        
+        self._listings[folder_id] = children
+        for item in children.values():
+            self._remember(folder_id, item)
+        self.id_cache.save()
+        return children
+    
     def find_folder(self, name, parent_id=None):
         """Find a folder by name and parent"""
         try:
-            query = f"name='{name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
+            cached_id = self.id_cache.get('folder', parent_id, name)
+            if cached_id:
+                return {'id': cached_id, 'name': name}
+            
             if parent_id:
-                query += f" and '{parent_id}' in parents"
-                
+                # One listing resolves every sibling folder too
+                item = self.list_folder_children(parent_id).get(name)
+                return item if item and item.get('mimeType') == FOLDER_MIME_TYPE else None
+            
+            query = f"name='{name}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
             results = self.service.files().list(q=query, fields="files(id, name)").execute()
             items = results.get('files', [])
             
+            if items:
+                self.id_cache.put('folder', None, name, items[0]['id'])
             return items[0] if items else None
             
         except Exception as e:
@@ -155,15 +300,14 @@ class GoogleDriveSync:
                 print(f"❌ Invalid parameters: filename='{filename}', folder_id='{folder_id}'")
                 return None
                 
-            query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
-            print(f"🔍 Searching for file: {query}")
-            
-            results = self.service.files().list(q=query, fields="files(id, name, modifiedTime)").execute()
-            items = results.get('files', [])
+            cached_id = self.id_cache.get('file', folder_id, filename)
+            if cached_id:
+                return {'id': cached_id, 'name': filename}
             
-            if items:
+            item = self.list_folder_children(folder_id).get(filename)
+            if item:
                 print(f"✅ Found existing file: {filename}")
-                return items[0]
+                return item
             else:
                 print(f"📁 File not found (will create new): {filename}")
                 return None
@@ -190,6 +334,10 @@ class GoogleDriveSync:
         
         self.podcast_folder_ids = {}
         
+        # Resolve any uncached podcast folders with a single listing
+        if not all(self.id_cache.get('folder', self.individual_podcasts_folder_id, name) for name in podcast_folders.values()):
+            self.list_folder_children(self.individual_podcasts_folder_id)
+        
         for clean_name, display_name in podcast_folders.items():
             folder = self.create_folder(display_name, self.individual_podcasts_folder_id)
             if folder:
@@ -238,6 +386,7 @@ class GoogleDriveSync:
             
             media = MediaFileUpload(local_file_path, resumable=True)
             
+            file = None
             if existing_file:
                 # Update existing file - don't include parents in update
                 update_metadata = {
@@ -246,25 +395,39 @@ class GoogleDriveSync:
                 if description:
                     update_metadata['description'] = description
                 
-                file = self.service.files().update(
-                    fileId=existing_file['id'],
-                    body=update_metadata,
-                    media_body=media,
-                    fields='id, name, modifiedTime'
-                ).execute()
-                print(f"🔄 Updated: {filename}")
-            else:
+                try:
+                    file = self.service.files().update(
+                        fileId=existing_file['id'],
+                        body=update_metadata,
+                        media_body=media,
+                        fields='id, name, modifiedTime'
+                    ).execute()
+                    print(f"🔄 Updated: {filename}")
+                except HttpError as e:
+                    if not is_not_found(e):
+                        raise
+                    # Cached ID of a file deleted on the Drive side; upload it fresh
+                    self.id_cache.invalidate(existing_file['id'])
+                    media = MediaFileUpload(local_file_path, resumable=True)
+            
+            if file is None:
                 # Create new file
                 file = self.service.files().create(
                     body=file_metadata,
                     media_body=media,
                     fields='id, name, modifiedTime'
                 ).execute()
+                self._remember(folder_id, file)
                 print(f"📤 Uploaded: {filename}")
             
+            self.id_cache.save()
             return file
             
         except Exception as e:
+            if is_not_found(e):
+                # The target folder itself is gone; resolve it from Drive next run
+                self.id_cache.invalidate(folder_id)
+                self.id_cache.save()
             print(f"❌ Error uploading {local_file_path}: {e}")
             return None
     
@@ -284,6 +447,7 @@ class GoogleDriveSync:
             
             media = MediaFileUpload(local_file_path, resumable=True)
             
+            file = None
             if existing_file:
                 # Update existing file - don't include parents in update
                 update_metadata = {
@@ -292,25 +456,39 @@ class GoogleDriveSync:
                 if description:
                     update_metadata['description'] = description
                 
-                file = self.service.files().update(
-                    fileId=existing_file['id'],
-                    body=update_metadata,
-                    media_body=media,
-                    fields='id, name, modifiedTime'
-                ).execute()
-                print(f"🔄 Updated: {target_filename}")
-            else:
+                try:
+                    file = self.service.files().update(
+                        fileId=existing_file['id'],
+                        body=update_metadata,
+                        media_body=media,
+                        fields='id, name, modifiedTime'
+                    ).execute()
+                    print(f"🔄 Updated: {target_filename}")
+                except HttpError as e:
+                    if not is_not_found(e):
+                        raise
+                    # Cached ID of a file deleted on the Drive side; upload it fresh
+                    self.id_cache.invalidate(existing_file['id'])
+                    media = MediaFileUpload(local_file_path, resumable=True)
+            
+            if file is None:
                 # Create new file
                 file = self.service.files().create(
                     body=file_metadata,
                     media_body=media,
                     fields='id, name, modifiedTime'
                 ).execute()
+                self._remember(folder_id, file)
                 print(f"📤 Uploaded: {target_filename}")
             
+            self.id_cache.save()
             return file
             
         except Exception as e:
+            if is_not_found(e):
+                # The target folder itself is gone; resolve it from Drive next run
+                self.id_cache.invalidate(folder_id)
+                self.id_cache.save()
             print(f"❌ Error uploading {local_file_path} as {target_filename}: {e}")
             return None
     
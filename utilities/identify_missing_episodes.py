@@ -2,13 +2,17 @@
 """
 Identify missing episodes by comparing RSS feeds against database
 Show most recent transcribed episode and list all missing episodes for approval
+An episode counts as present only when both its title and publish date match
 """
 import sys
-import sqlite3
 import requests
 import feedparser
 from datetime import datetime
 import re
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.db import get_connection
 
 class MissingEpisodeIdentifier:
     def __init__(self):
@@ -26,7 +30,7 @@ class MissingEpisodeIdentifier:
         
     def get_podcast_id(self, podcast_name):
         """Get podcast ID from database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("SELECT id FROM podcasts WHERE name = ? AND is_active = 1", (podcast_name,))
@@ -37,16 +41,16 @@ class MissingEpisodeIdentifier:
     
     def get_latest_transcribed_episode(self, podcast_id):
         """Get the most recent episode with a real transcript"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT title, publish_date, LENGTH(transcript) as transcript_length
-            FROM episodes 
-            WHERE podcast_id = ? 
-            AND transcript IS NOT NULL 
-            AND LENGTH(transcript) > 1000
-            ORDER BY publish_date DESC 
+            SELECT e.title, e.publish_date, t.char_count as transcript_length
+            FROM episodes e
+            JOIN transcripts t ON t.episode_id = e.id
+            WHERE e.podcast_id = ? 
+            AND t.char_count > 1000
+            ORDER BY e.publish_date DESC 
             LIMIT 1
         """, (podcast_id,))
         
@@ -106,21 +110,27 @@ class MissingEpisodeIdentifier:
         except Exception as e:
             return {"success": False, "error": f"Failed to fetch RSS feed: {str(e)}"}
     
-    def episode_exists_in_db(self, podcast_id, episode):
-        """Check if episode exists in database (using AND logic)"""
-        conn = sqlite3.connect(self.db_path)
+    def load_known_episodes(self, podcast_id):
+        """Map (title, publish_date) -> (episode ID, transcript length) for the podcast in one query
+        
+        Matching is AND logic on title and publish date, like the original per-episode check;
+        GUID/audio URL matches are deliberately not used here, so a re-titled episode that reuses
+        a CDN URL is still reported
+        """
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
-        
-        # Check by title and publish_date (main matching criteria)
         cursor.execute("""
-            SELECT id, transcript FROM episodes 
-            WHERE podcast_id = ? AND title = ? AND publish_date = ?
-        """, (podcast_id, episode['title'], episode['publish_date']))
-        
-        result = cursor.fetchone()
+            SELECT e.id, e.title, e.publish_date, COALESCE(t.char_count, 0)
+            FROM episodes e
+            LEFT JOIN transcripts t ON t.episode_id = e.id
+            WHERE e.podcast_id = ?
+        """, (podcast_id,))
+        known = {}
+        for episode_id, title, publish_date, char_count in cursor.fetchall():
+            known.setdefault((title, publish_date), (episode_id, char_count))
         conn.close()
         
-        return result if result else None
+        return known
     
     def identify_missing_for_podcast(self, podcast_name, rss_url):
         """Identify missing episodes for a specific podcast"""
@@ -151,23 +161,29 @@ class MissingEpisodeIdentifier:
         
         print(f"   📡 Found {len(rss_data['episodes'])} episodes in RSS feed")
         
-        # Find missing episodes
+        # Find missing episodes against the known keys in memory
+        known = self.load_known_episodes(podcast_id)
         missing_episodes = []
+        seen = set()
         
         for episode in rss_data["episodes"]:
             # Skip if older than our latest transcript (if we have one)
             if latest and episode.get('publish_date') and episode['publish_date'] <= latest[1]:
                 continue
             
-            # Check if exists in database
-            existing = self.episode_exists_in_db(podcast_id, episode)
+            # Check if exists in database (title AND publish date); feed repeats are reported once
+            key = (episode['title'], episode['publish_date'])
+            if key in seen:
+                continue
+            seen.add(key)
+            existing = known.get(key)
             
             if not existing:
                 missing_episodes.append(episode)
                 print(f"   ➕ Missing: '{episode['title'][:50]}...' ({episode.get('publish_date', 'No date')})")
             else:
-                episode_id, transcript = existing
-                if not transcript or len(transcript) < 1000:
+                episode_id, transcript_len = existing
+                if transcript_len < 1000:
                     missing_episodes.append(episode)
                     print(f"   📝 Needs transcript: '{episode['title'][:50]}...' ({episode.get('publish_date', 'No date')})")
         
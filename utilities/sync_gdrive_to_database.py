@@ -3,11 +3,51 @@
 Sync Google Drive transcript content to database
 Matches episodes using AND logic: title, date, and audio_url must all match
 """
+import os
 import sys
-import sqlite3
-import re
+import hashlib
+import tempfile
 from datetime import datetime
-from google_drive_sync import GoogleDriveSync
+from googleapiclient.http import MediaIoBaseDownload
+from google_drive_sync import GoogleDriveSync, is_not_found
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import transcript_store
+from core.db import get_connection, transaction
+from core.master_transcript_parser import iter_episodes, publish_date, split_heading
+
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+OUTCOMES = ('matched', 'updated', 'new', 'conflict', 'duplicate')
+
+# Parsed Drive episodes, reconciled against episodes in a handful of set-based statements
+STAGE_TABLE_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS gdrive_sync_stage (
+        row_id INTEGER PRIMARY KEY,
+        podcast_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        publish_date TEXT,
+        guid TEXT,
+        audio_url TEXT,
+        transcript_text TEXT,
+        compressed_text BLOB,
+        compression TEXT,
+        char_count INTEGER,
+        word_count INTEGER,
+        digest TEXT,
+        episode_id INTEGER,
+        outcome TEXT
+    )
+"""
+
+
+def transcript_digest(text):
+    """Whitespace-insensitive fingerprint, so conflicts are detected without shipping text back to Python"""
+    return hashlib.sha1(text.strip().encode('utf-8')).hexdigest() if text is not None else None
+
+
+def format_counts(counts):
+    return (f"{counts['matched'] + counts['updated']} matched ({counts['updated']} updated), "
+            f"{counts['new']} new, {counts['conflict']} conflicts, {counts['duplicate']} duplicates")
 
 class GoogleDriveToDatabase:
     def __init__(self):
@@ -24,53 +64,58 @@ class GoogleDriveToDatabase:
             'The Infrastructure Investor'
         ]
         
-    def extract_episodes_from_transcript(self, content, podcast_name):
-        """Extract individual episodes from a transcript file"""
-        episodes = []
-        
-        # Split by date headers (## YYYY-MM-DD)
-        date_sections = re.split(r'\n## (\d{4}-\d{2}-\d{2})\n', content)
-        
-        for i in range(1, len(date_sections), 2):
-            if i + 1 < len(date_sections):
-                date = date_sections[i]
-                section_content = date_sections[i + 1]
-                
-                # Extract episode title (### Title)
-                title_match = re.search(r'^### (.+)$', section_content, re.MULTILINE)
-                if title_match:
-                    title = title_match.group(1).strip()
-                    
-                    # Extract episode ID if present
-                    episode_id_match = re.search(r'\*\*Episode ID:\*\* (\d+)', section_content)
-                    episode_id = int(episode_id_match.group(1)) if episode_id_match else None
-                    
-                    # Extract date from section
-                    date_match = re.search(r'\*\*Date:\*\* (.+)', section_content)
-                    publish_date = date_match.group(1).strip() if date_match else f"{date}T00:00:00"
-                    
-                    # Extract transcript content (everything after metadata)
-                    transcript_start = section_content.find('\n\n')
-                    if transcript_start != -1:
-                        transcript = section_content[transcript_start:].strip()
-                        # Remove the trailing --- separator
-                        transcript = re.sub(r'\n---\n*$', '', transcript)
-                        
-                        # Only include if there's actual transcript content (not just metadata)
-                        if len(transcript) > 100 and transcript not in ['', '---']:
-                            episodes.append({
-                                'title': title,
-                                'publish_date': publish_date,
-                                'transcript': transcript,
-                                'episode_id': episode_id,
-                                'podcast_name': podcast_name
-                            })
-        
-        return episodes
+    def extract_episodes_from_transcript(self, source, podcast_name):
+        """Yield episodes from a per-podcast transcript file (path or binary file), one at a time"""
+        for record in iter_episodes(source):
+            # Only include if there's actual transcript content (not just metadata)
+            if len(record['transcript']) > 100:
+                yield {
+                    'title': record['title'],
+                    'publish_date': publish_date(record),
+                    'transcript': record['transcript'],
+                    'episode_id': int(record['episode_id']) if (record['episode_id'] or '').isdigit() else None,
+                    'podcast_name': podcast_name
+                }
+    
+    def extract_episodes_from_master(self, source):
+        """Yield active-podcast episodes from the combined master file (`### Podcast: Title` headings)"""
+        for record in iter_episodes(source):
+            podcast_name, episode_title = split_heading(record['title'], self.active_podcasts)
+            
+            # Only process active podcasts with substantial transcript content
+            if podcast_name not in self.active_podcasts or len(record['transcript']) <= 200:
+                continue
+            
+            yield {
+                'title': episode_title,
+                'publish_date': publish_date(record),
+                'transcript': record['transcript'],
+                'episode_id': int(record['episode_id']) if (record['episode_id'] or '').isdigit() else None,
+                'podcast_name': podcast_name
+            }
+    
+    def download_file(self, file_id):
+        """Download a Drive file in chunks into a temporary binary file, rewound for parsing"""
+        tmp = tempfile.TemporaryFile()
+        try:
+            downloader = MediaIoBaseDownload(tmp, self.sync.service.files().get_media(fileId=file_id),
+                                             chunksize=DOWNLOAD_CHUNK_SIZE)
+            done = False
+            while not done:
+                _, done = downloader.next_chunk(num_retries=3)
+        except Exception as e:
+            tmp.close()
+            if is_not_found(e):
+                # Drop the stale cached ID before re-raising
+                self.sync.id_cache.invalidate(file_id)
+                self.sync.id_cache.save()
+            raise
+        tmp.seek(0)
+        return tmp
     
     def get_podcast_id_from_name(self, podcast_name):
         """Get podcast ID from database by name"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("SELECT id FROM podcasts WHERE name = ? AND is_active = 1", (podcast_name,))
@@ -79,21 +124,106 @@ class GoogleDriveToDatabase:
         
         return result[0] if result else None
     
-    def find_matching_episode_in_db(self, episode, podcast_id):
-        """Find matching episode in database using AND logic"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def stage_episodes(self, conn, episodes):
+        """Load parsed episodes (dicts carrying podcast_id) into the temp staging table; returns rows staged"""
+        conn.execute(STAGE_TABLE_SQL)
+        conn.execute("DELETE FROM gdrive_sync_stage")
         
-        # Try exact match first (title, date, audio_url all match)
-        cursor.execute("""
-            SELECT id, transcript FROM episodes 
-            WHERE podcast_id = ? AND title = ? AND publish_date = ?
-        """, (podcast_id, episode['title'], episode['publish_date']))
+        def rows():
+            for episode in episodes:
+                transcript_text, compressed_text, compression = transcript_store.encode(episode['transcript'])
+                yield (
+                    episode['podcast_id'], episode['title'], episode['publish_date'],
+                    episode.get('guid'), episode.get('audio_url'),
+                    transcript_text, compressed_text, compression,
+                    len(episode['transcript']), len(episode['transcript'].split()),
+                    transcript_digest(episode['transcript'])
+                )
+        
+        conn.executemany("""
+            INSERT INTO gdrive_sync_stage (
+                podcast_id, title, publish_date, guid, audio_url,
+                transcript_text, compressed_text, compression, char_count, word_count, digest
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows())
+        return conn.execute("SELECT COUNT(*) FROM gdrive_sync_stage").fetchone()[0]
+    
+    def reconcile_staged_episodes(self, conn):
+        """Match staged rows against episodes (AND logic: podcast, title, date) and apply them set-wise
+        
+        Existing episode with a transcript over 100 chars: 'matched' if identical, else 'conflict'
+        (left untouched). Existing without one: 'updated'. No match: 'new' episode + transcript
+        """
+        conn.create_function('transcript_digest', 1, transcript_digest, deterministic=True)
+        
+        # The same episode twice in one file: keep the first occurrence
+        conn.execute("""
+            UPDATE gdrive_sync_stage SET outcome = 'duplicate'
+            WHERE row_id NOT IN (
+                SELECT MIN(row_id) FROM gdrive_sync_stage GROUP BY podcast_id, title, publish_date
+            )
+        """)
+        conn.execute("""
+            UPDATE gdrive_sync_stage AS s SET episode_id = e.id
+            FROM episodes e
+            WHERE s.outcome IS NULL
+            AND e.podcast_id = s.podcast_id AND e.title = s.title AND e.publish_date = s.publish_date
+        """)
+        conn.execute(f"""
+            UPDATE gdrive_sync_stage AS s SET outcome = CASE
+                WHEN s.episode_id IS NULL THEN 'new'
+                WHEN COALESCE(t.char_count, 0) <= 100 THEN 'updated'
+                WHEN transcript_digest({transcript_store.TRANSCRIPT_TEXT_SQL}) = s.digest THEN 'matched'
+                ELSE 'conflict'
+            END
+            FROM gdrive_sync_stage s2 LEFT JOIN transcripts t ON t.episode_id = s2.episode_id
+            WHERE s2.row_id = s.row_id AND s.outcome IS NULL
+        """)
         
-        result = cursor.fetchone()
-        conn.close()
+        conn.execute("""
+            INSERT INTO episodes (podcast_id, title, publish_date, transcribed, created_at, audio_url, guid)
+            SELECT podcast_id, title, publish_date, 1, ?, audio_url, guid
+            FROM gdrive_sync_stage WHERE outcome = 'new' ORDER BY row_id
+        """, (datetime.now().isoformat(),))
+        conn.execute("""
+            UPDATE gdrive_sync_stage AS s SET episode_id = e.id
+            FROM episodes e
+            WHERE s.outcome = 'new'
+            AND e.podcast_id = s.podcast_id AND e.title = s.title AND e.publish_date IS s.publish_date
+        """)
+        conn.execute("""
+            INSERT INTO transcripts (episode_id, transcript_text, compressed_text, compression,
+                                     char_count, word_count, transcription_service, created_at)
+            SELECT episode_id, transcript_text, compressed_text, compression,
+                   char_count, word_count, 'whisper-1', ?
+            FROM gdrive_sync_stage WHERE outcome IN ('new', 'updated')
+            ON CONFLICT(episode_id) DO UPDATE SET
+                transcript_text = excluded.transcript_text,
+                compressed_text = excluded.compressed_text,
+                compression = excluded.compression,
+                char_count = excluded.char_count,
+                word_count = excluded.word_count,
+                transcription_service = excluded.transcription_service
+        """, (datetime.now().isoformat(),))
+        conn.execute("""
+            UPDATE episodes SET transcribed = 1
+            WHERE id IN (SELECT episode_id FROM gdrive_sync_stage WHERE outcome = 'updated')
+        """)
         
-        return result if result else None
+        for title, outcome in conn.execute("""
+            SELECT title, outcome FROM gdrive_sync_stage
+            WHERE outcome IN ('updated', 'new', 'conflict') ORDER BY row_id
+        """):
+            label = {'updated': '✅ Updated', 'new': '➕ Created', 'conflict': '⚠️  CONFLICT'}[outcome]
+            print(f"   {label}: {title[:50]}...")
+        
+        counts = {}
+        for podcast_id, outcome, count in conn.execute(
+            "SELECT podcast_id, outcome, COUNT(*) FROM gdrive_sync_stage GROUP BY podcast_id, outcome"
+        ):
+            counts.setdefault(podcast_id, dict.fromkeys(OUTCOMES, 0))[outcome] = count
+        conn.execute("DELETE FROM gdrive_sync_stage")
+        return counts
     
     def sync_podcast_transcripts(self, podcast_name):
         """Sync transcripts for a specific podcast"""
@@ -106,20 +236,18 @@ class GoogleDriveToDatabase:
             return
         
         # Find transcript file in Google Drive (in Master Transcripts folder)
-        service = self.sync.service
         main_folder_id = '1Zo8p26SksJCUTviH95w0JOoKdR1fHGzJ'
         
-        # First find the Master Transcripts folder
-        master_transcripts_results = service.files().list(
-            q=f"parents in '{main_folder_id}' and name = 'Master Transcripts' and mimeType='application/vnd.google-apps.folder'",
-            fields='files(id, name)'
-        ).execute()
-        
-        if not master_transcripts_results['files']:
+        # First find the Master Transcripts folder (cached across runs)
+        master_transcripts_folder = self.sync.find_folder('Master Transcripts', main_folder_id)
+        if not master_transcripts_folder:
             print(f"   ❌ Master Transcripts folder not found")
             return
             
-        transcripts_folder_id = master_transcripts_results['files'][0]['id']
+        transcripts_folder_id = master_transcripts_folder['id']
+        
+        # One listing of the folder (shared by every podcast this run) instead of a query per pattern
+        transcript_files = self.sync.list_folder_children(transcripts_folder_id)
         
         # Look for transcript file with various naming patterns
         filename_patterns = [
@@ -131,13 +259,8 @@ class GoogleDriveToDatabase:
         
         transcript_file = None
         for pattern in filename_patterns:
-            search_results = service.files().list(
-                q=f"parents in '{transcripts_folder_id}' and name = '{pattern}'",
-                fields='files(id, name)'
-            ).execute()
-            
-            if search_results['files']:
-                transcript_file = search_results['files'][0]
+            if pattern in transcript_files:
+                transcript_file = transcript_files[pattern]
                 print(f"   📄 Found transcript file: {pattern}")
                 break
         
@@ -147,60 +270,18 @@ class GoogleDriveToDatabase:
         
         # Download and parse transcript file
         try:
-            request = service.files().get_media(fileId=transcript_file['id'])
-            content = request.execute().decode('utf-8', errors='ignore')
-            
-            episodes = self.extract_episodes_from_transcript(content, podcast_name)
-            print(f"   📊 Found {len(episodes)} episodes in Google Drive")
+            transcript_download = self.download_file(transcript_file['id'])
+            episodes = (dict(episode, podcast_id=podcast_id)
+                        for episode in self.extract_episodes_from_transcript(transcript_download, podcast_name))
             
-            # Sync each episode
-            matched_count = 0
-            new_count = 0
-            conflict_count = 0
+            # Stage everything, then reconcile set-wise in one transaction
+            with transaction(self.db_path) as conn:
+                staged = self.stage_episodes(conn, episodes)
+                counts = self.reconcile_staged_episodes(conn).get(podcast_id, dict.fromkeys(OUTCOMES, 0))
+            transcript_download.close()
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            for episode in episodes:
-                # Check if episode exists in database
-                existing = self.find_matching_episode_in_db(episode, podcast_id)
-                
-                if existing:
-                    episode_id, existing_transcript = existing
-                    
-                    # Check for transcript conflicts
-                    if existing_transcript and len(existing_transcript) > 100:
-                        if existing_transcript.strip() != episode['transcript'].strip():
-                            print(f"   ⚠️  CONFLICT: {episode['title'][:50]}... has different transcript content")
-                            conflict_count += 1
-                        else:
-                            matched_count += 1
-                    else:
-                        # Update with transcript from Google Drive
-                        cursor.execute("""
-                            UPDATE episodes SET transcript = ?, transcribed = 1 
-                            WHERE id = ?
-                        """, (episode['transcript'], episode_id))
-                        matched_count += 1
-                        print(f"   ✅ Updated: {episode['title'][:50]}...")
-                else:
-                    # Create new episode (audio_url can be NULL)
-                    cursor.execute("""
-                        INSERT INTO episodes (
-                            podcast_id, title, publish_date, transcript, 
-                            transcribed, created_at
-                        ) VALUES (?, ?, ?, ?, 1, ?)
-                    """, (
-                        podcast_id, episode['title'], episode['publish_date'], 
-                        episode['transcript'], datetime.now().isoformat()
-                    ))
-                    new_count += 1
-                    print(f"   ➕ Created: {episode['title'][:50]}...")
-            
-            conn.commit()
-            conn.close()
-            
-            print(f"   📊 Summary: {matched_count} matched, {new_count} new, {conflict_count} conflicts")
+            print(f"   📊 Found {staged} episodes in Google Drive")
+            print(f"   📊 Summary: {format_counts(counts)}")
             
         except Exception as e:
             print(f"   ❌ Error processing {podcast_name}: {e}")
@@ -209,150 +290,54 @@ class GoogleDriveToDatabase:
         """Sync from the COMPLETE_MASTER_TRANSCRIPTS file that has all real content"""
         print("📄 Syncing from COMPLETE_MASTER_TRANSCRIPTS file...")
         
-        service = self.sync.service
         transcripts_folder_id = '10sCLnljEf-Nxu5HmgBZqHcmbfygzu63u'
         
         # Get the complete master transcripts file
-        search_results = service.files().list(
-            q=f"parents in '{transcripts_folder_id}' and name = 'COMPLETE_MASTER_TRANSCRIPTS_20250809_153636.md'",
-            fields='files(id, name)'
-        ).execute()
-        
-        if not search_results['files']:
+        master_file = self.sync.find_file('COMPLETE_MASTER_TRANSCRIPTS_20250809_153636.md', transcripts_folder_id)
+        if not master_file:
             print("❌ COMPLETE_MASTER_TRANSCRIPTS file not found")
             return
         
-        file_id = search_results['files'][0]['id']
-        request = service.files().get_media(fileId=file_id)
-        content = request.execute().decode('utf-8', errors='ignore')
-        
-        print(f"📊 Master file loaded: {len(content)} characters")
-        
-        # Parse master file format: ## DATE followed by ### PODCAST: TITLE
-        episodes = []
-        date_sections = re.split(r'\n## ([0-9T:\+\-]+)\n', content)
-        
-        for i in range(1, len(date_sections), 2):
-            if i + 1 < len(date_sections):
-                date = date_sections[i]
-                section_content = date_sections[i + 1]
-                
-                # Extract title with podcast name (### Podcast: Title)
-                title_match = re.search(r'^### (.+)$', section_content, re.MULTILINE)
-                if title_match:
-                    full_title = title_match.group(1).strip()
-                    
-                    # Parse podcast name and episode title
-                    if ':' in full_title:
-                        podcast_part, episode_title = full_title.split(':', 1)
-                        podcast_name = podcast_part.strip()
-                        episode_title = episode_title.strip()
-                    else:
-                        podcast_name = "Unknown"
-                        episode_title = full_title
-                    
-                    # Only process active podcasts
-                    if podcast_name not in self.active_podcasts:
-                        continue
-                    
-                    # Extract metadata
-                    pub_date_match = re.search(r'\*\*Publication Date:\*\* (.+)', section_content)
-                    episode_id_match = re.search(r'\*\*Episode ID:\*\* (\d+)', section_content)
-                    
-                    publish_date = pub_date_match.group(1).strip() if pub_date_match else date
-                    episode_id = int(episode_id_match.group(1)) if episode_id_match else None
-                    
-                    # Extract transcript (after **Full Transcript:**)
-                    transcript_start = section_content.find('**Full Transcript:**')
-                    if transcript_start != -1:
-                        transcript = section_content[transcript_start + len('**Full Transcript:**'):].strip()
-                        
-                        if len(transcript) > 200:  # Substantial transcript content
-                            episodes.append({
-                                'title': episode_title,
-                                'publish_date': publish_date,
-                                'transcript': transcript,
-                                'episode_id': episode_id,
-                                'podcast_name': podcast_name
-                            })
-        
-        print(f"📊 Extracted {len(episodes)} episodes with real transcripts")
-        
-        # Group by podcast and sync
-        by_podcast = {}
-        for episode in episodes:
-            podcast = episode['podcast_name']
-            if podcast not in by_podcast:
-                by_podcast[podcast] = []
-            by_podcast[podcast].append(episode)
-        
-        total_matched = 0
-        total_new = 0
-        total_conflicts = 0
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for podcast_name, podcast_episodes in by_podcast.items():
-            print(f"\n📁 Processing {podcast_name}: {len(podcast_episodes)} episodes")
-            
-            podcast_id = self.get_podcast_id_from_name(podcast_name)
-            if not podcast_id:
-                print(f"   ❌ Podcast not found in database: {podcast_name}")
-                continue
-            
-            matched = 0
-            new = 0
-            conflicts = 0
-            
-            for episode in podcast_episodes:
-                existing = self.find_matching_episode_in_db(episode, podcast_id)
-                
-                if existing:
-                    episode_id, existing_transcript = existing
-                    
-                    if existing_transcript and len(existing_transcript) > 100:
-                        if existing_transcript.strip() != episode['transcript'].strip():
-                            print(f"   ⚠️  CONFLICT: {episode['title'][:50]}...")
-                            conflicts += 1
-                        else:
-                            matched += 1
-                    else:
-                        # Update with transcript
-                        cursor.execute("""
-                            UPDATE episodes SET transcript = ?, transcribed = 1 
-                            WHERE id = ?
-                        """, (episode['transcript'], episode_id))
-                        matched += 1
-                        print(f"   ✅ Updated: {episode['title'][:50]}...")
-                else:
-                    # Create new episode with required fields
-                    guid = f"gdrive_sync_{podcast_id}_{episode.get('episode_id', 'unknown')}_{len(episode['title'])}"
-                    audio_url = f"placeholder://gdrive_sync/{podcast_id}/{episode.get('episode_id', 'unknown')}"
-                    
-                    cursor.execute("""
-                        INSERT INTO episodes (
-                            podcast_id, title, publish_date, transcript, 
-                            transcribed, created_at, audio_url, guid
-                        ) VALUES (?, ?, ?, ?, 1, ?, ?, ?)
-                    """, (
-                        podcast_id, episode['title'], episode['publish_date'], 
-                        episode['transcript'], datetime.now().isoformat(),
-                        audio_url, guid
-                    ))
-                    new += 1
-                    print(f"   ➕ Created: {episode['title'][:50]}...")
-            
-            print(f"   📊 {podcast_name}: {matched} matched, {new} new, {conflicts} conflicts")
-            total_matched += matched
-            total_new += new
-            total_conflicts += conflicts
+        master_download = self.download_file(master_file['id'])
+        print(f"📊 Master file downloaded: {os.fstat(master_download.fileno()).st_size} bytes")
         
-        conn.commit()
+        # Resolve podcast IDs once; episodes of unknown podcasts are skipped
+        conn = get_connection(self.db_path)
+        podcast_ids = dict(conn.execute("SELECT name, id FROM podcasts WHERE is_active = 1").fetchall())
         conn.close()
+        missing = set()
+        
+        def staged_episodes():
+            for episode in self.extract_episodes_from_master(master_download):
+                podcast_id = podcast_ids.get(episode['podcast_name'])
+                if not podcast_id:
+                    if episode['podcast_name'] not in missing:
+                        missing.add(episode['podcast_name'])
+                        print(f"   ❌ Podcast not found in database: {episode['podcast_name']}")
+                    continue
+                # Placeholders for the required identity columns
+                yield dict(
+                    episode,
+                    podcast_id=podcast_id,
+                    guid=f"gdrive_sync_{podcast_id}_{episode.get('episode_id', 'unknown')}_{len(episode['title'])}",
+                    audio_url=f"placeholder://gdrive_sync/{podcast_id}/{episode.get('episode_id', 'unknown')}"
+                )
+        
+        with transaction(self.db_path) as conn:
+            staged = self.stage_episodes(conn, staged_episodes())
+            by_podcast = self.reconcile_staged_episodes(conn)
+        master_download.close()
+        
+        print(f"📊 Staged {staged} episodes with real transcripts")
+        podcast_names = {podcast_id: name for name, podcast_id in podcast_ids.items()}
+        totals = dict.fromkeys(OUTCOMES, 0)
+        for podcast_id, counts in by_podcast.items():
+            print(f"   📊 {podcast_names[podcast_id]}: {format_counts(counts)}")
+            for outcome, count in counts.items():
+                totals[outcome] += count
         
         print(f"\n🎉 Master file sync complete!")
-        print(f"   📊 TOTAL: {total_matched} matched, {total_new} new, {total_conflicts} conflicts")
+        print(f"   📊 TOTAL: {format_counts(totals)}")
     
     def run_sync(self):
         """Run complete sync for all active podcasts"""
@@ -370,15 +355,16 @@ class GoogleDriveToDatabase:
         print(f"\n🎉 Sync complete!")
         
         # Show final database state
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         cursor = conn.cursor()
         
         print(f"\n📊 Final database state:")
         cursor.execute("""
             SELECT p.name, COUNT(*) as total_episodes, 
-                   COUNT(CASE WHEN e.transcript IS NOT NULL AND LENGTH(e.transcript) > 1000 THEN 1 END) as with_transcripts
+                   COUNT(CASE WHEN t.char_count > 1000 THEN 1 END) as with_transcripts
             FROM episodes e 
             JOIN podcasts p ON e.podcast_id = p.id 
+            LEFT JOIN transcripts t ON t.episode_id = e.id
             WHERE p.is_active = 1 
             GROUP BY p.name 
             ORDER BY p.name
@@ -5,6 +5,7 @@ Test script for the automated podcast system
 import os
 import sys
 sys.path.append('scripts')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 def test_missing_episode_identification():
     """Test the missing episode identification"""
@@ -44,11 +45,11 @@ def test_database_connection():
     """Test database connection"""
     print("\n💾 Testing database connection...")
     
-    import sqlite3
+    from core.db import get_connection
     db_path = 'podcast_app_v2.db'
     
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         cursor = conn.cursor()
         
         # Check podcast count
@@ -60,7 +61,7 @@ def test_database_connection():
         episode_count = cursor.fetchone()[0]
         
         # Check episodes with transcripts
-        cursor.execute("SELECT COUNT(*) FROM episodes WHERE transcript IS NOT NULL AND LENGTH(transcript) > 1000")
+        cursor.execute("SELECT COUNT(*) FROM transcripts WHERE char_count > 1000")
         transcript_count = cursor.fetchone()[0]
         
         conn.close()
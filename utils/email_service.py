@@ -3,6 +3,7 @@
 Email Service for Podcast Analysis Application v2
 """
 import os
+import sys
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -10,6 +11,9 @@ from datetime import datetime, timedelta
 import sqlite3
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.db import get_connection
+
 # Load environment variables
 load_dotenv()
 
@@ -24,7 +28,7 @@ class EmailService:
         
     def get_db_connection(self):
         """Get database connection"""
-        conn = sqlite3.connect("podcast_app_v2.db")
+        conn = get_connection("podcast_app_v2.db")
         conn.row_factory = sqlite3.Row
         return conn
     